@@ -13,8 +13,12 @@ import logging
 from mozilla_django_oidc.auth import OIDCAuthenticationBackend
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models import Exists, OuterRef
 
+from apps.audit.signals import emit_group_change
 from apps.audit.utils import emit_audit_event
+from apps.authorization.acl import invalidate_user_groups
 
 logger = logging.getLogger(__name__)
 
@@ -55,34 +59,83 @@ class AzureOIDCBackend(OIDCAuthenticationBackend):
         return user
 
     def sync_user(self, user, claims):
-        """Sync first_name, last_name, email and Azure group memberships."""
-        user.first_name = claims.get('given_name', '')
-        user.last_name = claims.get('family_name', '')
-        user.email = claims.get('email', user.email)
-        user.save(update_fields=['first_name', 'last_name', 'email'])
+        """
+        Sync first_name, last_name, email and Azure group memberships.
+
+        Runs on every Azure login, so it only writes what changed: the user row
+        is saved with the changed fields only, and the mapped group memberships
+        are diffed in memory against one query and written with bulk
+        through-table operations. An unchanged login costs a single query.
+        """
+        fields = {
+            'first_name': claims.get('given_name', ''),
+            'last_name': claims.get('family_name', ''),
+            'email': claims.get('email', user.email),
+        }
+        changed_fields = [name for name, value in fields.items() if getattr(user, name) != value]
+        for name in changed_fields:
+            setattr(user, name, fields[name])
+        if changed_fields:
+            user.save(update_fields=changed_fields)
 
         if not GROUP_MAPPING:
             logger.debug('Synced user %s: GROUP_MAPPING is empty, skipping group sync', user.email)
             return
 
-        azure_group_ids = claims.get('groups', [])
-        django_groups = []
-        for azure_oid, django_group_name in GROUP_MAPPING.items():
-            if azure_oid in azure_group_ids:
-                group, _ = Group.objects.get_or_create(name=django_group_name)
-                django_groups.append(group)
-
-        # Only update groups that are covered by the mapping; leave others untouched.
-        mapped_group_names = set(GROUP_MAPPING.values())
-        managed_groups = Group.objects.filter(name__in=mapped_group_names)
-        user.groups.remove(*managed_groups)
-        if django_groups:
-            user.groups.add(*django_groups)
-        logger.debug(
-            'Synced user %s: groups=%s',
-            user.email,
-            [g.name for g in django_groups],
+        # Only groups covered by the mapping are managed; others are left untouched.
+        azure_group_ids = set(claims.get('groups', []))
+        wanted_names = {
+            name for azure_oid, name in GROUP_MAPPING.items() if azure_oid in azure_group_ids
+        }
+        managed = self._managed_groups(user, set(GROUP_MAPPING.values()), wanted_names)
+        current = {pk for pk, (_, is_member) in managed.items() if is_member}
+        wanted = {pk for pk, (name, _) in managed.items() if name in wanted_names}
+        added, removed = wanted - current, current - wanted
+        if not added and not removed:
+            logger.debug('Synced user %s: groups unchanged', user.email)
+            return
+
+        membership = self.UserModel.groups.through
+        with transaction.atomic():
+            if removed:
+                membership.objects.filter(user_id=user.pk, group_id__in=removed).delete()
+            if added:
+                membership.objects.bulk_create(
+                    [membership(user_id=user.pk, group_id=pk) for pk in added],
+                    ignore_conflicts=True,
+                )
+        # Bulk writes bypass m2m_changed: do what its receivers would.
+        invalidate_user_groups(user.pk)
+        emit_group_change(
+            user.username,
+            added_names=[managed[pk][0] for pk in added],
+            removed_names=[managed[pk][0] for pk in removed],
         )
+        logger.debug('Synced user %s: groups=%s', user.email, sorted(wanted_names))
+
+    def _managed_groups(self, user, mapped_names, wanted_names):
+        """
+        Return {group_pk: (name, user_is_member)} for the mapped groups.
+
+        One query; wanted groups that do not exist yet are created first.
+        """
+        membership = self.UserModel.groups.through
+        is_member = Exists(membership.objects.filter(user_id=user.pk, group_id=OuterRef('pk')))
+
+        def fetch():
+            return {
+                pk: (name, member)
+                for pk, name, member in Group.objects.filter(name__in=mapped_names)
+                .annotate(is_member=is_member)
+                .values_list('pk', 'name', 'is_member')
+            }
+
+        managed = fetch()
+        missing = wanted_names - {name for name, _ in managed.values()}
+        if missing:
+            Group.objects.bulk_create([Group(name=name) for name in missing], ignore_conflicts=True)
+            managed = fetch()
+        return managed
 
 
 class SuperuserOnlyModelBackend(ModelBackend):
@@ -177,3 +177,137 @@ class ClientIpExtractionTest(TestCase):
                 'HTTP_X_FORWARDED_FOR': '10.0.0.1, 192.168.1.1',
             })
         self.assertEqual(ip, '192.168.1.1')
+
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group
+
+from apps.accounts import auth
+from apps.accounts.auth import AzureOIDCBackend
+
+_MAPPING = {'oid-reports': 'reports', 'oid-segnalazioni': 'segnalazioni'}
+
+
+@patch.dict(auth.GROUP_MAPPING, _MAPPING, clear=True)
+class SyncUserTest(TestCase):
+    """sync_user diffs group memberships in memory and only writes changes."""
+
+    def setUp(self):
+        self.backend = AzureOIDCBackend()
+        self.user = get_user_model().objects.create_user(
+            'mario', email='mario@example.com', first_name='Mario', last_name='Rossi',
+        )
+        self.other = Group.objects.create(name='unmanaged')
+        self.user.groups.add(self.other)
+
+    def _claims(self, *groups):
+        return {
+            'email': 'mario@example.com', 'given_name': 'Mario', 'family_name': 'Rossi',
+            'groups': list(groups),
+        }
+
+    def _group_names(self):
+        return set(self.user.groups.values_list('name', flat=True))
+
+    def test_creates_and_assigns_mapped_groups(self):
+        with self.assertLogs('audit', level='INFO') as cm:
+            self.backend.sync_user(self.user, self._claims('oid-reports', 'oid-segnalazioni'))
+        self.assertEqual(self._group_names(), {'unmanaged', 'reports', 'segnalazioni'})
+        record = next(r for r in cm.records if r.event_type == 'authz.group.changed')
+        self.assertEqual(record.detail['groups_added'], ['reports', 'segnalazioni'])
+        self.assertEqual(record.detail['groups_removed'], [])
+
+    def test_removes_only_managed_groups(self):
+        self.backend.sync_user(self.user, self._claims('oid-reports', 'oid-segnalazioni'))
+        with self.assertLogs('audit', level='INFO') as cm:
+            self.backend.sync_user(self.user, self._claims('oid-reports'))
+        self.assertEqual(self._group_names(), {'unmanaged', 'reports'})
+        record = next(r for r in cm.records if r.event_type == 'authz.group.changed')
+        self.assertEqual(record.detail['groups_removed'], ['segnalazioni'])
+
+    def test_unchanged_login_is_one_query_and_silent(self):
+        self.backend.sync_user(self.user, self._claims('oid-reports'))
+        with self.assertNumQueries(1), self.assertNoLogs('audit', level='INFO'):
+            self.backend.sync_user(self.user, self._claims('oid-reports'))
+
+    def test_changed_profile_saves_only_changed_fields(self):
+        claims = self._claims()
+        claims['family_name'] = 'Bianchi'
+        with patch.object(self.user, 'save') as save:
+            self.backend.sync_user(self.user, claims)
+        save.assert_called_once_with(update_fields=['last_name'])
+
+    def test_group_change_invalidates_cached_group_ids(self):
+        with patch.object(auth, 'invalidate_user_groups') as invalidate:
+            self.backend.sync_user(self.user, self._claims('oid-reports'))
+        invalidate.assert_called_once_with(self.user.pk)
+
+
+import threading
+
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+
+
+class ConcurrentLoginLockoutTest(TestCase):
+    """Concurrent failed logins are all counted (no lost read-modify-write updates)."""
+
+    def setUp(self):
+        cache.clear()
+        self.login_url = reverse('accounts:login')
+
+    def tearDown(self):
+        cache.delete('login_attempts_127.0.0.1')
+
+    def test_concurrent_failures_are_all_counted(self):
+        attempts = 8
+        start = threading.Barrier(attempts)
+
+        def attempt():
+            start.wait()
+            try:
+                Client().post(self.login_url, {'username': 'nobody', 'password': 'wrong'})
+            finally:
+                connection.close()
+
+        with self.settings(MAX_LOGIN_ATTEMPTS=100):
+            threads = [threading.Thread(target=attempt) for _ in range(attempts)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(cache.get('login_attempts_127.0.0.1'), attempts)
+
+    def test_concurrent_burst_reaches_authenticate_at_most_max_attempts_times(self):
+        attempts, max_attempts = 8, 3
+        start = threading.Barrier(attempts)
+        calls = []
+
+        def authenticate(*args, **kwargs):
+            calls.append(1)
+            return None
+
+        def attempt():
+            start.wait()
+            try:
+                Client().post(self.login_url, {'username': 'nobody', 'password': 'wrong'})
+            finally:
+                connection.close()
+
+        with self.settings(MAX_LOGIN_ATTEMPTS=max_attempts), \
+                patch('apps.accounts.views.authenticate', side_effect=authenticate):
+            threads = [threading.Thread(target=attempt) for _ in range(attempts)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(calls), max_attempts)
+
+    def test_lockout_after_max_attempts(self):
+        for _ in range(django_settings.MAX_LOGIN_ATTEMPTS):
+            self.client.post(self.login_url, {'username': 'nobody', 'password': 'wrong'})
+        response = self.client.post(self.login_url, {'username': 'nobody', 'password': 'wrong'})
+        self.assertRedirects(response, '/auth/login/?error=locked', fetch_redirect_response=False)
@@ -11,6 +11,7 @@ from django.views.decorators.http import require_POST
 
 from .forms import LoginForm
 from apps.audit.utils import emit_audit_event
+from apps.core.ratelimit import incr_counter
 from config.strings import UI_STRINGS
 
 logger = logging.getLogger(__name__)
@@ -63,15 +64,19 @@ class LoginView(View):
         """Process login form submission."""
         form = LoginForm(request.POST)
 
-        # IP-based rate limiting — not bypassable by clearing cookies
+        # IP-based lockout — not bypassable by clearing cookies. Every attempt
+        # increments the counter first and is rejected once it is past the
+        # limit, so a concurrent burst cannot get more than max_attempts
+        # attempts through to authenticate. The lockout window starts at the
+        # first attempt.
         client_ip = self._get_client_ip(request)
         cache_key = f'login_attempts_{client_ip}'
         max_attempts = getattr(settings, 'MAX_LOGIN_ATTEMPTS', 5)
         lockout_duration = getattr(settings, 'LOCKOUT_DURATION', 900)
 
-        login_attempts = cache.get(cache_key, 0)
+        login_attempts = incr_counter(cache_key, timeout=lockout_duration)
 
-        if login_attempts >= max_attempts:
+        if login_attempts > max_attempts:
             raw_username = request.POST.get("username", "")
             safe_username = raw_username.replace('\n', ' ').replace('\r', ' ')[:150]
             emit_audit_event(request, "auth.login.locked", detail={
@@ -104,13 +109,10 @@ class LoginView(View):
                     next_url = '/'
                 return redirect(next_url)
             else:
-                # Login failed — increment IP-based counter with TTL equal to lockout window
-                new_count = login_attempts + 1
-                cache.set(cache_key, new_count, timeout=lockout_duration)
-
+                # Login failed — the attempt is already counted
                 emit_audit_event(request, "auth.login.failure", detail={
                     "username_attempted": username,
-                    "attempt_count": new_count,
+                    "attempt_count": login_attempts,
                     "ip": client_ip,
                 })
 
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
 
+from apps.audit.models import AuditEvent
 from apps.audit.utils import emit_audit_event
 
 
@@ -23,3 +24,25 @@ try:
 except admin.sites.NotRegistered:
     pass
 admin.site.register(User, AuditUserAdmin)
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    """Read-only browser over the audit DB sink."""
+
+    list_display = ("timestamp", "level", "event_type", "user", "ip", "path")
+    list_filter = ("level", "event_type")
+    search_fields = ("=user", "=ip", "=session_id", "event_type")
+    date_hierarchy = "timestamp"
+    # Avoid a second COUNT(*) over every partition on each page
+    show_full_result_count = False
+    readonly_fields = [f.name for f in AuditEvent._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -7,3 +7,6 @@ class AuditConfig(AppConfig):
 
     def ready(self):
         import apps.audit.signals  # noqa: F401 — connect signal handlers
+        from apps.audit.handlers import start_queue_listeners
+
+        start_queue_listeners()
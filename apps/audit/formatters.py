@@ -1,26 +1,51 @@
-import json
 import logging
+import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from apps.core.fastjson import dumps
+
 
 class AppJsonFormatter(logging.Formatter):
-    """JSON formatter for operational app logs. Emits {timestamp, level, app, message}."""
+    """JSON formatter for operational app logs.
+
+    Emits {timestamp, level, app, message}, plus detail when the record
+    carries one (``extra={"detail": {...}}``).
+    """
 
     TZ = ZoneInfo("Europe/Rome")
 
-    def _now(self) -> str:
-        """ISO 8601 timestamp with Europe/Rome UTC offset."""
-        return datetime.now(tz=self.TZ).isoformat()
+    # (epoch second, "YYYY-MM-DDTHH:MM:SS", "+HH:MM") of the last formatted second
+    _second_cache = (None, "", "")
+
+    def _now(self, created: float | None = None) -> str:
+        """ISO 8601 timestamp with Europe/Rome UTC offset, for created (epoch) or now.
+
+        The date/time prefix and offset are computed once per second; only the
+        microseconds change between records logged in the same second.
+        """
+        if created is None:
+            created = time.time()
+        second = int(created)
+        cached_second, prefix, offset = self._second_cache
+        if second != cached_second:
+            dt = datetime.fromtimestamp(second, tz=self.TZ)
+            prefix = dt.strftime("%Y-%m-%dT%H:%M:%S")
+            offset = dt.isoformat()[19:]
+            self._second_cache = (second, prefix, offset)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}{offset}"
 
     def format(self, record: logging.LogRecord) -> str:
         entry = {
-            "timestamp": self._now(),
+            "timestamp": self._now(record.created),
             "level": record.levelname,
             "app": record.name,
             "message": record.getMessage(),
         }
-        return json.dumps(entry, ensure_ascii=False, default=str)
+        detail = getattr(record, "detail", None)
+        if detail is not None:
+            entry["detail"] = detail
+        return dumps(entry)
 
 
 class NIS2JsonFormatter(AppJsonFormatter):
@@ -28,7 +53,7 @@ class NIS2JsonFormatter(AppJsonFormatter):
 
     def format(self, record: logging.LogRecord) -> str:
         entry = {
-            "timestamp": self._now(),
+            "timestamp": self._now(record.created),
             "level": record.levelname,
             "event_type": getattr(record, "event_type", None),
             "session_id": getattr(record, "session_id", None),
@@ -38,4 +63,4 @@ class NIS2JsonFormatter(AppJsonFormatter):
             "method": getattr(record, "method", None),
             "detail": getattr(record, "detail", {}),
         }
-        return json.dumps(entry, ensure_ascii=False, default=str)
+        return dumps(entry)
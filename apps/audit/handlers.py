@@ -0,0 +1,199 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+
+POLICY_BLOCK = "block"
+POLICY_DROP = "drop"
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler with a bounded queue and an explicit full-queue policy.
+
+    The calling thread only merges the message and enqueues the record;
+    formatting and file I/O happen on the QueueListener thread configured via
+    LOGGING (dictConfig attaches it as ``self.listener``).
+
+    policy="block" waits up to block_timeout seconds for space and then writes
+    the record inline, so no record is ever lost (NIS2 audit trail); without
+    a listener to write it, it keeps waiting for space.
+    policy="drop" discards records while the queue is full, counts them in
+    ``dropped`` and logs a summary once space is available again.
+    While the listener is not running (before start-up, after shutdown)
+    records are written inline.
+    """
+
+    def __init__(self, queue, policy=POLICY_BLOCK, block_timeout=None):
+        super().__init__(queue)
+        if policy not in (POLICY_BLOCK, POLICY_DROP):
+            raise ValueError(f"Unknown queue policy: {policy!r}")
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self._pending_drops = 0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record):
+        """Snapshot the message; leave formatting to the listener's handlers."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        listener = self.listener
+        if listener is not None and listener._thread is None:
+            listener.handle(record)
+        elif self.policy == POLICY_DROP:
+            self._enqueue_or_drop(record)
+        else:
+            try:
+                self.queue.put(record, timeout=self.block_timeout)
+            except queue.Full:
+                if listener is None:
+                    # No listener to write inline: wait for whoever drains the queue.
+                    self.queue.put(record)
+                else:
+                    listener.handle(record)
+
+    def _enqueue_or_drop(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+                self._pending_drops += 1
+            return
+        if self._pending_drops:
+            with self._drop_lock:
+                count, self._pending_drops = self._pending_drops, 0
+            summary = logging.makeLogRecord({
+                "name": record.name,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{count} log records dropped: queue full",
+                "event_type": "log.records.dropped",
+                "detail": {"count": count},
+            })
+            try:
+                self.queue.put_nowait(summary)
+            except queue.Full:
+                with self._drop_lock:
+                    self._pending_drops += count
+
+
+class AuditDatabaseHandler(logging.Handler):
+    """
+    Store audit records in the AuditEvent table in batches (optional DB sink).
+
+    Sits behind the audit queue handler, so it runs on the listener thread.
+    Rows are written with one bulk_create when batch_size records are
+    buffered, flush_interval seconds after the first buffered record, and on
+    close. The monthly partition is created on first use. A failed write is
+    reported through handleError; the JSON-lines audit log is unaffected.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=2.0, using="default"):
+        super().__init__()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.using = using
+        self._buffer = []
+        self._timer = None
+        self._ensured_months = set()
+
+    def emit(self, record):
+        self._buffer.append(self._event_fields(record))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            rows, self._buffer = self._buffer, []
+            if rows:
+                self._write(rows)
+
+    def close(self):
+        self.flush()
+        super().close()
+
+    @staticmethod
+    def _event_fields(record):
+        def text(name, max_length):
+            value = getattr(record, name, None)
+            return str(value)[:max_length] if value else None
+
+        return {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc),
+            "level": record.levelname,
+            "event_type": text("event_type", 64) or record.getMessage()[:64],
+            "user": text("user", 150) or "",
+            "ip": text("ip", 45),
+            "session_id": text("session_id", 64),
+            "path": text("path", 4096),
+            "method": text("method", 10),
+            "detail": getattr(record, "detail", None) or {},
+        }
+
+    def _write(self, rows):
+        # Imported lazily: handlers are built while logging is configured,
+        # before the app registry is ready.
+        from django.db import connections
+
+        from apps.audit.models import AuditEvent
+        from apps.audit.partitions import ensure_partition, month_start
+
+        connection = connections[self.using]
+        try:
+            for month in {month_start(row["timestamp"]) for row in rows} - self._ensured_months:
+                ensure_partition(month, self.using)
+                self._ensured_months.add(month)
+            AuditEvent.objects.using(self.using).bulk_create([AuditEvent(**row) for row in rows])
+        except Exception:
+            self.handleError(logging.makeLogRecord({
+                "name": "audit", "msg": f"{len(rows)} audit events not stored in the database",
+            }))
+        finally:
+            # Return the connection (to the pool) between batches.
+            if not connection.in_atomic_block:
+                connection.close()
+
+
+_started = False
+
+
+def _queue_handlers():
+    handlers = (logging.getHandlerByName(name) for name in logging.getHandlerNames())
+    return [
+        h for h in handlers
+        if isinstance(h, BoundedQueueHandler) and h.listener is not None
+    ]
+
+
+def start_queue_listeners():
+    """Start the listener thread of every configured BoundedQueueHandler."""
+    global _started
+    for handler in _queue_handlers():
+        if handler.listener._thread is None:
+            handler.listener.start()
+    if not _started:
+        atexit.register(stop_queue_listeners)
+        _started = True
+
+
+def stop_queue_listeners():
+    """Drain the queues into the target handlers and stop the listener threads."""
+    for handler in _queue_handlers():
+        if handler.listener._thread is not None:
+            handler.listener.stop()
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.audit.partitions import (
+    add_months,
+    drop_partitions_before,
+    ensure_partition,
+    is_partitioned,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming monthly partitions of the audit event table and drop the "
+        "partitions older than the retention period. Safe to run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead", type=int, default=2,
+            help="Months to create ahead of the current one (default: 2)",
+        )
+        parser.add_argument(
+            "--retention-months", type=int, default=settings.AUDIT_DB_RETENTION_MONTHS,
+            help="Full months kept before the current one (default: AUDIT_DB_RETENTION_MONTHS)",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report the partitions that would be dropped without dropping them",
+        )
+
+    def handle(self, *args, **options):
+        current = month_start(timezone.now())
+        cutoff = add_months(current, -options["retention_months"])
+
+        if not is_partitioned():
+            drop_partitions_before(cutoff, dry_run=options["dry_run"])
+            verb = "would delete" if options["dry_run"] else "deleted"
+            self.stdout.write(f"Table is not partitioned: {verb} events before {cutoff:%Y-%m}.")
+            return
+
+        if not options["dry_run"]:
+            for offset in range(options["ahead"] + 1):
+                ensure_partition(add_months(current, offset))
+        self.stdout.write(
+            f"Partitions ensured from {current:%Y-%m} to {add_months(current, options['ahead']):%Y-%m}."
+        )
+
+        dropped = drop_partitions_before(cutoff, dry_run=options["dry_run"])
+        verb = "Would drop" if options["dry_run"] else "Dropped"
+        for name in dropped:
+            self.stdout.write(self.style.WARNING(f"  {verb} {name}"))
+        self.stdout.write(f"{verb} {len(dropped)} partition(s) older than {cutoff:%Y-%m}.")
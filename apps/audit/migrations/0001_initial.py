@@ -0,0 +1,67 @@
+# Generated by Django 6.1.2 on 2026-10-18 23:01
+
+from django.db import migrations, models
+
+# On PostgreSQL the table is recreated range-partitioned by month (it is empty
+# at this point). Partitions are created on demand by the DB sink and ahead of
+# time by `manage.py audit_partitions` (apps.audit.partitions). The partition
+# key must be part of the primary key.
+PARTITIONED_TABLE_SQL = [
+    """
+    CREATE TABLE "audit_auditevent" (
+        "id" bigint GENERATED BY DEFAULT AS IDENTITY,
+        "timestamp" timestamp with time zone NOT NULL,
+        "level" varchar(10) NOT NULL,
+        "event_type" varchar(64) NOT NULL,
+        "user" varchar(150) NOT NULL,
+        "ip" varchar(45) NULL,
+        "session_id" varchar(64) NULL,
+        "path" text NULL,
+        "method" varchar(10) NULL,
+        "detail" jsonb NOT NULL,
+        PRIMARY KEY ("id", "timestamp")
+    ) PARTITION BY RANGE ("timestamp")
+    """,
+    'CREATE INDEX "audit_event_user_ts_idx" ON "audit_auditevent" ("event_type", "user", "timestamp")',
+    'CREATE INDEX "audit_event_ts_idx" ON "audit_auditevent" ("timestamp")',
+]
+
+
+def partition_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # delete_model also discards the index statements deferred by CreateModel
+    schema_editor.delete_model(apps.get_model("audit", "AuditEvent"))
+    for sql in PARTITIONED_TABLE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField()),
+                ('level', models.CharField(max_length=10)),
+                ('event_type', models.CharField(max_length=64)),
+                ('user', models.CharField(max_length=150)),
+                ('ip', models.CharField(blank=True, max_length=45, null=True)),
+                ('session_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('path', models.TextField(blank=True, null=True)),
+                ('method', models.CharField(blank=True, max_length=10, null=True)),
+                ('detail', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['event_type', 'user', 'timestamp'], name='audit_event_user_ts_idx'), models.Index(fields=['timestamp'], name='audit_event_ts_idx')],
+            },
+        ),
+        migrations.RunPython(partition_table, migrations.RunPython.noop),
+    ]
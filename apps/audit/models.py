@@ -0,0 +1,31 @@
+from django.db import models
+
+
+class AuditEvent(models.Model):
+    """
+    Queryable copy of an audit log entry, written by the optional DB sink.
+
+    The JSON-lines audit log stays the system of record; this table exists for
+    investigations. On PostgreSQL it is range-partitioned by month on
+    ``timestamp`` (see apps.audit.partitions) and its primary key is
+    (id, timestamp); ``id`` alone is still unique.
+    """
+    timestamp = models.DateTimeField()
+    level = models.CharField(max_length=10)
+    event_type = models.CharField(max_length=64)
+    user = models.CharField(max_length=150)
+    ip = models.CharField(max_length=45, null=True, blank=True)
+    session_id = models.CharField(max_length=64, null=True, blank=True)
+    path = models.TextField(null=True, blank=True)
+    method = models.CharField(max_length=10, null=True, blank=True)
+    detail = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["event_type", "user", "timestamp"], name="audit_event_user_ts_idx"),
+            models.Index(fields=["timestamp"], name="audit_event_ts_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.timestamp:%Y-%m-%d %H:%M:%S} {self.event_type} {self.user}"
@@ -0,0 +1,96 @@
+"""
+Monthly partitions of the audit event table.
+
+On PostgreSQL ``audit_auditevent`` is range-partitioned on ``timestamp`` with
+one partition per calendar month (UTC), named ``audit_auditevent_pYYYYMM``.
+Partitions are created on demand by the DB sink and ahead of time by
+``manage.py audit_partitions``, which also enforces retention by dropping
+whole partitions. Other databases (local SQLite) have a single plain table:
+partition creation is a no-op and retention deletes rows instead.
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connections
+
+TABLE = "audit_auditevent"
+_PARTITION_RE = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value) -> date:
+    """First day of the (UTC) month containing a date or datetime."""
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc) if value.tzinfo else value
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def is_partitioned(using="default") -> bool:
+    return connections[using].vendor == "postgresql"
+
+
+def ensure_partition(month: date, using="default") -> bool:
+    """Create the partition for month if missing. Returns False when not partitioned."""
+    if not is_partitioned(using):
+        return False
+    lower = month.isoformat()
+    upper = add_months(month, 1).isoformat()
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{partition_name(month)}" PARTITION OF "{TABLE}" '
+            f"FOR VALUES FROM ('{lower} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+        )
+    return True
+
+
+def list_partitions(using="default") -> list[tuple[str, date]]:
+    """Return [(name, month)] of the existing monthly partitions, oldest first."""
+    if not is_partitioned(using):
+        return []
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = %s",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def drop_partitions_before(cutoff: date, using="default", dry_run=False) -> list[str]:
+    """
+    Drop every monthly partition that ends on or before cutoff (a month start).
+
+    Without partitioning, deletes the rows older than cutoff instead and
+    returns an empty list.
+    """
+    if not is_partitioned(using):
+        if not dry_run:
+            from apps.audit.models import AuditEvent
+
+            cutoff_dt = datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)
+            AuditEvent.objects.using(using).filter(timestamp__lt=cutoff_dt).delete()
+        return []
+
+    expired = [name for name, month in list_partitions(using) if month < cutoff]
+    if not dry_run:
+        with connections[using].cursor() as cursor:
+            for name in expired:
+                cursor.execute(f'DROP TABLE "{name}"')
+    return expired
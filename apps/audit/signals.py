@@ -3,6 +3,11 @@ Signal handlers for NIS2 audit events.
 
 authz.group.changed: fires when a user's group memberships actually change.
 
+The OIDC login sync (AzureOIDCBackend.sync_user) diffs memberships itself,
+writes the through table in bulk (no m2m_changed) and calls
+emit_group_change with the diff. The handlers below cover every other
+user.groups.add/remove (admin, shell, scripts).
+
 Strategy:
   - pre_remove:  snapshot the full group set into thread-local storage.
   - post_remove: schedule a deferred emit via on_commit for standalone removes.
@@ -30,15 +35,8 @@ audit_logger = logging.getLogger("audit")
 _tl = threading.local()
 
 
-def _emit_group_change(username, added_pks, removed_pks):
-    added_names = (
-        list(Group.objects.filter(pk__in=added_pks).values_list("name", flat=True))
-        if added_pks else []
-    )
-    removed_names = (
-        list(Group.objects.filter(pk__in=removed_pks).values_list("name", flat=True))
-        if removed_pks else []
-    )
+def emit_group_change(username, added_names, removed_names, changed_by="oidc_sync"):
+    """Emit authz.group.changed for a precomputed diff of group names."""
     if not added_names and not removed_names:
         return
     audit_logger.info("authz.group.changed", extra={
@@ -46,13 +44,25 @@ def _emit_group_change(username, added_pks, removed_pks):
         "user": username,
         "ip": None, "session_id": None, "path": None, "method": None,
         "detail": {
-            "groups_added": added_names,
-            "groups_removed": removed_names,
-            "changed_by": "oidc_sync",
+            "groups_added": sorted(added_names),
+            "groups_removed": sorted(removed_names),
+            "changed_by": changed_by,
         },
     })
 
 
+def _emit_group_change(username, added_pks, removed_pks):
+    pks = set(added_pks) | set(removed_pks)
+    if not pks:
+        return
+    names = dict(Group.objects.filter(pk__in=pks).values_list("pk", "name"))
+    emit_group_change(
+        username,
+        added_names=[names[pk] for pk in added_pks if pk in names],
+        removed_names=[names[pk] for pk in removed_pks if pk in names],
+    )
+
+
 @receiver(m2m_changed, sender=User.groups.through, dispatch_uid="audit.on_user_groups_changed")
 def on_user_groups_changed(sender, instance, action, pk_set, **kwargs):
     if action == "pre_remove" and pk_set:
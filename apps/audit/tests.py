@@ -53,6 +53,14 @@ class AppJsonFormatterTest(TestCase):
         data = json.loads(fmt.format(self._make_record(msg="hello world")))
         self.assertEqual(data["message"], "hello world")
 
+    def test_detail_is_included_only_when_present(self):
+        from apps.audit.formatters import AppJsonFormatter
+        fmt = AppJsonFormatter()
+        self.assertNotIn("detail", json.loads(fmt.format(self._make_record())))
+        record = self._make_record()
+        record.detail = {"upstream_calls": 3}
+        self.assertEqual(json.loads(fmt.format(record))["detail"], {"upstream_calls": 3})
+
     def test_timestamp_is_iso8601_with_utc_offset(self):
         from apps.audit.formatters import AppJsonFormatter
         fmt = AppJsonFormatter()
@@ -633,6 +641,8 @@ class ReportDataAccessEventTest(TestCase):
 class ArcGISQueryEventTest(TestCase):
 
     def setUp(self):
+        from django.core.cache import cache
+        cache.clear()  # report rows are cached per WHERE clause
         self.user = User.objects.create_user("arcgisuser", password="pass")
         group = Group.objects.create(name="arcgis_group")
         self.user.groups.add(group)
@@ -648,7 +658,7 @@ class ArcGISQueryEventTest(TestCase):
 
     def test_get_data_emits_data_arcgis_queried(self):
         fake_result = {"features": [{"attributes": {}}]}
-        with patch("apps.reports.views.api.query_feature_layer", return_value=fake_result), \
+        with patch("apps.core.services.arcgis.ArcGISService.query_layer", return_value=fake_result), \
              self.assertLogs("audit", level="INFO") as cm:
             self.client.get("/api/data/")
         event_types = [r.event_type for r in cm.records]
@@ -656,7 +666,7 @@ class ArcGISQueryEventTest(TestCase):
 
     def test_arcgis_queried_detail_contains_record_count(self):
         fake_result = {"features": [{"attributes": {}}, {"attributes": {}}]}
-        with patch("apps.reports.views.api.query_feature_layer", return_value=fake_result), \
+        with patch("apps.core.services.arcgis.ArcGISService.query_layer", return_value=fake_result), \
              self.assertLogs("audit", level="INFO") as cm:
             self.client.get("/api/data/")
         record = next(r for r in cm.records if r.event_type == "data.arcgis.queried")
@@ -687,3 +697,295 @@ class SegnalazioneDataAccessEventTest(TestCase):
             self.client.get(reverse("segnalazioni:segnalazioni_list"))
         event_types = [r.event_type for r in cm.records]
         self.assertIn("data.segnalazione.viewed", event_types)
+
+
+import queue
+import threading
+import time
+from logging.handlers import QueueListener
+
+from apps.audit.handlers import BoundedQueueHandler
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class BoundedQueueHandlerTest(SimpleTestCase):
+    """Audit/app records go through a bounded queue with a configurable full-queue policy."""
+
+    def _handler(self, policy, maxsize=1, block_timeout=0.01):
+        target = _ListHandler()
+        handler = BoundedQueueHandler(queue.Queue(maxsize), policy=policy, block_timeout=block_timeout)
+        handler.listener = QueueListener(handler.queue, target)
+        return handler, target
+
+    def test_audit_and_apps_loggers_use_running_queue_handlers(self):
+        for name in ("audit", "apps"):
+            with self.subTest(logger=name):
+                handlers = logging.getLogger(name).handlers
+                self.assertEqual(len(handlers), 1)
+                self.assertIsInstance(handlers[0], BoundedQueueHandler)
+                self.assertIsNotNone(handlers[0].listener._thread)
+
+    def test_audit_logger_blocks_instead_of_dropping(self):
+        self.assertEqual(logging.getLogger("audit").handlers[0].policy, "block")
+
+    def test_record_is_written_by_listener_thread(self):
+        handler, target = self._handler("block", maxsize=10)
+        handler.listener.start()
+        try:
+            handler.handle(_make_record())
+        finally:
+            handler.listener.stop()
+        self.assertEqual([r.getMessage() for r in target.records], ["test-event"])
+
+    def test_message_args_are_merged_before_enqueue(self):
+        handler, _ = self._handler("drop", maxsize=10)
+        handler.listener._thread = object()  # pretend running; nothing consumes
+        args = {"n": 1}
+        record = logging.LogRecord("apps", logging.INFO, "", 0, "value %(n)s", (args,), None)
+        handler.handle(record)
+        args["n"] = 2
+        self.assertEqual(handler.queue.get_nowait().getMessage(), "value 1")
+
+    def test_stopped_listener_writes_inline(self):
+        handler, target = self._handler("drop")
+        handler.handle(_make_record())
+        self.assertEqual(len(target.records), 1)
+        self.assertTrue(handler.queue.empty())
+
+    def test_drop_policy_counts_and_reports_dropped_records(self):
+        handler, _ = self._handler("drop", maxsize=2)
+        handler.listener._thread = object()
+        for _ in range(4):
+            handler.handle(_make_record())
+        self.assertEqual(handler.dropped, 2)
+        handler.queue.get_nowait()
+        handler.queue.get_nowait()
+        handler.handle(_make_record())
+        handler.queue.get_nowait()
+        summary = handler.queue.get_nowait()
+        self.assertEqual(summary.event_type, "log.records.dropped")
+        self.assertEqual(summary.detail, {"count": 2})
+
+    def test_block_policy_writes_inline_after_timeout(self):
+        handler, target = self._handler("block", maxsize=1)
+        handler.listener._thread = object()
+        handler.handle(_make_record())
+        handler.handle(_make_record())  # queue full: falls back to the target handler
+        self.assertEqual(len(target.records), 1)
+        self.assertEqual(handler.queue.qsize(), 1)
+
+    def test_block_policy_without_listener_waits_for_space(self):
+        handler = BoundedQueueHandler(queue.Queue(1), policy="block", block_timeout=0.01)
+        handler.handle(_make_record())
+        writer = threading.Thread(target=handler.handle, args=(_make_record(),))
+        with patch.object(handler, "handleError") as handle_error:
+            writer.start()
+            time.sleep(0.05)  # past block_timeout: still waiting, not failed
+            self.assertTrue(writer.is_alive())
+            handler.queue.get_nowait()
+            writer.join(timeout=5)
+        self.assertFalse(writer.is_alive())
+        handle_error.assert_not_called()
+        self.assertEqual(handler.queue.qsize(), 1)
+
+
+class FormatterTimestampTest(SimpleTestCase):
+    """Timestamps come from the record's creation time, not from formatting time."""
+
+    def test_timestamp_uses_record_created(self):
+        from datetime import datetime
+        from zoneinfo import ZoneInfo
+
+        from apps.audit.formatters import AppJsonFormatter
+
+        record = _make_record()
+        record.created = 1700000000.25
+        expected = datetime.fromtimestamp(1700000000.25, tz=ZoneInfo("Europe/Rome")).isoformat()
+        for formatter in (AppJsonFormatter(), NIS2JsonFormatter()):
+            with self.subTest(formatter=type(formatter).__name__):
+                self.assertEqual(json.loads(formatter.format(record))["timestamp"], expected)
+
+    def test_cached_second_does_not_leak_between_seconds(self):
+        from apps.audit.formatters import AppJsonFormatter
+
+        fmt = AppJsonFormatter()
+        first = fmt._now(1700000000.5)
+        second = fmt._now(1700000001.0)
+        self.assertTrue(first.startswith("2023-11-14T23:13:20.500000"))
+        self.assertTrue(second.startswith("2023-11-14T23:13:21.000000"))
+
+
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+
+from apps.audit import partitions
+from apps.audit.handlers import AuditDatabaseHandler
+from apps.audit.models import AuditEvent
+
+
+def _audit_record(event_type="data.report.viewed", user="mario", created=None, **extra):
+    record = _make_record(
+        event_type=event_type, user=user, ip="10.0.0.1", session_id="s1",
+        path="/reports/detail/", method="GET", detail={"id": 1}, **extra,
+    )
+    if created is not None:
+        record.created = created
+    return record
+
+
+class AuditDatabaseHandlerTest(TestCase):
+    """The DB sink buffers audit records and writes them with bulk_create."""
+
+    def test_writes_a_batch_when_full(self):
+        handler = AuditDatabaseHandler(batch_size=2, flush_interval=60)
+        month = partitions.month_start(datetime.now(dt_timezone.utc))
+        partitions.ensure_partition(month)
+        handler._ensured_months.add(month)
+        with self.assertNumQueries(1):
+            handler.handle(_audit_record())
+            handler.handle(_audit_record(user="luigi"))
+        self.assertEqual(AuditEvent.objects.count(), 2)
+        self.assertIsNone(handler._timer)
+
+    def test_partial_batch_waits_for_flush(self):
+        handler = AuditDatabaseHandler(batch_size=10, flush_interval=60)
+        handler.handle(_audit_record())
+        self.assertEqual(AuditEvent.objects.count(), 0)
+        self.assertIsNotNone(handler._timer)
+        handler.flush()
+        self.assertEqual(AuditEvent.objects.count(), 1)
+        self.assertIsNone(handler._timer)
+
+    def test_record_fields_are_stored(self):
+        handler = AuditDatabaseHandler(batch_size=1)
+        handler.handle(_audit_record(created=1700000000.0))
+        event = AuditEvent.objects.get()
+        self.assertEqual(event.timestamp, datetime(2023, 11, 14, 22, 13, 20, tzinfo=dt_timezone.utc))
+        self.assertEqual(
+            (event.event_type, event.user, event.ip, event.session_id, event.method),
+            ("data.report.viewed", "mario", "10.0.0.1", "s1", "GET"),
+        )
+        self.assertEqual(event.detail, {"id": 1})
+
+    def test_failed_write_is_reported_not_raised(self):
+        handler = AuditDatabaseHandler(batch_size=1)
+        with patch.object(partitions, "ensure_partition", side_effect=RuntimeError("db down")), \
+                patch.object(handler, "handleError") as handle_error:
+            handler.handle(_audit_record())
+        handle_error.assert_called_once()
+
+
+class AuditPartitionsTest(TestCase):
+
+    def test_month_arithmetic(self):
+        self.assertEqual(partitions.add_months(date(2026, 11, 1), 2), date(2027, 1, 1))
+        self.assertEqual(partitions.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(partitions.partition_name(date(2026, 3, 1)), "audit_auditevent_p202603")
+
+    def test_month_start_uses_utc(self):
+        from zoneinfo import ZoneInfo
+        local = datetime(2026, 11, 1, 0, 30, tzinfo=ZoneInfo("Europe/Rome"))
+        self.assertEqual(partitions.month_start(local), date(2026, 10, 1))
+
+    def test_postgres_retention_drops_whole_partitions(self):
+        existing = [
+            ("audit_auditevent_p202508", date(2025, 8, 1)),
+            ("audit_auditevent_p202509", date(2025, 9, 1)),
+            ("audit_auditevent_p202510", date(2025, 10, 1)),
+        ]
+        cursor = MagicMock()
+        conn = MagicMock(vendor="postgresql")
+        conn.cursor.return_value.__enter__.return_value = cursor
+        with patch.object(partitions, "connections", {"default": conn}), \
+                patch.object(partitions, "list_partitions", return_value=existing):
+            dropped = partitions.drop_partitions_before(date(2025, 10, 1))
+        self.assertEqual(dropped, ["audit_auditevent_p202508", "audit_auditevent_p202509"])
+        executed = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertEqual(executed, [
+            'DROP TABLE "audit_auditevent_p202508"',
+            'DROP TABLE "audit_auditevent_p202509"',
+        ])
+
+    def test_retention_removes_old_events(self):
+        AuditDatabaseHandler(batch_size=1).handle(_audit_record(created=1700000000.0))  # 2023-11
+        AuditDatabaseHandler(batch_size=1).handle(_audit_record())  # now
+        out = StringIO()
+        call_command("audit_partitions", "--retention-months", "12", stdout=out)
+        if partitions.is_partitioned():
+            self.assertIn("Dropped audit_auditevent_p202311", out.getvalue())
+        else:
+            self.assertIn("not partitioned", out.getvalue())
+        self.assertEqual(AuditEvent.objects.count(), 1)
+
+
+@override_settings(
+    MIDDLEWARE=_TEST_MIDDLEWARE,
+    AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"],
+)
+class AuditEventApiTest(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("auditor", password="pass")
+        handler = AuditDatabaseHandler(batch_size=10)
+        handler.handle(_audit_record(user="mario"))
+        handler.handle(_audit_record(user="luigi", event_type="auth.login.failure"))
+        handler.flush()
+        self.url = reverse("audit:event_list")
+
+    def test_filters_by_user_and_event_type(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {"user": "luigi", "event_type": "auth.login.failure"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([e["user"] for e in data["data"]], ["luigi"])
+        self.assertFalse(data["has_next"])
+
+    def test_pagination_reports_has_next(self):
+        self.client.force_login(self.admin)
+        data = self.client.get(self.url, {"per_page": 1}).json()
+        self.assertEqual(len(data["data"]), 1)
+        self.assertTrue(data["has_next"])
+
+    def test_invalid_date_returns_400(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(self.url, {"date_from": "yesterday"}).status_code, 400)
+
+    def test_query_is_itself_audited(self):
+        self.client.force_login(self.admin)
+        with self.assertLogs("audit", level="INFO") as cm:
+            self.client.get(self.url, {"user": "mario"})
+        record = next(r for r in cm.records if r.event_type == "audit.events.queried")
+        self.assertEqual(record.detail["filters"]["user"], "mario")
+
+    def test_requires_view_permission(self):
+        user = User.objects.create_user("viewer", password="pass")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        user.user_permissions.add(Permission.objects.get(codename="view_auditevent"))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+
+@override_settings(AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"])
+class AuditEventApiServiceAccessTest(TestCase):
+    """/api/audit/events/ behind the full middleware stack, including ServiceAccessMiddleware."""
+
+    def test_non_superuser_with_view_permission_is_not_denied_by_service_access(self):
+        user = User.objects.create_user("viewer", password="pass")
+        user.user_permissions.add(Permission.objects.get(codename="view_auditevent"))
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(reverse("audit:event_list")).status_code, 200)
+
+    def test_permission_is_still_required(self):
+        self.client.force_login(User.objects.create_user("viewer", password="pass"))
+        self.assertEqual(self.client.get(reverse("audit:event_list")).status_code, 403)
@@ -0,0 +1,10 @@
+"""URL configuration for audit app - API views."""
+
+from django.urls import path
+from .views import event_list
+
+app_name = 'audit'
+
+urlpatterns = [
+    path('events/', event_list, name='event_list'),
+]
@@ -0,0 +1,80 @@
+"""API views over the audit event store (AUDIT_DB_ENABLED)."""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, permission_required
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from apps.audit.models import AuditEvent
+from apps.audit.utils import emit_audit_event
+from apps.core.fastjson import FastJsonResponse
+from config.strings import UI_STRINGS
+
+# Query parameters matched exactly against AuditEvent fields
+EXACT_FILTERS = ("event_type", "user", "ip", "session_id")
+
+
+def _parse_day(value):
+    """Return the aware start of a YYYY-MM-DD day in TIME_ZONE, or None if blank."""
+    if not value:
+        return None
+    day = datetime.strptime(value, "%Y-%m-%d").date()
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+@login_required
+@permission_required("audit.view_auditevent", raise_exception=True)
+@require_GET
+def event_list(request):
+    """
+    Return audit events, newest first, filtered by event_type, user, ip,
+    session_id and a date_from/date_to day range (bounds on timestamp let
+    PostgreSQL skip partitions outside the range).
+
+    Pagination returns ``has_next`` instead of a total to avoid counting
+    every matching row.
+    """
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+        per_page = min(max(1, int(request.GET.get("per_page", 50))), settings.MAX_ITEMS_PER_PAGE)
+        date_from = _parse_day(request.GET.get("date_from", "").strip())
+        date_to = _parse_day(request.GET.get("date_to", "").strip())
+    except ValueError:
+        return FastJsonResponse({"error": UI_STRINGS["error_filter_param"]}, status=400)
+
+    filters = {
+        name: request.GET[name].strip()
+        for name in EXACT_FILTERS
+        if request.GET.get(name, "").strip()
+    }
+    events = AuditEvent.objects.filter(**filters)
+    if date_from:
+        events = events.filter(timestamp__gte=date_from)
+    if date_to:
+        events = events.filter(timestamp__lt=date_to + timedelta(days=1))
+
+    offset = (page - 1) * per_page
+    rows = list(
+        events.order_by("-timestamp", "-id").values(
+            "timestamp", "level", "event_type", "user", "ip",
+            "session_id", "path", "method", "detail",
+        )[offset:offset + per_page + 1]
+    )
+
+    emit_audit_event(request, "audit.events.queried", detail={
+        "filters": {
+            **filters,
+            "date_from": request.GET.get("date_from", ""),
+            "date_to": request.GET.get("date_to", ""),
+        },
+        "record_count": min(len(rows), per_page),
+    })
+
+    return FastJsonResponse({
+        "data": rows[:per_page],
+        "page": page,
+        "per_page": per_page,
+        "has_next": len(rows) > per_page,
+    })
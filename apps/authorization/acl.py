@@ -0,0 +1,147 @@
+"""
+Cached service ACLs.
+
+Authorization runs on every authenticated request, so the data it needs is
+cached instead of queried each time:
+
+- ACL map: ``{app_label: frozenset(group_ids)}`` for all active services,
+  stored in the Django cache under a version token and memoised per process.
+  Any change to a Service, its allowed groups or a Group replaces the token.
+- User group ids: stored in the user's session together with the user's
+  group version token, which is replaced whenever the user's groups change.
+- Accessible services: the Service rows visible to a group set, cached
+  under the ACL version and the group set (shared by users with the same
+  groups) for the sidebar and home page cards.
+
+In the steady state an access check costs a few cache reads and no queries.
+"""
+
+import hashlib
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from .models import Service
+
+ACL_VERSION_KEY = "authz_acl_version"
+ACL_CACHE_KEY_PREFIX = "authz_acl_"
+SERVICES_CACHE_KEY_PREFIX = "authz_services_"
+USER_GROUPS_VERSION_KEY_PREFIX = "authz_user_groups_version_"
+SESSION_GROUP_IDS_KEY = "_authz_group_ids"
+
+# Versioned entries are never reused once the version moves on; the timeout
+# only bounds how long superseded entries linger in the cache.
+ACL_CACHE_TIMEOUT = 60 * 60 * 24
+
+_local_acl = {"version": None, "acl": None}
+_local_acl_lock = threading.Lock()
+
+
+def _current_version(key):
+    """Return the version token stored at key, creating one if missing."""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    """Replace the version token so every entry derived from it is stale."""
+    cache.set(key, uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_acl():
+    """Invalidate the ACL map (call after any Service or Group change)."""
+    _bump_version(ACL_VERSION_KEY)
+
+
+def invalidate_user_groups(user_pk):
+    """Invalidate the cached group ids of one user."""
+    _bump_version(f"{USER_GROUPS_VERSION_KEY_PREFIX}{user_pk}")
+
+
+def _build_acl():
+    acl = {
+        app_label: set()
+        for app_label in Service.objects.filter(is_active=True).values_list("app_label", flat=True)
+    }
+    rows = Service.allowed_groups.through.objects.filter(
+        service__is_active=True
+    ).values_list("service__app_label", "group_id")
+    for app_label, group_id in rows:
+        acl[app_label].add(group_id)
+    return {app_label: frozenset(ids) for app_label, ids in acl.items()}
+
+
+def get_acl():
+    """Return ``{app_label: frozenset(group_ids)}`` for all active services."""
+    version = _current_version(ACL_VERSION_KEY)
+    if _local_acl["version"] == version:
+        return _local_acl["acl"]
+
+    cache_key = f"{ACL_CACHE_KEY_PREFIX}{version}"
+    acl = cache.get(cache_key)
+    if acl is None:
+        acl = _build_acl()
+        cache.set(cache_key, acl, timeout=ACL_CACHE_TIMEOUT)
+
+    with _local_acl_lock:
+        _local_acl["version"] = version
+        _local_acl["acl"] = acl
+    return acl
+
+
+def get_user_group_ids(request):
+    """Return the request user's group ids, cached in the session."""
+    user = request.user
+    version = _current_version(f"{USER_GROUPS_VERSION_KEY_PREFIX}{user.pk}")
+    session = getattr(request, "session", None)
+
+    cached = session.get(SESSION_GROUP_IDS_KEY) if session is not None else None
+    if cached and cached.get("user") == user.pk and cached.get("version") == version:
+        return frozenset(cached["ids"])
+
+    ids = list(user.groups.values_list("id", flat=True))
+    if session is not None:
+        session[SESSION_GROUP_IDS_KEY] = {"user": user.pk, "version": version, "ids": ids}
+    return frozenset(ids)
+
+
+def service_access(request, app_label):
+    """
+    Check the request user's access to a service.
+
+    Returns:
+        None if no active Service exists for app_label, otherwise a bool.
+    """
+    if request.user.is_superuser:
+        return True
+    allowed_group_ids = get_acl().get(app_label)
+    if allowed_group_ids is None:
+        return None
+    return not allowed_group_ids.isdisjoint(get_user_group_ids(request))
+
+
+def get_accessible_services(request):
+    """Return the active Service objects the request user can access, in display order."""
+    if request.user.is_superuser:
+        group_ids = None
+        group_key = "superuser"
+    else:
+        group_ids = get_user_group_ids(request)
+        group_key = ",".join(str(pk) for pk in sorted(group_ids))
+
+    version = _current_version(ACL_VERSION_KEY)
+    digest = hashlib.sha256(group_key.encode("utf-8")).hexdigest()[:32]
+    cache_key = f"{SERVICES_CACHE_KEY_PREFIX}{version}_{digest}"
+
+    services = cache.get(cache_key)
+    if services is None:
+        queryset = Service.objects.filter(is_active=True)
+        if group_ids is not None:
+            queryset = queryset.filter(allowed_groups__in=group_ids).distinct()
+        services = list(queryset)
+        cache.set(cache_key, services, timeout=ACL_CACHE_TIMEOUT)
+    return services
@@ -5,3 +5,6 @@ class AuthorizationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authorization'
     label = 'authorization'
+
+    def ready(self):
+        import apps.authorization.signals  # noqa: F401 — connect ACL cache invalidation
@@ -1,4 +1,4 @@
-from .models import Service
+from .acl import get_accessible_services
 
 
 def accessible_services(request):
@@ -8,18 +8,12 @@ def accessible_services(request):
     - ``accessible_services``: all active services the user can access.
     - ``displayable_services``: subset that have a ``list_url_name`` configured
       and can therefore be rendered as home-page cards.
+    Both come from a single cached list (see ``acl.get_accessible_services``),
+    so rendering a page issues no authorization queries once warm.
     """
     if not hasattr(request, "user") or not request.user.is_authenticated:
         return {"accessible_services": [], "displayable_services": []}
 
-    if request.user.is_superuser:
-        services = Service.objects.filter(is_active=True)
-    else:
-        services = Service.objects.filter(
-            is_active=True,
-            allowed_groups__in=request.user.groups.all()
-        ).distinct()
-
-    displayable = services.exclude(list_url_name="").exclude(list_url_name__isnull=True)
-
+    services = get_accessible_services(request)
+    displayable = [service for service in services if service.list_url_name]
     return {"accessible_services": services, "displayable_services": displayable}
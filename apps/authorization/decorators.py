@@ -1,6 +1,6 @@
 from functools import wraps
 from django.http import HttpResponseForbidden
-from .models import Service
+from .acl import service_access
 
 
 def require_service(app_label):
@@ -11,13 +11,7 @@ def require_service(app_label):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            if request.user.is_superuser:
-                return view_func(request, *args, **kwargs)
-            try:
-                service = Service.objects.get(app_label=app_label, is_active=True)
-            except Service.DoesNotExist:
-                return view_func(request, *args, **kwargs)
-            if not service.user_has_access(request.user):
+            if service_access(request, app_label) is False:
                 return HttpResponseForbidden(
                     "You do not have permission to access this service."
                 )
@@ -1,8 +1,10 @@
+import threading
+
 from django.http import HttpResponseForbidden
-from django.urls import resolve, Resolver404
+from django.urls import resolve, Resolver404, get_urlconf
 from django.conf import settings
 
-from .models import Service
+from .acl import service_access
 from apps.audit.utils import emit_audit_event
 
 
@@ -27,6 +29,50 @@ EXEMPT_URL_PREFIXES = getattr(settings, "SERVICE_AUTH_EXEMPT_URLS", [
 # Policy when no Service record exists for an app: "allow" or "deny"
 DEFAULT_POLICY = getattr(settings, "SERVICE_AUTH_DEFAULT_POLICY", "deny")
 
+# Max distinct route keys whose app label is memoised per process
+RESOLVE_CACHE_SIZE = getattr(settings, "SERVICE_AUTH_RESOLVE_CACHE_SIZE", 2048)
+
+_route_labels = {}
+_route_labels_lock = threading.Lock()
+
+
+def _route_key(path):
+    # "/api/image/3/101/7/" -> "/api/image"; "/reports/" -> "/reports/"
+    return "/".join(path.split("/", 3)[:3])
+
+
+def resolve_app_label(path, urlconf=None):
+    """
+    Return the URL namespace (or top-level module) serving path, or None.
+
+    Memoised per route key, the first two segments of the path: every route
+    of this URLconf sharing them belongs to one namespace (checked by
+    ResolveAppLabelMemoTest), so paths carrying ids such as
+    /api/image/<layer>/<oid>/<aid>/ share one entry. Unresolved paths are not
+    memoised, so a bogus path never stands in for the valid routes under
+    its key. The memo is cleared when ROOT_URLCONF changes (see
+    apps.authorization.signals) and when it reaches RESOLVE_CACHE_SIZE.
+    """
+    key = (_route_key(path), urlconf)
+    label = _route_labels.get(key)
+    if label is not None:
+        return label
+    try:
+        match = resolve(path, urlconf)
+        label = match.app_name or match.func.__module__.split(".")[0]
+    except (Resolver404, AttributeError, IndexError):
+        return None
+    with _route_labels_lock:
+        if len(_route_labels) >= RESOLVE_CACHE_SIZE:
+            _route_labels.clear()
+        _route_labels[key] = label
+    return label
+
+
+def clear_resolve_cache():
+    with _route_labels_lock:
+        _route_labels.clear()
+
 
 class ServiceAccessMiddleware:
     """
@@ -34,6 +80,7 @@ class ServiceAccessMiddleware:
 
     Resolves the current request URL to a Django URL namespace (app_name),
     then checks if the user belongs to a Group that has access to that service.
+    Service ACLs and user group ids are cached (see apps.authorization.acl).
     """
 
     def __init__(self, get_response):
@@ -53,20 +100,17 @@ class ServiceAccessMiddleware:
             return self.get_response(request)
 
         # Resolve URL to app namespace
-        try:
-            match = resolve(request.path)
-            app_label = match.app_name or match.func.__module__.split(".")[0]
-        except (Resolver404, AttributeError, IndexError):
+        app_label = resolve_app_label(request.path, get_urlconf())
+        if app_label is None:
             return self.get_response(request)
 
         # Skip exempt apps
         if app_label in EXEMPT_APP_LABELS:
             return self.get_response(request)
 
-        # Check service access
-        try:
-            service = Service.objects.get(app_label=app_label, is_active=True)
-        except Service.DoesNotExist:
+        # Check service access against the cached ACL (no queries in steady state)
+        access = service_access(request, app_label)
+        if access is None:
             if DEFAULT_POLICY == "allow":
                 return self.get_response(request)
             emit_audit_event(request, "authz.access.denied", detail={
@@ -78,7 +122,7 @@ class ServiceAccessMiddleware:
                 "Contact your administrator to request access."
             )
 
-        if not service.user_has_access(request.user):
+        if not access:
             emit_audit_event(request, "authz.access.denied", detail={
                 "app_label": app_label,
                 "reason": "group_not_permitted",
@@ -0,0 +1,58 @@
+"""
+Signal handlers that keep the cached service ACLs in sync.
+
+- Service saved/deleted, its allowed groups changed, or a Group deleted:
+  invalidate the ACL map.
+- A user's groups changed (from either side of the relation): invalidate
+  that user's cached group ids.
+- ROOT_URLCONF changed (tests, reloads): clear the route -> app_label memo.
+"""
+
+from django.contrib.auth.models import Group, User
+from django.core.signals import setting_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .acl import invalidate_acl, invalidate_user_groups
+from .middleware import clear_resolve_cache
+from .models import Service
+
+
+@receiver(post_save, sender=Service, dispatch_uid="authorization.service_saved")
+@receiver(post_delete, sender=Service, dispatch_uid="authorization.service_deleted")
+@receiver(post_delete, sender=Group, dispatch_uid="authorization.group_deleted")
+def on_acl_source_changed(sender, **kwargs):
+    invalidate_acl()
+
+
+@receiver(m2m_changed, sender=Service.allowed_groups.through,
+          dispatch_uid="authorization.service_groups_changed")
+def on_service_groups_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_acl()
+
+
+@receiver(m2m_changed, sender=User.groups.through,
+          dispatch_uid="authorization.user_groups_changed")
+def on_user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # user.groups.add/remove/clear — instance is the User.
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_user_groups(instance.pk)
+        return
+
+    # group.user_set.add/remove/clear — instance is the Group.
+    if action == "pre_clear":
+        instance._authz_cleared_user_pks = list(instance.user_set.values_list("pk", flat=True))
+    elif action == "post_clear":
+        for user_pk in getattr(instance, "_authz_cleared_user_pks", []):
+            invalidate_user_groups(user_pk)
+    elif action in ("post_add", "post_remove"):
+        for user_pk in pk_set or ():
+            invalidate_user_groups(user_pk)
+
+
+@receiver(setting_changed, dispatch_uid="authorization.urlconf_changed")
+def on_urlconf_changed(setting, **kwargs):
+    if setting == "ROOT_URLCONF":
+        clear_resolve_cache()
@@ -107,3 +107,171 @@ class HomePageServiceVisibilityTest(TestCase):
         response = self.client.get(reverse("core:home"))
         self.assertEqual(response.status_code, 200)
         self.assertNotContains(response, "grid-container columns-3")
+
+
+from unittest.mock import patch
+
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.authorization.middleware import ServiceAccessMiddleware
+
+
+class ServiceAclCacheTest(TestCase):
+    """ServiceAccessMiddleware uses cached ACLs: no queries once warm, invalidated by signals."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = ServiceAccessMiddleware(lambda request: HttpResponse("ok"))
+        self.user = User.objects.create_user("acluser", password="pass")
+        self.group = Group.objects.create(name="acl_reports_group")
+        self.user.groups.add(self.group)
+        self.service = Service.objects.create(name="Reports", app_label="reports", is_active=True)
+        self.service.allowed_groups.set([self.group])
+        self.session = SessionStore()
+
+    def _request(self):
+        request = self.factory.get(reverse("reports:report_list"))
+        # Fresh user instance per request, as AuthenticationMiddleware would load it.
+        request.user = User.objects.get(pk=self.user.pk)
+        request.session = self.session
+        return request
+
+    def test_allowed_user_passes(self):
+        self.assertEqual(self.middleware(self._request()).status_code, 200)
+
+    def test_steady_state_costs_no_queries(self):
+        self.middleware(self._request())  # warm ACL and session group ids
+        request = self._request()
+        with self.assertNumQueries(0):
+            response = self.middleware(request)
+        self.assertEqual(response.status_code, 200)
+
+    def test_removing_group_from_service_revokes_access(self):
+        self.middleware(self._request())
+        self.service.allowed_groups.remove(self.group)
+        self.assertEqual(self.middleware(self._request()).status_code, 403)
+
+    def test_removing_user_from_group_revokes_access(self):
+        self.middleware(self._request())
+        self.user.groups.remove(self.group)
+        self.assertEqual(self.middleware(self._request()).status_code, 403)
+
+    def test_reverse_group_membership_change_is_seen(self):
+        self.middleware(self._request())
+        self.group.user_set.clear()
+        self.assertEqual(self.middleware(self._request()).status_code, 403)
+
+    def test_deactivating_service_applies_default_policy(self):
+        self.middleware(self._request())
+        self.service.is_active = False
+        self.service.save()
+        self.assertEqual(self.middleware(self._request()).status_code, 403)
+
+
+class ResolveAppLabelMemoTest(TestCase):
+    """resolve_app_label memoises per route key and resets when ROOT_URLCONF changes."""
+
+    def setUp(self):
+        from apps.authorization.middleware import clear_resolve_cache
+        clear_resolve_cache()
+
+    def test_resolves_namespace(self):
+        from apps.authorization.middleware import resolve_app_label
+        self.assertEqual(resolve_app_label("/api/data/"), "reports_api")
+        self.assertIsNone(resolve_app_label("/does-not-exist/"))
+
+    def test_paths_of_one_route_hit_memo(self):
+        from apps.authorization import middleware
+        with patch.object(middleware, "resolve", wraps=middleware.resolve) as resolve:
+            for object_id in range(50):
+                self.assertEqual(middleware.resolve_app_label(f"/api/image/3/{object_id}/7/"), "reports_api")
+            middleware.resolve_app_label("/api/data/")
+            middleware.resolve_app_label("/api/data/")
+        self.assertEqual(resolve.call_count, 2)
+        self.assertEqual(len(middleware._route_labels), 2)
+
+    def test_unresolved_paths_are_not_memoised(self):
+        from apps.authorization import middleware
+        self.assertIsNone(middleware.resolve_app_label("/api/image/x/"))
+        self.assertEqual(middleware.resolve_app_label("/api/image/3/101/7/"), "reports_api")
+        self.assertEqual(middleware._route_labels, {("/api/image", None): "reports_api"})
+
+    def test_route_key_determines_the_namespace_of_every_route(self):
+        import re
+
+        from django.urls import URLResolver, get_resolver, resolve
+
+        from apps.authorization.middleware import resolve_app_label
+
+        def routes(patterns, prefix=""):
+            for pattern in patterns:
+                route = prefix + str(pattern.pattern)
+                if isinstance(pattern, URLResolver):
+                    yield from routes(pattern.url_patterns, route)
+                else:
+                    yield "/" + re.sub(r"<[^>]+>", "1", route)
+
+        checked = 0
+        for path in routes(get_resolver().url_patterns):
+            try:
+                match = resolve(path)
+            except Exception:
+                continue
+            with self.subTest(path=path):
+                expected = match.app_name or match.func.__module__.split(".")[0]
+                self.assertEqual(resolve_app_label(path), expected)
+            checked += 1
+        self.assertGreater(checked, 10)
+
+    def test_urlconf_change_clears_memo(self):
+        from apps.authorization import middleware
+        middleware.resolve_app_label("/api/data/")
+        with override_settings(ROOT_URLCONF="apps.core.urls"):
+            self.assertEqual(middleware._route_labels, {})
+
+
+class AccessibleServicesContextProcessorTest(TestCase):
+    """accessible_services is computed once per group set and cached."""
+
+    def setUp(self):
+        from apps.authorization.context_processors import accessible_services
+        cache.clear()
+        self.processor = accessible_services
+        self.user = User.objects.create_user("ctxuser", password="pass")
+        self.group = Group.objects.create(name="ctx_group")
+        self.user.groups.add(self.group)
+        reports = Service.objects.create(
+            name="Reports", app_label="reports", list_url_name="reports:report_list",
+        )
+        reports.allowed_groups.set([self.group])
+        api = Service.objects.create(name="Reports API", app_label="reports_api")
+        api.allowed_groups.set([self.group])
+        Service.objects.create(name="Hidden", app_label="hidden", list_url_name="core:home")
+        self.session = SessionStore()
+
+    def _request(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+        request.session = self.session
+        return request
+
+    def test_returns_accessible_and_displayable_services(self):
+        context = self.processor(self._request())
+        self.assertEqual([s.name for s in context["accessible_services"]], ["Reports", "Reports API"])
+        self.assertEqual([s.name for s in context["displayable_services"]], ["Reports"])
+
+    def test_warm_render_issues_no_queries(self):
+        self.processor(self._request())
+        request = self._request()
+        with self.assertNumQueries(0):
+            self.processor(request)
+
+    def test_granting_service_is_visible_immediately(self):
+        self.processor(self._request())
+        Service.objects.get(app_label="hidden").allowed_groups.add(self.group)
+        names = [s.name for s in self.processor(self._request())["displayable_services"]]
+        self.assertIn("Hidden", names)
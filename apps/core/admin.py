@@ -1,3 +1,12 @@
 from django.contrib import admin
+from .models import MappingSnapshot
 
-# Register your models here.
+
+@admin.register(MappingSnapshot)
+class MappingSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("app", "updated_at", "field_count")
+    readonly_fields = ("app", "mappings", "updated_at")
+
+    @admin.display(description="Fields")
+    def field_count(self, obj):
+        return len(obj.mappings or {})
@@ -0,0 +1,64 @@
+"""
+Pluggable JSON backend.
+
+Serialises with orjson when it is installed and falls back to the standard
+library json module otherwise. Both backends emit UTF-8 (non-ASCII
+characters unescaped) and pass values they cannot serialise natively to the
+``default`` callable, so the output is the same whichever backend is active.
+Datetimes always go through ``default`` because orjson would otherwise
+format them differently from the stdlib encoders.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumpb(obj, default=str) -> bytes:
+        """Serialise obj to UTF-8 encoded JSON bytes."""
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+
+    def dumps(obj, default=str) -> str:
+        """Serialise obj to a JSON string."""
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS).decode()
+
+else:
+
+    def dumps(obj, default=str) -> str:
+        """Serialise obj to a JSON string."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+    def dumpb(obj, default=str) -> bytes:
+        """Serialise obj to UTF-8 encoded JSON bytes."""
+        return dumps(obj, default=default).encode()
+
+
+_django_default = DjangoJSONEncoder().default
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    Drop-in replacement for JsonResponse using the fast JSON backend.
+
+    Values the backend cannot serialise natively (dates, Decimal, UUID, lazy
+    strings) are converted by DjangoJSONEncoder, as JsonResponse does.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumpb(data, default=_django_default), **kwargs)
@@ -0,0 +1,83 @@
+"""
+Static interval index over sorted arrays (standard library only).
+
+``IntervalIndex`` stores closed intervals sorted by start in ``array('d')``
+columns and lays an implicit binary tree over the array positions: the node
+at position i has level k = number of trailing 1 bits of i, its children are
+i ± 2**(k-1), and ``max_ends[i]`` is the largest end in its subtree (the
+layout of Heng Li's cgranges). An overlap query walks down from the root,
+skipping every subtree whose largest end is before the query and stopping
+at the first start after it, so it costs O(log n + k) for k results instead
+of a scan of the n intervals. The index is built once and never updated;
+it pickles as a few flat arrays.
+"""
+
+from array import array
+
+# Subtrees of this level or below are scanned linearly
+_SCAN_LEVEL = 3
+
+
+class IntervalIndex:
+    """Closed intervals [start, end] with an integer value each, queried by overlap."""
+
+    __slots__ = ("starts", "ends", "max_ends", "values", "max_level")
+
+    def __init__(self, intervals=()):
+        """intervals: iterable of (start, end, value); start and end may come reversed."""
+        ordered = sorted((min(s, e), max(s, e), v) for s, e, v in intervals)
+        self.starts = array("d", (s for s, _, _ in ordered))
+        self.ends = array("d", (e for _, e, _ in ordered))
+        self.values = array("q", (v for _, _, v in ordered))
+        self.max_ends = array("d", self.ends)
+        self.max_level = self._index()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _index(self):
+        ends, max_ends, n = self.ends, self.max_ends, len(self.ends)
+        if not n:
+            return 0
+        # last: largest end of the rightmost complete subtree seen so far,
+        # standing in for right children past the end of the array
+        last_i = (n - 1) & ~1
+        last = ends[last_i]
+        k = 1
+        while 1 << k <= n:
+            x = 1 << (k - 1)
+            for i in range((x << 1) - 1, n, x << 2):
+                right = max_ends[i + x] if i + x < n else last
+                max_ends[i] = max(ends[i], max_ends[i - x], right)
+            last_i = last_i - x if (last_i >> k) & 1 else last_i + x
+            if last_i < n and max_ends[last_i] > last:
+                last = max_ends[last_i]
+            k += 1
+        return k - 1
+
+    def overlapping(self, lo, hi):
+        """Return the values of the intervals overlapping [lo, hi], in start order."""
+        starts, ends, max_ends = self.starts, self.ends, self.max_ends
+        n = len(starts)
+        found = []
+        stack = [((1 << self.max_level) - 1, self.max_level, False)] if n else []
+        while stack:
+            x, k, left_done = stack.pop()
+            if k <= _SCAN_LEVEL:
+                i = x >> k << k
+                stop = min(i + (1 << (k + 1)) - 1, n)
+                while i < stop and starts[i] <= hi:
+                    if ends[i] >= lo:
+                        found.append(i)
+                    i += 1
+            elif not left_done:
+                stack.append((x, k, True))
+                left = x - (1 << (k - 1))
+                if left >= n or max_ends[left] >= lo:
+                    stack.append((left, k - 1, False))
+            elif x < n and starts[x] <= hi:
+                if ends[x] >= lo:
+                    found.append(x)
+                stack.append((x + (1 << (k - 1)), k - 1, False))
+        found.sort()
+        return [self.values[i] for i in found]
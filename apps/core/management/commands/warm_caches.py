@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.services.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-populate the ArcGIS token, CSV mapping, filter option and report list caches. "
+        "Only useful with a shared cache backend (CACHE_BACKEND=redis or file)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Number of caches warmed concurrently (default: 4)",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        results = warm_caches(max_workers=options["workers"])
+        total = time.perf_counter() - start
+
+        failed = 0
+        for name, elapsed, error in sorted(results):
+            if error:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"  {name}: FAILED after {elapsed * 1000:.0f} ms — {error}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"  {name}: {elapsed * 1000:.0f} ms"))
+        self.stdout.write(f"Warmed {len(results) - failed}/{len(results)} caches in {total * 1000:.0f} ms")
+
+        if failed:
+            raise CommandError(f"{failed} cache(s) could not be warmed")
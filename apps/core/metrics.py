@@ -0,0 +1,131 @@
+"""
+Prometheus metrics, exposed at /metrics (internal subnet only, see nginx.conf).
+
+Gunicorn runs several worker processes. When PROMETHEUS_MULTIPROC_DIR is set
+(production: docker/app/gunicorn.conf.py sets it) prometheus_client keeps
+every metric in memory-mapped files in that directory and the /metrics view
+aggregates the files of all workers; gunicorn.conf.py also wipes the
+directory at start-up and drops the files of workers that exit. Without the variable
+(development, tests) the default in-process registry is used.
+
+Cache hit ratios are derived in PromQL from ``app_cache_requests_total``
+(``result`` is ``hit`` or ``miss``); thread saturation from
+``app_requests_in_progress / app_worker_threads``.
+"""
+
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    'app_request_duration_seconds',
+    'Request latency by URL name.',
+    ['view', 'method', 'status'],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'app_requests_in_progress',
+    'Requests being served.',
+    multiprocess_mode='livesum',
+)
+WORKER_THREADS = Gauge(
+    'app_worker_threads',
+    'Request threads available (gunicorn threads per live worker).',
+    multiprocess_mode='livesum',
+)
+ARCGIS_LATENCY = Histogram(
+    'app_arcgis_request_duration_seconds',
+    'ArcGIS HTTP call latency by endpoint (query, attachments, attachment, token, csv).',
+    ['endpoint'],
+)
+CACHE_REQUESTS = Counter(
+    'app_cache_requests',
+    'Cache lookups by cache (token, mapping, filters, report_rows) and result (hit, miss).',
+    ['cache', 'result'],
+)
+PDF_RENDER_SECONDS = Histogram(
+    'app_pdf_render_duration_seconds',
+    'Time spent generating a report PDF (pisa).',
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60),
+)
+IMAGE_PROXY_BYTES = Counter(
+    'app_image_proxy_bytes',
+    'Attachment image bytes proxied to clients.',
+)
+POOL_TASKS_IN_PROGRESS = Gauge(
+    'app_thread_pool_tasks_in_progress',
+    'Tasks running in the per-request thread pools.',
+    ['pool'],
+    multiprocess_mode='livesum',
+)
+POOL_QUEUE_WAIT = Histogram(
+    'app_thread_pool_queue_wait_seconds',
+    'Time tasks wait for a free thread in the per-request thread pools.',
+    ['pool'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+WORKER_THREADS.set(getattr(settings, 'GUNICORN_THREADS', 1))
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def track_pool_task(pool, fn):
+    """Wrap a thread pool task to measure its queue wait and concurrency."""
+    submitted = time.perf_counter()
+
+    def run(*args, **kwargs):
+        POOL_QUEUE_WAIT.labels(pool).observe(time.perf_counter() - submitted)
+        gauge = POOL_TASKS_IN_PROGRESS.labels(pool)
+        gauge.inc()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            gauge.dec()
+
+    return run
+
+
+class MetricsMiddleware:
+    """Observe request latency per URL name and the number of requests in flight."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        match = getattr(request, 'resolver_match', None)
+        # URL names, not paths: bounded label cardinality.
+        view = (match.view_name if match else None) or 'unresolved'
+        REQUEST_LATENCY.labels(view, request.method, response.status_code).observe(
+            time.perf_counter() - start
+        )
+        return response
+
+
+def metrics_view(request):
+    """Expose all metrics in the Prometheus text format. No auth required."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-18 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MappingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('app', models.CharField(help_text="App key in ARCGIS_FIELD_MAPPINGS (e.g. 'reports')", max_length=100, unique=True)),
+                ('mappings', models.JSONField(default=dict, help_text='Parsed {field_name: {name: label}} mappings')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
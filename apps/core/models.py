@@ -1,3 +1,23 @@
 from django.db import models
 
-# Create your models here.
+
+class MappingSnapshot(models.Model):
+    """
+    Last-known-good copy of an app's CSV field mappings.
+
+    Written after every successful load from ArcGIS Portal and read back when
+    a refresh fails, so pages keep rendering during Portal outages.
+    """
+    app = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="App key in ARCGIS_FIELD_MAPPINGS (e.g. 'reports')"
+    )
+    mappings = models.JSONField(
+        default=dict,
+        help_text="Parsed {field_name: {name: label}} mappings"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.app} ({self.updated_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,239 @@
+"""
+Mapbox Vector Tile encoder for point layers (standard library only).
+
+Writes the protobuf wire format of the Vector Tile specification 2.1
+directly: a tile is a list of layers, each with its features, a shared key
+table and a shared value table (every distinct property key and value is
+stored once per layer). Only point geometry is supported, one MoveTo per
+feature, in integer tile coordinates within ``extent``.
+
+``decode_tile`` reads back what ``encode_tile`` writes (points only); it is
+meant for tests and debugging, not as a general MVT parser.
+"""
+
+import struct
+
+MVT_CONTENT_TYPE = "application/vnd.mapbox-vector-tile"
+EXTENT = 4096
+
+_POINT = 1
+_MOVE_TO = 1
+
+# Wire types
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH = 2
+_FIXED32 = 5
+
+
+def _varint(value, out):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _key(field, wire_type, out):
+    _varint((field << 3) | wire_type, out)
+
+
+def _bytes_field(field, data, out):
+    _key(field, _LENGTH, out)
+    _varint(len(data), out)
+    out += data
+
+
+def _packed(field, values, out):
+    body = bytearray()
+    for value in values:
+        _varint(value, body)
+    _bytes_field(field, body, out)
+
+
+def _value(value):
+    out = bytearray()
+    if isinstance(value, bool):
+        _key(7, _VARINT, out)
+        _varint(int(value), out)
+    elif isinstance(value, int):
+        if value >= 0:
+            _key(5, _VARINT, out)
+            _varint(value, out)
+        else:
+            _key(6, _VARINT, out)
+            _varint(_zigzag(value), out)
+    elif isinstance(value, float):
+        _key(3, _FIXED64, out)
+        out += struct.pack("<d", value)
+    else:
+        _bytes_field(1, str(value).encode("utf-8"), out)
+    return bytes(out)
+
+
+class Layer:
+    """A point layer of a vector tile."""
+
+    def __init__(self, name, extent=EXTENT):
+        self.name = name
+        self.extent = extent
+        self._keys = {}
+        self._values = {}
+        self._features = []
+
+    def __len__(self):
+        return len(self._features)
+
+    def add_point(self, x, y, properties, feature_id=None):
+        """
+        Add a point at integer tile coordinates (x, y), y growing down.
+
+        Properties with a None value are left out. Points outside
+        0..extent are allowed (tile buffer).
+        """
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(self._keys.setdefault(key, len(self._keys)))
+            # bool is an int subclass: keep True and 1 apart
+            tags.append(self._values.setdefault((type(value), value), len(self._values)))
+        self._features.append((feature_id, tags, int(x), int(y)))
+
+    def encode(self):
+        out = bytearray()
+        _key(15, _VARINT, out)
+        _varint(2, out)
+        _bytes_field(1, self.name.encode("utf-8"), out)
+        for feature_id, tags, x, y in self._features:
+            feature = bytearray()
+            if feature_id is not None:
+                _key(1, _VARINT, feature)
+                _varint(feature_id, feature)
+            if tags:
+                _packed(2, tags, feature)
+            _key(3, _VARINT, feature)
+            _varint(_POINT, feature)
+            _packed(4, (_MOVE_TO | (1 << 3), _zigzag(x), _zigzag(y)), feature)
+            _bytes_field(2, feature, out)
+        for key in self._keys:
+            _bytes_field(3, key.encode("utf-8"), out)
+        for _, value in self._values:
+            _bytes_field(4, _value(value), out)
+        _key(5, _VARINT, out)
+        _varint(self.extent, out)
+        return bytes(out)
+
+
+def encode_tile(layers):
+    """Return the bytes of a tile holding the non-empty layers."""
+    out = bytearray()
+    for layer in layers:
+        if len(layer):
+            _bytes_field(3, layer.encode(), out)
+    return bytes(out)
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(data):
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == _VARINT:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == _LENGTH:
+            size, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + size], pos + size
+        elif wire_type == _FIXED64:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == _FIXED32:
+            value, pos = data[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        yield field, value
+
+
+def _unpacked(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def _decode_value(data):
+    for field, value in _fields(data):
+        if field == 1:
+            return bytes(value).decode("utf-8")
+        if field == 2:
+            return struct.unpack("<f", value)[0]
+        if field == 3:
+            return struct.unpack("<d", value)[0]
+        if field in (4, 5):
+            return value
+        if field == 6:
+            return _unzigzag(value)
+        if field == 7:
+            return bool(value)
+    return None
+
+
+def decode_tile(data):
+    """
+    Decode the point layers of a tile.
+
+    Returns:
+        dict: {layer name: {'extent': n, 'features': [{'id', 'x', 'y',
+        'properties'}, ...]}}
+    """
+    layers = {}
+    for field, layer_data in _fields(data):
+        if field != 3:
+            continue
+        name, extent, keys, values, features = None, EXTENT, [], [], []
+        for layer_field, value in _fields(layer_data):
+            if layer_field == 1:
+                name = bytes(value).decode("utf-8")
+            elif layer_field == 2:
+                features.append(value)
+            elif layer_field == 3:
+                keys.append(bytes(value).decode("utf-8"))
+            elif layer_field == 4:
+                values.append(_decode_value(value))
+            elif layer_field == 5:
+                extent = value
+        decoded = []
+        for feature_data in features:
+            feature = {"id": None, "properties": {}}
+            for feature_field, value in _fields(feature_data):
+                if feature_field == 1:
+                    feature["id"] = value
+                elif feature_field == 2:
+                    tags = _unpacked(value)
+                    feature["properties"] = {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])}
+                elif feature_field == 4:
+                    command, x, y = _unpacked(value)[:3]
+                    if command & 7 != _MOVE_TO:
+                        raise ValueError("Only point features are supported")
+                    feature["x"], feature["y"] = _unzigzag(x), _unzigzag(y)
+            decoded.append(feature)
+        layers[name] = {"extent": extent, "features": decoded}
+    return layers
@@ -0,0 +1,202 @@
+"""
+Opt-in sampling profiler for slow requests (PROFILING_ENABLED).
+
+While a request runs, one background sampler thread per process reads the
+Python stack of the request thread every PROFILING_INTERVAL_MS with
+``sys._current_frames()``, together with the stacks of the thread pool
+workers running tasks for it (``ContextThreadPoolExecutor`` registers them
+through ``profiled_task``). Samples are aggregated in memory per request;
+when the request took longer than PROFILING_THRESHOLD_MS they are written to
+PROFILING_DIR as collapsed stacks, one ``frame;frame;...;leaf count`` line
+per distinct stack, in a file named after the request id (the X-Request-ID
+header set by nginx, or a random id). The files open in speedscope or
+flamegraph.pl; the oldest are deleted beyond PROFILING_MAX_FILES. Faster
+requests discard their samples.
+
+The request thread never does any sampling work: the cost is one sampler
+wake-up per interval in the process plus a dict update per registered thread.
+"""
+
+import contextvars
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".folded"
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+_current = contextvars.ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Stack samples of one request, keyed by (thread role, frames)."""
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.samples = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, stack):
+        with self._lock:
+            self.samples[stack] += 1
+
+    def collapsed(self):
+        """Lines of the collapsed stack format, heaviest stack first."""
+        with self._lock:
+            return [
+                f"{';'.join(stack)} {count}"
+                for stack, count in self.samples.most_common()
+            ]
+
+
+class StackSampler:
+    """Background thread sampling the stacks of registered threads."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._threads = {}
+        self._labels = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def register(self, profile, role):
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = (profile, role)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return ident
+
+    def unregister(self, ident):
+        with self._lock:
+            self._threads.pop(ident, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                threads = list(self._threads.items())
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for ident, (profile, role) in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    profile.add((role, *self._stack(frame)))
+
+    def _stack(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = (
+                    f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+                )
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+
+_sampler = None
+
+
+def _get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = StackSampler(getattr(settings, "PROFILING_INTERVAL_MS", 50) / 1000)
+    return _sampler
+
+
+def profiled_task(fn, pool="default"):
+    """Wrap a thread pool task so its thread is sampled with the submitting request."""
+
+    def run(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        sampler = _get_sampler()
+        ident = sampler.register(profile, f"pool:{pool}")
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.unregister(ident)
+
+    return run
+
+
+def _request_id(request):
+    request_id = request.headers.get("X-Request-ID", "")
+    return request_id if _REQUEST_ID_RE.match(request_id) else uuid.uuid4().hex
+
+
+def write_profile(profile, directory, max_files):
+    """Store profile as a collapsed stack file and prune the oldest files."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    path = directory / f"{stamp}_{profile.request_id}{PROFILE_SUFFIX}"
+    path.write_text("\n".join(profile.collapsed()) + "\n", encoding="utf-8")
+
+    files = sorted(directory.glob(f"*{PROFILE_SUFFIX}"), key=lambda p: p.stat().st_mtime)
+    for old in files[:max(0, len(files) - max_files)]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+class SamplingProfilerMiddleware:
+    """Sample every request; keep the profile of those slower than the threshold."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, "PROFILING_THRESHOLD_MS", 5000) / 1000
+        self.directory = getattr(settings, "PROFILING_DIR", settings.BASE_DIR / "logs" / "profiles")
+        self.max_files = getattr(settings, "PROFILING_MAX_FILES", 100)
+
+    def __call__(self, request):
+        profile = RequestProfile(_request_id(request))
+        sampler = _get_sampler()
+        token = _current.set(profile)
+        ident = sampler.register(profile, "request")
+        start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            sampler.unregister(ident)
+            _current.reset(token)
+            duration = time.perf_counter() - start
+            if duration >= self.threshold and profile.samples:
+                self._save(request, profile, duration)
+
+    def _save(self, request, profile, duration):
+        try:
+            path = write_profile(profile, self.directory, self.max_files)
+        except OSError:
+            logger.exception("Could not store the profile of request %s", profile.request_id)
+            return
+        logger.warning(
+            "Slow request profiled: %s %s %.1fms -> %s",
+            request.method, request.path, duration * 1000, path.name,
+            extra={"detail": {
+                "request_id": profile.request_id,
+                "path": request.path,
+                "total_ms": round(duration * 1000, 1),
+                "samples": sum(profile.samples.values()),
+                "profile": path.name,
+            }},
+        )
@@ -0,0 +1,146 @@
+"""
+Atomic cache-backed rate limiting.
+
+Counters are only ever changed with ``cache.add`` and ``cache.incr``, so
+concurrent requests cannot lose an update the way a ``get`` followed by a
+``set`` does: the increment itself is atomic (Redis ``INCR``, LocMemCache's
+lock). Django's ``RedisCache.incr`` is not atomic as a whole, though: it
+checks that the key exists before ``INCR``, and a key expiring in between is
+recreated by ``INCR`` as 1 without a TTL. ``incr_counter`` therefore sets the
+timeout again whenever an increment returns 1.
+
+- ``incr_counter``: a plain counter that expires ``timeout`` seconds after the
+  first increment (login lockout).
+- ``SlidingWindowLimiter``: at most ``limit`` hits per ``window`` seconds per
+  identity. The sliding window is approximated from two fixed windows: hits
+  in the current window plus the previous window's hits weighted by how much
+  of it the sliding window still covers. A hit costs an ``incr`` and a
+  ``get``; a check costs one ``get_many``.
+- ``rate_limit``: view decorator applying a limiter per user (or per IP for
+  anonymous requests), configured by a ``"<hits>/<seconds>"`` setting.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from config.strings import UI_STRINGS
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "ratelimit_"
+
+
+def incr_counter(key, timeout):
+    """Atomically increment the counter at key and return its new value."""
+    try:
+        value = cache.incr(key)
+    except ValueError:
+        # Missing (or just expired): create it; add is a no-op if another
+        # request created it first, so both increments are kept.
+        cache.add(key, 0, timeout=timeout)
+        value = cache.incr(key)
+    if value == 1:
+        # First increment: the key may have been recreated by INCR after
+        # expiring between RedisCache.incr's exists check and its INCR, which
+        # leaves it without a TTL. Never let a counter outlive its timeout.
+        cache.touch(key, timeout)
+    return value
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    count: int
+    retry_after: int
+
+
+class SlidingWindowLimiter:
+    """At most ``limit`` hits per ``window`` seconds per identity."""
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def _keys(self, ident, now):
+        index = int(now // self.window)
+        prefix = f"{RATE_LIMIT_KEY_PREFIX}{self.scope}_{ident}_"
+        return f"{prefix}{index}", f"{prefix}{index - 1}"
+
+    def _estimate(self, current, previous, now):
+        overlap = 1 - (now % self.window) / self.window
+        return current + math.floor(previous * overlap)
+
+    def _retry_after(self, now):
+        return max(1, math.ceil(self.window - now % self.window))
+
+    def count(self, ident, now=None):
+        """Return the current hit estimate for ident without recording a hit."""
+        now = time.time() if now is None else now
+        current_key, previous_key = self._keys(ident, now)
+        values = cache.get_many([current_key, previous_key])
+        return self._estimate(values.get(current_key, 0), values.get(previous_key, 0), now)
+
+    def hit(self, ident, now=None):
+        """Record a hit for ident and return whether it is within the limit."""
+        now = time.time() if now is None else now
+        current_key, previous_key = self._keys(ident, now)
+        # Keys outlive their window so they can serve as the previous one.
+        current = incr_counter(current_key, timeout=2 * self.window)
+        count = self._estimate(current, cache.get(previous_key, 0), now)
+        return RateLimitResult(count <= self.limit, count, self._retry_after(now))
+
+    def reset(self, ident, now=None):
+        now = time.time() if now is None else now
+        cache.delete_many(self._keys(ident, now))
+
+
+def parse_rate(rate):
+    """Parse ``"<hits>/<seconds>"`` into (hits, seconds); None if disabled."""
+    if not rate:
+        return None
+    hits, _, seconds = str(rate).partition("/")
+    hits, seconds = int(hits), int(seconds or 60)
+    if hits <= 0 or seconds <= 0:
+        return None
+    return hits, seconds
+
+
+def _request_ident(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"u{user.pk}"
+    return f"ip{request.META.get('REMOTE_ADDR', '')}"
+
+
+def rate_limit(scope, rate_setting):
+    """
+    Limit a view per user with the ``"<hits>/<seconds>"`` rate in settings.
+
+    The setting is read on each request; an empty or zero rate disables the
+    limit. Over the limit the view is not called and a 429 response with a
+    Retry-After header is returned.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            rate = parse_rate(getattr(settings, rate_setting, None))
+            if rate is None:
+                return view_func(request, *args, **kwargs)
+            limiter = SlidingWindowLimiter(scope, *rate)
+            result = limiter.hit(_request_ident(request))
+            if not result.allowed:
+                logger.warning("Rate limit exceeded for %s (%s)", scope, _request_ident(request))
+                response = HttpResponse(UI_STRINGS["error_rate_limited"], status=429)
+                response["Retry-After"] = str(result.retry_after)
+                return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -6,10 +6,17 @@ Ported from PHP ArcGISService.php
 
 import logging
 import threading
+import time
+from collections import deque
+from itertools import islice
+
 import requests
 from django.conf import settings
 from django.core.cache import cache
 
+from apps.core.metrics import ARCGIS_LATENCY, record_cache
+from apps.core.timing import ContextThreadPoolExecutor, record_upstream
+
 logger = logging.getLogger(__name__)
 
 # Cache key for ArcGIS token
@@ -31,6 +38,24 @@ class ArcGISService:
         self.token_expiration_minutes = settings.ARCGIS_TOKEN_EXPIRATION_MINUTES
         self.headers = {'Referer': self.referer}
 
+    def _send(self, endpoint, send, url, **kwargs):
+        """
+        Issue one HTTP call with send (requests.get/post).
+
+        The call is counted on the current request and its latency observed
+        under endpoint (query, attachments, attachment, token).
+        """
+        start = time.perf_counter()
+        response = None
+        try:
+            response = send(url, headers=self.headers, **kwargs)
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            nbytes = len(response.content) if response is not None else 0
+            record_upstream(elapsed, nbytes)
+            ARCGIS_LATENCY.labels(endpoint).observe(elapsed)
+
     def get_token(self) -> str:
         """
         Get ArcGIS token, using cache if available and valid.
@@ -44,6 +69,7 @@ class ArcGISService:
         """
         # First check: Quick cache lookup without lock (fast path)
         cached_token = cache.get(ARCGIS_TOKEN_CACHE_KEY)
+        record_cache('token', bool(cached_token))
         if cached_token:
             logger.debug("ArcGIS token found in cache")
             return cached_token
@@ -69,10 +95,9 @@ class ArcGISService:
 
             try:
                 logger.debug(f"Sending token request with expiration: {self.token_expiration_minutes} minutes")
-                response = requests.post(
-                    self.portal_url,
+                response = self._send(
+                    'token', requests.post, self.portal_url,
                     data=params,
-                    headers=self.headers,
                     timeout=30,
                 )
                 response.raise_for_status()
@@ -97,7 +122,7 @@ class ArcGISService:
                 logger.error(f"ArcGIS token request failed: {str(e)}", exc_info=True)
                 raise ArcGISError(f"Connection error: {e}") from e
 
-    def query_layer(self, layer_id: int, where: str = "1=1", out_fields: str = "*") -> dict:
+    def query_layer(self, layer_id: int, where: str = "1=1", out_fields: str = "*", **extra_params) -> dict:
         """
         Query a feature layer.
 
@@ -105,6 +130,8 @@ class ArcGISService:
             layer_id: The layer index in the feature service
             where: SQL WHERE clause for filtering
             out_fields: Fields to return (default: all)
+            extra_params: Additional query parameters, e.g. orderByFields,
+                resultOffset, resultRecordCount, returnGeometry
 
         Returns:
             dict: Query results with 'features' list
@@ -118,7 +145,8 @@ class ArcGISService:
             'where': where,
             'outFields': out_fields,
             'f': 'json',
-            'token': token
+            'token': token,
+            **extra_params,
         }
 
         url = f"{self.feature_service_url}/{layer_id}/query"
@@ -126,10 +154,9 @@ class ArcGISService:
 
         try:
             logger.debug("Sending query request to ArcGIS")
-            response = requests.get(
-                url,
+            response = self._send(
+                'query', requests.get, url,
                 params=params,
-                headers=self.headers,
                 timeout=60,
             )
             response.raise_for_status()
@@ -151,6 +178,82 @@ class ArcGISService:
             logger.error(f"ArcGIS query failed for layer {layer_id}: {str(e)}", exc_info=True)
             return {'error': str(e)}
 
+    def iter_features(self, layer_id: int, where: str = "1=1", out_fields: str = "*",
+                      page_size: int = None, max_workers: int = None, **extra_params):
+        """
+        Yield every feature matching where, paging past the service's maxRecordCount.
+
+        The first page is requested alone; when it comes back complete (no
+        exceededTransferLimit) that is the only call. Otherwise its length is
+        taken as the page size, the matching features are counted and the
+        remaining pages are fetched by resultOffset on a pool of max_workers
+        threads (ARCGIS_QUERY_PAGE_WORKERS), at most max_workers pages ahead
+        of the consumer. Features are yielded in order as pages arrive, so
+        the caller never holds more than those pages. Pages added upstream
+        after the count are read sequentially at the end.
+
+        Args:
+            layer_id: The layer index in the feature service
+            where: SQL WHERE clause for filtering
+            out_fields: Fields to return (default: all)
+            page_size: resultRecordCount per call (default: the server's
+                maxRecordCount)
+            max_workers: Pages fetched concurrently
+            extra_params: Additional query parameters; orderByFields
+                defaults to objectid so offsets are stable
+
+        Raises:
+            ArcGISError: if a page query fails
+        """
+        extra_params.setdefault('orderByFields', 'objectid ASC')
+        if page_size:
+            extra_params['resultRecordCount'] = page_size
+
+        def fetch(offset):
+            result = self.query_layer(layer_id, where, out_fields, resultOffset=offset, **extra_params)
+            if 'error' in result:
+                raise ArcGISError(result['error'])
+            return result
+
+        def has_more(result):
+            features = result.get('features', [])
+            return bool(features) and bool(
+                result.get('exceededTransferLimit') or (page_size and len(features) >= page_size)
+            )
+
+        offset, result = 0, fetch(0)
+        yield from result.get('features', [])
+        if not has_more(result):
+            return
+
+        step = len(result['features'])
+        count = self.query_layer(layer_id, where, out_fields, returnCountOnly='true')
+        if 'error' in count:
+            raise ArcGISError(count['error'])
+        total = int(count.get('count', 0))
+        logger.info(f"Layer {layer_id} exceeds the transfer limit: paging {total} features by {step}")
+
+        offsets = iter(range(step, total, step))
+        workers = max_workers or getattr(settings, 'ARCGIS_QUERY_PAGE_WORKERS', 4)
+        with ContextThreadPoolExecutor(max_workers=workers, name='arcgis_pages') as executor:
+            pending = deque((o, executor.submit(fetch, o)) for o in islice(offsets, workers))
+            try:
+                while pending:
+                    offset, future = pending.popleft()
+                    result = future.result()
+                    for next_offset in islice(offsets, 1):
+                        pending.append((next_offset, executor.submit(fetch, next_offset)))
+                    yield from result.get('features', [])
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+        # Features added upstream after the count
+        while has_more(result):
+            offset += len(result['features'])
+            result = fetch(offset)
+            yield from result.get('features', [])
+
     def get_attachments(self, layer_id: int, object_id: int) -> dict:
         """
         Get attachments for a feature.
@@ -175,10 +278,9 @@ class ArcGISService:
 
         try:
             logger.debug("Sending attachments request to ArcGIS")
-            response = requests.get(
-                url,
+            response = self._send(
+                'attachments', requests.get, url,
                 params=params,
-                headers=self.headers,
                 timeout=30,
             )
             response.raise_for_status()
@@ -216,10 +318,9 @@ class ArcGISService:
 
         try:
             logger.debug("Sending attachment download request to ArcGIS")
-            response = requests.get(
-                url,
+            response = self._send(
+                'attachment', requests.get, url,
                 params=params,
-                headers=self.headers,
                 timeout=60,
             )
 
@@ -261,9 +362,14 @@ def get_arcgis_token() -> str:
     return get_arcgis_service().get_token()
 
 
-def query_feature_layer(layer_id: int, where: str = "1=1") -> dict:
+def query_feature_layer(layer_id: int, where: str = "1=1", out_fields: str = "*", **extra_params) -> dict:
     """Query a feature layer."""
-    return get_arcgis_service().query_layer(layer_id, where)
+    return get_arcgis_service().query_layer(layer_id, where, out_fields, **extra_params)
+
+
+def iter_feature_layer(layer_id: int, where: str = "1=1", out_fields: str = "*", **kwargs):
+    """Iterate over all the features of a layer query, page by page."""
+    return get_arcgis_service().iter_features(layer_id, where, out_fields, **kwargs)
 
 
 def get_attachments(layer_id: int, object_id: int) -> dict:
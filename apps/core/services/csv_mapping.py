@@ -14,25 +14,80 @@ Config (settings.py):
 
 Each CSV must have at least the columns: name, label (list_name is ignored).
 One item_id used by multiple field_names in the same app is fetched only once.
+
+Unique items are fetched concurrently. Each parsed item is kept in the cache
+together with the Portal item's ``modified`` timestamp: on refresh, an item
+whose timestamp has not changed costs a single metadata call instead of a
+full download and parse.
+
+After every successful load the parsed mappings are persisted as a
+MappingSnapshot row (last-known-good copy). A snapshot younger than the
+cache TTL warms a fresh worker without calling Portal; an older one is
+served as a fallback when the Portal refresh fails.
 """
 
 import csv
 import io
 import logging
 import threading
+import time
+from concurrent.futures import as_completed
 
 import requests
 from django.conf import settings
 from django.core.cache import cache
+from django.db import DatabaseError
+from django.utils import timezone
 
-from apps.core.services.arcgis import get_arcgis_token
+from apps.core.metrics import ARCGIS_LATENCY, record_cache
+from apps.core.models import MappingSnapshot
+from apps.core.services.arcgis import ArcGISError, get_arcgis_token
+from apps.core.timing import ContextThreadPoolExecutor, record_upstream
 
 logger = logging.getLogger(__name__)
 
 CACHE_KEY_PREFIX = 'arcgis_csv_mappings_'
+ITEM_CACHE_KEY_PREFIX = 'arcgis_csv_item_'
+# Upper bound on concurrent item downloads per app refresh.
+MAX_FETCH_WORKERS = 6
 _mapping_lock = threading.Lock()
 
 
+def _item_url(item_id: str) -> str:
+    """Portal REST URL of a content item (metadata endpoint)."""
+    portal_base = settings.ARCGIS_PORTAL_BASE_URL.rstrip('/')
+    return f"{portal_base}/sharing/rest/content/items/{item_id}"
+
+
+def _get(url: str, **kwargs):
+    """GET a Portal URL, counted on the current request like ArcGIS calls."""
+    start = time.perf_counter()
+    response = None
+    try:
+        response = requests.get(url, headers={'Referer': settings.ARCGIS_REFERER}, **kwargs)
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        nbytes = len(response.content) if response is not None else 0
+        record_upstream(elapsed, nbytes)
+        ARCGIS_LATENCY.labels('csv').observe(elapsed)
+
+
+def _fetch_item_modified(item_id: str, token: str):
+    """Return the Portal item's ``modified`` timestamp (epoch ms), or None.
+
+    Any failure (network, HTTP, missing field) returns None so the caller
+    falls back to a full download — the metadata call is an optimisation only.
+    """
+    try:
+        response = _get(_item_url(item_id), params={'f': 'json', 'token': token}, timeout=10)
+        response.raise_for_status()
+        return response.json().get('modified')
+    except (requests.RequestException, ValueError, AttributeError):
+        logger.warning('Could not read metadata for CSV item %s — forcing full download', item_id)
+        return None
+
+
 def _fetch_single_csv(item_id: str, token: str) -> dict:
     """Download and parse a single CSV item from ArcGIS Portal.
 
@@ -40,11 +95,7 @@ def _fetch_single_csv(item_id: str, token: str) -> dict:
     between field_name and CSV is established in ARCGIS_FIELD_MAPPINGS.
     Raises requests.HTTPError on non-2xx response.
     """
-    portal_base = settings.ARCGIS_PORTAL_BASE_URL.rstrip('/')
-    url = f"{portal_base}/sharing/rest/content/items/{item_id}/data"
-    headers = {'Referer': settings.ARCGIS_REFERER}
-
-    response = requests.get(url, params={'token': token}, headers=headers, timeout=30)
+    response = _get(f"{_item_url(item_id)}/data", params={'token': token}, timeout=30)
     response.raise_for_status()
 
     # Explicit UTF-8-sig decode: handles BOM and preserves Italian accented characters.
@@ -61,11 +112,35 @@ def _fetch_single_csv(item_id: str, token: str) -> dict:
     return result
 
 
+def _load_item(item_id: str, token: str) -> dict:
+    """Return {name: label} for a CSV item, skipping the download if unchanged.
+
+    Compares the item's current ``modified`` timestamp with the one stored
+    alongside the last parsed copy; only a changed (or unknown) timestamp
+    triggers a download. Raises on download failure.
+    """
+    item_key = f'{ITEM_CACHE_KEY_PREFIX}{item_id}'
+    modified = _fetch_item_modified(item_id, token)
+
+    cached = cache.get(item_key)
+    if cached is not None and modified is not None and cached.get('modified') == modified:
+        logger.debug('CSV item %s unchanged (modified=%s) — reusing parsed copy', item_id, modified)
+        return cached['mapping']
+
+    logger.info('Fetching CSV mapping from ArcGIS item: %s', item_id)
+    mapping = _fetch_single_csv(item_id, token)
+    if modified is not None:
+        # No TTL: validity is decided by the modified timestamp, not by age.
+        cache.set(item_key, {'modified': modified, 'mapping': mapping}, timeout=None)
+    return mapping
+
+
 def _build_app_mappings(app: str) -> dict:
     """Fetch all CSVs for an app. Returns {field_name: {name: label}}.
 
     Deduplicates item_ids: the same CSV used by multiple field_names is
-    fetched only once. Raises on any network, HTTP, or token error.
+    fetched only once. Unique items are loaded concurrently.
+    Raises on any network, HTTP, or token error.
     """
     field_mappings = getattr(settings, 'ARCGIS_FIELD_MAPPINGS', {})
     app_config = field_mappings.get(app, {})
@@ -77,6 +152,7 @@ def _build_app_mappings(app: str) -> dict:
 
     # Fetch each unique item_id once.
     item_cache: dict[str, dict] = {}
+    pending = []
     for item_id in set(app_config.values()):
         if item_id.startswith('PLACEHOLDER'):
             logger.warning(
@@ -85,8 +161,17 @@ def _build_app_mappings(app: str) -> dict:
             )
             item_cache[item_id] = {}
             continue
-        logger.info('Fetching CSV mapping from ArcGIS item: %s', item_id)
-        item_cache[item_id] = _fetch_single_csv(item_id, token)
+        pending.append(item_id)
+
+    if pending:
+        workers = min(len(pending), MAX_FETCH_WORKERS)
+        with ContextThreadPoolExecutor(max_workers=workers, name='csv_mapping') as executor:
+            future_to_item = {
+                executor.submit(_load_item, item_id, token): item_id
+                for item_id in pending
+            }
+            for future in as_completed(future_to_item):
+                item_cache[future_to_item[future]] = future.result()
 
     # Assemble {field_name: {name: label}}.
     result = {}
@@ -97,17 +182,73 @@ def _build_app_mappings(app: str) -> dict:
     return result
 
 
+def _load_snapshot(app: str):
+    """Return the persisted MappingSnapshot for an app, or None."""
+    try:
+        return MappingSnapshot.objects.filter(app=app).first()
+    except DatabaseError:
+        logger.warning('Could not read CSV mapping snapshot for app=%s', app, exc_info=True)
+        return None
+
+
+def _save_snapshot(app: str, mappings: dict) -> None:
+    """Persist mappings as the app's last-known-good copy. Never raises."""
+    try:
+        MappingSnapshot.objects.update_or_create(app=app, defaults={'mappings': mappings})
+    except DatabaseError:
+        logger.warning('Could not persist CSV mapping snapshot for app=%s', app, exc_info=True)
+
+
+def _refresh_app_mappings(app: str, cache_key: str) -> dict:
+    """Load mappings for an app into the cache and return them.
+
+    Order of preference: a snapshot written within the TTL (another worker
+    already fetched), a fresh Portal fetch, then a stale snapshot if the
+    fetch fails. Raises only when Portal fails and no snapshot exists.
+    """
+    timeout = getattr(settings, 'ARCGIS_MAPPING_CACHE_TIMEOUT', 300)
+    snapshot = _load_snapshot(app)
+
+    if snapshot is not None:
+        age = (timezone.now() - snapshot.updated_at).total_seconds()
+        if age < timeout:
+            logger.debug('Using CSV mapping snapshot for app=%s (age %.0fs)', app, age)
+            cache.set(cache_key, snapshot.mappings, timeout=max(1, int(timeout - age)))
+            return snapshot.mappings
+
+    try:
+        mappings = _build_app_mappings(app)
+    except (requests.RequestException, ArcGISError, ValueError):
+        if snapshot is None:
+            raise
+        logger.exception(
+            'CSV mapping refresh failed for app=%s — serving last-known-good copy from %s',
+            app, snapshot.updated_at,
+        )
+        # Short TTL so Portal is retried soon without hammering it on every request.
+        retry = getattr(settings, 'ARCGIS_MAPPING_RETRY_TIMEOUT', 60)
+        cache.set(cache_key, snapshot.mappings, timeout=retry)
+        return snapshot.mappings
+
+    cache.set(cache_key, mappings, timeout=timeout)
+    if mappings:
+        _save_snapshot(app, mappings)
+    return mappings
+
+
 def get_csv_mappings(app: str) -> dict:
     """Return cached {field_name: {name: label}} for the given app.
 
     Fetches from ArcGIS Portal on first call or after TTL expiry.
     Thread-safe via double-checked locking (same pattern as ArcGISService.get_token()).
-    Raises explicitly if the fetch fails — callers receive a Django 500.
+    Falls back to the last persisted snapshot if the fetch fails; raises only
+    when no snapshot exists — callers then receive a Django 500.
     """
     cache_key = f'{CACHE_KEY_PREFIX}{app}'
 
     # Fast path — no lock needed if already cached.
     mappings = cache.get(cache_key)
+    record_cache('mapping', mappings is not None)
     if mappings is not None:
         return mappings
 
@@ -115,8 +256,6 @@ def get_csv_mappings(app: str) -> dict:
     with _mapping_lock:
         mappings = cache.get(cache_key)
         if mappings is None:
-            mappings = _build_app_mappings(app)
-            timeout = getattr(settings, 'ARCGIS_MAPPING_CACHE_TIMEOUT', 300)
-            cache.set(cache_key, mappings, timeout=timeout)
+            mappings = _refresh_app_mappings(app, cache_key)
 
     return mappings
@@ -0,0 +1,38 @@
+"""
+Database connection pool statistics.
+
+Reads the psycopg_pool counters of a Django connection alias and derives the
+time requests spend waiting for a free connection, the signal that the pool
+(DB_POOL_MAX_SIZE) is too small for the gunicorn thread count.
+"""
+
+from django.db import connections
+
+
+def get_pool_stats(alias='default'):
+    """
+    Return pool counters for the alias, or None when pooling is not enabled.
+
+    Counters are cumulative since the worker opened its pool. ``wait_ms_avg``
+    is the mean time per connection request, ``requests_errors`` counts
+    requests that timed out waiting (DB_POOL_TIMEOUT).
+    """
+    pool = getattr(connections[alias], 'pool', None)
+    if pool is None:
+        return None
+
+    stats = pool.get_stats()
+    requests_num = stats.get('requests_num', 0)
+    wait_ms = stats.get('requests_wait_ms', 0)
+    return {
+        'size': stats.get('pool_size', 0),
+        'available': stats.get('pool_available', 0),
+        'max_size': stats.get('pool_max', 0),
+        'requests_num': requests_num,
+        'requests_queued': stats.get('requests_queued', 0),
+        'requests_waiting': stats.get('requests_waiting', 0),
+        'requests_errors': stats.get('requests_errors', 0),
+        'wait_ms_total': wait_ms,
+        'wait_ms_avg': round(wait_ms / requests_num, 2) if requests_num else 0.0,
+        'connections_lost': stats.get('connections_lost', 0),
+    }
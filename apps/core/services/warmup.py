@@ -0,0 +1,85 @@
+"""
+Cache warm-up.
+
+Pre-populates the caches the first requests after a deploy would otherwise
+fill cold: the ArcGIS token, every app's CSV mappings, the report filter
+options and the default (unfiltered) report list. Tasks run concurrently
+and each one is timed independently; a failing task never stops the others.
+
+Used by the ``warm_caches`` management command and, optionally, by the
+gunicorn ``post_worker_init`` hook (WARM_CACHES_ON_START=true).
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+from django.conf import settings
+from django.db import connection
+
+from apps.core.services.arcgis import get_arcgis_token
+from apps.core.services.csv_mapping import get_csv_mappings
+
+logger = logging.getLogger(__name__)
+
+
+def _raise_on_error(func):
+    """Wrap a loader that reports failures as {'error': ...} instead of raising."""
+    def wrapper():
+        result = func()
+        if isinstance(result, dict) and 'error' in result:
+            raise RuntimeError(result['error'])
+        return result
+    return wrapper
+
+
+def _warm_tasks():
+    """Return [(name, callable)] for every cache to warm."""
+    # Imported lazily: core services must not depend on app modules at import time.
+    from apps.reports.services.report_list import get_filter_options, get_report_rows
+
+    tasks = [('arcgis_token', get_arcgis_token)]
+    for app in getattr(settings, 'ARCGIS_FIELD_MAPPINGS', {}):
+        tasks.append((f'csv_mappings:{app}', partial(get_csv_mappings, app)))
+    tasks.append(('report_list', _raise_on_error(get_report_rows)))
+    tasks.append(('filter_options', _raise_on_error(get_filter_options)))
+    return tasks
+
+
+def _run_timed(func):
+    """Run func, returning (elapsed_seconds, error_message_or_None)."""
+    start = time.perf_counter()
+    try:
+        func()
+        return time.perf_counter() - start, None
+    except Exception as exc:
+        return time.perf_counter() - start, str(exc)
+    finally:
+        # Worker threads get their own DB connection — don't leak it.
+        connection.close()
+
+
+def warm_caches(max_workers: int = 4) -> list:
+    """
+    Warm all caches concurrently.
+
+    Returns:
+        list of (name, elapsed_seconds, error) tuples; error is None on success.
+    """
+    tasks = _warm_tasks()
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_name = {
+            executor.submit(_run_timed, func): name
+            for name, func in tasks
+        }
+        for future in as_completed(future_to_name):
+            name = future_to_name[future]
+            elapsed, error = future.result()
+            if error:
+                logger.warning("Cache warm-up failed for %s after %.0f ms: %s", name, elapsed * 1000, error)
+            else:
+                logger.info("Cache warm-up: %s ready in %.0f ms", name, elapsed * 1000)
+            results.append((name, elapsed, error))
+    return results
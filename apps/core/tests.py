@@ -27,3 +27,736 @@ class ContentSecurityPolicyTest(TestCase):
         response = self.client.get('/')
         csp = response.get('Content-Security-Policy', '')
         self.assertIn("frame-ancestors 'none'", csp)
+
+
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.services import csv_mapping
+
+
+def _portal_response(url, modified, csv_body=b'name,label\na,Alpha\n'):
+    """Fake requests.get response for a Portal item metadata or /data URL."""
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    if url.endswith('/data'):
+        response.content = csv_body
+    else:
+        response.json.return_value = {'modified': modified}
+    return response
+
+
+@override_settings(ARCGIS_FIELD_MAPPINGS={
+    'reports': {'field_a': 'item1', 'field_b': 'item1', 'field_c': 'item2'},
+})
+class CsvMappingConditionalFetchTest(SimpleTestCase):
+    """CSV items are downloaded once per change of the Portal `modified` timestamp."""
+
+    def setUp(self):
+        cache.clear()
+        self.modified = {'item1': 1000, 'item2': 2000}
+        self.urls = []
+        patcher = patch('apps.core.services.csv_mapping.get_arcgis_token', return_value='tok')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fake_get(self, url, **kwargs):
+        self.urls.append(url)
+        item_id = url.split('/items/')[1].split('/')[0]
+        return _portal_response(url, self.modified[item_id])
+
+    def _data_downloads(self):
+        return [u for u in self.urls if u.endswith('/data')]
+
+    def test_shared_item_downloaded_once(self):
+        with patch('apps.core.services.csv_mapping.requests.get', side_effect=self._fake_get):
+            result = csv_mapping._build_app_mappings('reports')
+        self.assertEqual(result['field_a'], {'a': 'Alpha'})
+        self.assertEqual(result['field_b'], {'a': 'Alpha'})
+        self.assertEqual(len(self._data_downloads()), 2)
+
+    def test_unchanged_item_skips_download(self):
+        with patch('apps.core.services.csv_mapping.requests.get', side_effect=self._fake_get):
+            csv_mapping._build_app_mappings('reports')
+            self.urls.clear()
+            result = csv_mapping._build_app_mappings('reports')
+        self.assertEqual(self._data_downloads(), [])
+        self.assertEqual(len(self.urls), 2)  # metadata calls only
+        self.assertEqual(result['field_c'], {'a': 'Alpha'})
+
+    def test_modified_item_is_downloaded_again(self):
+        with patch('apps.core.services.csv_mapping.requests.get', side_effect=self._fake_get):
+            csv_mapping._build_app_mappings('reports')
+            self.urls.clear()
+            self.modified['item2'] = 3000
+            csv_mapping._build_app_mappings('reports')
+        self.assertEqual(len(self._data_downloads()), 1)
+        self.assertIn('/items/item2/data', self._data_downloads()[0])
+
+    def test_downloads_are_counted_on_the_request(self):
+        from apps.core.timing import RequestTiming, _current
+
+        request_timing = RequestTiming()
+        token = _current.set(request_timing)
+        try:
+            with patch('apps.core.services.csv_mapping.requests.get', side_effect=self._fake_get):
+                csv_mapping._build_app_mappings('reports')
+        finally:
+            _current.reset(token)
+        # 2 metadata calls + 2 downloads, made from the pool workers
+        self.assertEqual(request_timing.upstream_calls, 4)
+        self.assertEqual(request_timing.upstream_bytes, 2 * len(b'name,label\na,Alpha\n'))
+
+
+from datetime import timedelta
+
+import requests
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.core.models import MappingSnapshot
+
+
+class CsvMappingSnapshotTest(TestCase):
+    """Last-known-good snapshot persistence and fallback for CSV mappings."""
+
+    def setUp(self):
+        cache.clear()
+
+    def _age_snapshot(self, app, seconds):
+        MappingSnapshot.objects.filter(app=app).update(
+            updated_at=timezone.now() - timedelta(seconds=seconds)
+        )
+
+    def test_successful_load_persists_snapshot(self):
+        fresh = {'tratta': {'A7_pos': 'A7'}}
+        with patch('apps.core.services.csv_mapping._build_app_mappings', return_value=fresh):
+            csv_mapping.get_csv_mappings('reports')
+        self.assertEqual(MappingSnapshot.objects.get(app='reports').mappings, fresh)
+
+    def test_portal_failure_serves_snapshot(self):
+        MappingSnapshot.objects.create(app='reports', mappings={'tratta': {'A7_pos': 'A7'}})
+        self._age_snapshot('reports', 3600)
+        with patch('apps.core.services.csv_mapping._build_app_mappings',
+                   side_effect=requests.ConnectionError('portal down')):
+            result = csv_mapping.get_csv_mappings('reports')
+        self.assertEqual(result, {'tratta': {'A7_pos': 'A7'}})
+
+    def test_portal_failure_without_snapshot_raises(self):
+        with patch('apps.core.services.csv_mapping._build_app_mappings',
+                   side_effect=requests.ConnectionError('portal down')):
+            with self.assertRaises(requests.ConnectionError):
+                csv_mapping.get_csv_mappings('reports')
+
+    def test_recent_snapshot_warms_cache_without_portal_call(self):
+        MappingSnapshot.objects.create(app='reports', mappings={'tratta': {'A50': 'A50'}})
+        with patch('apps.core.services.csv_mapping._build_app_mappings') as mock_build:
+            result = csv_mapping.get_csv_mappings('reports')
+        mock_build.assert_not_called()
+        self.assertEqual(result, {'tratta': {'A50': 'A50'}})
+
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@override_settings(ARCGIS_FIELD_MAPPINGS={'reports': {'tratta': 'item1'}})
+class WarmCachesCommandTest(SimpleTestCase):
+    """warm_caches runs every warm-up task and reports timings per cache."""
+
+    def _patches(self, rows_result):
+        return (
+            patch('apps.core.services.warmup.get_arcgis_token', return_value='tok'),
+            patch('apps.core.services.warmup.get_csv_mappings', return_value={}),
+            patch('apps.reports.services.report_list.get_report_rows', return_value=rows_result),
+            patch('apps.reports.services.report_list.get_filter_options', return_value={}),
+            patch('apps.core.services.warmup.connection'),
+        )
+
+    def test_reports_timing_for_each_cache(self):
+        out = StringIO()
+        p1, p2, p3, p4, p5 = self._patches({'rows': []})
+        with p1, p2, p3, p4, p5:
+            call_command('warm_caches', stdout=out)
+        output = out.getvalue()
+        for name in ('arcgis_token', 'csv_mappings:reports', 'report_list', 'filter_options'):
+            self.assertIn(name, output)
+        self.assertIn('Warmed 4/4', output)
+
+    def test_failed_task_does_not_stop_others(self):
+        out = StringIO()
+        p1, p2, p3, p4, p5 = self._patches({'error': 'layer unavailable'})
+        with p1, p2, p3, p4, p5:
+            with self.assertRaises(CommandError):
+                call_command('warm_caches', stdout=out)
+        self.assertIn('report_list: FAILED', out.getvalue())
+        self.assertIn('Warmed 3/4', out.getvalue())
+
+
+from django.db import DatabaseError
+
+from apps.core.services import db_pool
+
+
+class DatabaseHealthViewTest(TestCase):
+    """health/db/ must report database reachability without authentication."""
+
+    def test_healthy_database_returns_ok(self):
+        response = self.client.get('/health/db/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['database'], 'ok')
+
+    def test_unreachable_database_returns_503(self):
+        with patch('apps.core.views.connection.cursor', side_effect=DatabaseError('down')), \
+                self.assertLogs('apps.core.views', level='ERROR'):
+            response = self.client.get('/health/db/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['database'], 'unavailable')
+
+
+class PoolStatsTest(SimpleTestCase):
+
+    def _patch_pool(self, pool):
+        conns = {'default': MagicMock(pool=pool)}
+        return patch.object(db_pool, 'connections', conns)
+
+    def test_returns_none_without_pool(self):
+        with self._patch_pool(None):
+            self.assertIsNone(db_pool.get_pool_stats())
+
+    def test_average_wait_time_from_pool_counters(self):
+        pool = MagicMock()
+        pool.get_stats.return_value = {
+            'pool_size': 4, 'pool_available': 1, 'pool_max': 5,
+            'requests_num': 8, 'requests_wait_ms': 20, 'requests_errors': 1,
+        }
+        with self._patch_pool(pool):
+            stats = db_pool.get_pool_stats()
+        self.assertEqual(stats['wait_ms_avg'], 2.5)
+        self.assertEqual(stats['requests_errors'], 1)
+        self.assertEqual(stats['requests_waiting'], 0)
+
+
+import importlib
+import json
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.http import JsonResponse
+
+from apps.core import fastjson
+
+
+class FastJsonTest(SimpleTestCase):
+    """The fast JSON backend must produce the same data with or without orjson."""
+
+    PAYLOAD = {
+        'nome_operatore': 'Niccolò Rossi',
+        'data': datetime(2025, 3, 1, 10, 30),
+        1: 'non-string key',
+        'detail': {'amount': Decimal('1.50'), 'items': [1, 2.5, None, True]},
+    }
+
+    def _backends(self):
+        yield fastjson
+        with patch.dict(sys.modules, {'orjson': None}):
+            yield importlib.reload(fastjson)
+        importlib.reload(fastjson)
+
+    def test_dumps_matches_stdlib_default_str(self):
+        expected = json.loads(json.dumps(self.PAYLOAD, default=str))
+        for backend in self._backends():
+            with self.subTest(backend=backend.BACKEND):
+                self.assertEqual(json.loads(backend.dumps(self.PAYLOAD)), expected)
+
+    def test_non_ascii_is_not_escaped(self):
+        for backend in self._backends():
+            with self.subTest(backend=backend.BACKEND):
+                self.assertIn('Niccolò'.encode(), backend.dumpb({'n': 'Niccolò'}))
+
+    def test_response_matches_json_response(self):
+        data = {'data': [{'when': date(2025, 3, 1), 'amount': Decimal('2.5')}], 'total': 1}
+        expected = json.loads(JsonResponse(data).content)
+        for backend in self._backends():
+            with self.subTest(backend=backend.BACKEND):
+                response = backend.FastJsonResponse(data, status=201)
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(json.loads(response.content), expected)
+
+    def test_response_rejects_non_dict_unless_unsafe(self):
+        with self.assertRaises(TypeError):
+            fastjson.FastJsonResponse([1, 2])
+        self.assertEqual(json.loads(fastjson.FastJsonResponse([1, 2], safe=False).content), [1, 2])
+
+
+import threading
+import time
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from apps.core.ratelimit import SlidingWindowLimiter, incr_counter, parse_rate, rate_limit
+
+
+def _run_concurrently(func, threads=16, calls=25):
+    """Call func threads * calls times from parallel threads; return the results."""
+    results = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker():
+        start.wait()
+        local = [func() for _ in range(calls)]
+        with lock:
+            results.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+class RateLimiterTest(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_increments_are_all_counted(self):
+        results = _run_concurrently(lambda: incr_counter("ratelimit_test_counter", timeout=60))
+        self.assertEqual(sorted(results), list(range(1, 16 * 25 + 1)))
+        self.assertEqual(cache.get("ratelimit_test_counter"), 16 * 25)
+
+    def test_counter_recreated_by_incr_after_expiring_still_expires(self):
+        # RedisCache.incr checks that the key exists, then INCRs it: a key
+        # expiring in between is recreated by INCR as 1 with no TTL.
+        key = "ratelimit_test_counter"
+        cache.set(key, 3, timeout=60)
+
+        def expire_then_incr(k, delta=1):
+            cache.set(k, delta, timeout=None)
+            return delta
+
+        with patch.object(cache, "incr", side_effect=expire_then_incr):
+            self.assertEqual(incr_counter(key, timeout=60), 1)
+        self.assertEqual(cache.get(key), 1)
+        later = time.time() + 61
+        with patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertIsNone(cache.get(key))
+
+    def test_concurrent_hits_allow_exactly_the_limit(self):
+        limiter = SlidingWindowLimiter("test", limit=100, window=3600)
+        now = 3600 * 1000 + 1  # start of a window: no previous hits
+        results = _run_concurrently(lambda: limiter.hit("mario", now=now))
+        self.assertEqual(sum(r.allowed for r in results), 100)
+        self.assertEqual(limiter.count("mario", now=now), 16 * 25)
+
+    def test_previous_window_is_weighted_by_overlap(self):
+        limiter = SlidingWindowLimiter("test", limit=10, window=60)
+        for _ in range(10):
+            limiter.hit("mario", now=600)
+        self.assertFalse(limiter.hit("mario", now=610).allowed)
+        # Half-way through the next window half of the previous hits still count.
+        self.assertEqual(limiter.count("mario", now=690), 5)
+        self.assertTrue(limiter.hit("mario", now=690).allowed)
+        self.assertEqual(limiter.count("mario", now=720), 1)
+
+    def test_identities_are_independent_and_reset(self):
+        limiter = SlidingWindowLimiter("test", limit=1, window=60)
+        self.assertTrue(limiter.hit("mario", now=600).allowed)
+        self.assertFalse(limiter.hit("mario", now=601).allowed)
+        self.assertTrue(limiter.hit("luigi", now=601).allowed)
+        limiter.reset("mario", now=601)
+        self.assertTrue(limiter.hit("mario", now=602).allowed)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/60"), (10, 60))
+        self.assertEqual(parse_rate("10"), (10, 60))
+        self.assertIsNone(parse_rate(""))
+        self.assertIsNone(parse_rate("0/60"))
+
+
+@rate_limit("test_view", "TEST_VIEW_RATE_LIMIT")
+def _limited_view(request):
+    return HttpResponse("ok")
+
+
+class RateLimitDecoratorTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user("limited")
+
+    def _get(self, user=None):
+        request = self.factory.get("/limited/")
+        request.user = user or self.user
+        return _limited_view(request)
+
+    @override_settings(TEST_VIEW_RATE_LIMIT="2/60")
+    def test_returns_429_with_retry_after_over_the_limit(self):
+        self.assertEqual(self._get().status_code, 200)
+        self.assertEqual(self._get().status_code, 200)
+        response = self._get()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response["Retry-After"]) <= 60)
+
+    @override_settings(TEST_VIEW_RATE_LIMIT="1/60")
+    def test_limits_are_per_user(self):
+        other = get_user_model().objects.create_user("other")
+        self.assertEqual(self._get().status_code, 200)
+        self.assertEqual(self._get(other).status_code, 200)
+        self.assertEqual(self._get().status_code, 429)
+
+    @override_settings(TEST_VIEW_RATE_LIMIT="")
+    def test_empty_rate_disables_the_limit(self):
+        for _ in range(5):
+            self.assertEqual(self._get().status_code, 200)
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.core import timing
+from apps.core.services.arcgis import ArcGISService
+
+
+def _timed_view(calls, pool=timing.ContextThreadPoolExecutor):
+    def view(request):
+        with timing.timed('mapping'):
+            with timing.timed('mapping'):  # nested: counted once
+                pass
+        with pool(max_workers=4) as executor:
+            for _ in range(calls):
+                executor.submit(timing.record_upstream, 0.01, 100)
+        return HttpResponse('ok')
+    return view
+
+
+class ServerTimingMiddlewareTest(SimpleTestCase):
+
+    def _call(self, view):
+        request = RequestFactory().get('/report/')
+        return timing.ServerTimingMiddleware(view)(request)
+
+    def test_counts_upstream_calls_from_pool_workers(self):
+        with self.assertLogs('apps.core.timing', level='INFO') as cm:
+            response = self._call(_timed_view(3))
+        header = response['Server-Timing']
+        self.assertIn('arcgis;dur=30.0;desc="3 calls"', header)
+        self.assertIn('mapping;dur=', header)
+        self.assertIn('total;dur=', header)
+        detail = cm.records[0].detail
+        self.assertEqual((detail['upstream_calls'], detail['upstream_bytes']), (3, 300))
+        self.assertEqual(list(detail['phases_ms']), ['mapping'])
+        self.assertFalse(detail['upstream_calls_exceeded'])
+
+    def test_plain_thread_pool_does_not_propagate_the_request(self):
+        response = self._call(_timed_view(3, pool=ThreadPoolExecutor))
+        self.assertIn('desc="0 calls"', response['Server-Timing'])
+
+    @override_settings(UPSTREAM_CALLS_WARN_THRESHOLD=2)
+    def test_flags_requests_over_the_upstream_threshold(self):
+        with self.assertLogs('apps.core.timing', level='WARNING') as cm:
+            self._call(_timed_view(3))
+        self.assertTrue(cm.records[0].detail['upstream_calls_exceeded'])
+
+    def test_counts_upstream_calls_of_a_streamed_body(self):
+        def rows():
+            for row in (b'a\n', b'b\n'):
+                timing.record_upstream(0.01, 10)
+                yield row
+
+        def view(request):
+            timing.record_upstream(0.01, 10)  # first chunk, before the response
+            return StreamingHttpResponse(rows())
+
+        with self.assertLogs('apps.core.timing', level='INFO') as cm:
+            response = self._call(view)
+            self.assertEqual(cm.records, [])  # logged when the stream ends
+            self.assertIn('desc="1 calls"', response['Server-Timing'])
+            self.assertEqual(b''.join(response.streaming_content), b'a\nb\n')
+        self.assertEqual(cm.records[0].detail['upstream_calls'], 3)
+        self.assertIsNone(timing.current_timing())
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_disabled(self):
+        self.assertFalse(self._call(_timed_view(1)).has_header('Server-Timing'))
+
+    def test_hooks_are_noops_outside_a_request(self):
+        self.assertIsNone(timing.current_timing())
+        timing.record_upstream(1.0, 10)
+        with timing.timed('render'):
+            pass
+
+    def test_arcgis_calls_are_recorded(self):
+        service = ArcGISService()
+        fake = MagicMock(content=b'x' * 42)
+        fake.json.return_value = {'features': []}
+
+        def view(request):
+            with patch('apps.core.services.arcgis.requests.get', return_value=fake), \
+                    patch.object(service, 'get_token', return_value='token'):
+                service.query_layer(0)
+            return HttpResponse('ok')
+
+        with self.assertLogs('apps.core.timing', level='INFO') as cm:
+            self._call(view)
+        self.assertEqual(cm.records[0].detail['upstream_calls'], 1)
+        self.assertEqual(cm.records[0].detail['upstream_bytes'], 42)
+
+
+import os
+import tempfile
+
+from prometheus_client import REGISTRY
+
+from apps.core import metrics
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(TestCase):
+
+    def test_metrics_endpoint_needs_no_login(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'app_request_duration_seconds', response.content)
+
+    def test_request_latency_is_labelled_with_the_url_name(self):
+        before = _sample('app_request_duration_seconds_count', view='health', method='GET', status='200')
+        self.client.get('/health/')
+        after = _sample('app_request_duration_seconds_count', view='health', method='GET', status='200')
+        self.assertEqual(after, before + 1)
+
+    def test_cache_lookups_are_counted_by_result(self):
+        before = _sample('app_cache_requests_total', cache='token', result='hit')
+        metrics.record_cache('token', True)
+        self.assertEqual(_sample('app_cache_requests_total', cache='token', result='hit'), before + 1)
+
+    def test_pool_tasks_are_tracked(self):
+        before = _sample('app_thread_pool_queue_wait_seconds_count', pool='test_pool')
+        with timing.ContextThreadPoolExecutor(max_workers=2, name='test_pool') as executor:
+            self.assertEqual(executor.submit(lambda x: x * 2, 21).result(), 42)
+        self.assertEqual(_sample('app_thread_pool_queue_wait_seconds_count', pool='test_pool'), before + 1)
+        self.assertEqual(_sample('app_thread_pool_tasks_in_progress', pool='test_pool'), 0)
+
+    def test_multiprocess_mode_aggregates_the_metrics_directory(self):
+        with tempfile.TemporaryDirectory() as metrics_dir, \
+                patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': metrics_dir}), \
+                patch.object(metrics.multiprocess, 'MultiProcessCollector') as collector:
+            response = metrics.metrics_view(RequestFactory().get('/metrics'))
+        self.assertEqual(response.status_code, 200)
+        collector.assert_called_once()
+
+
+from pathlib import Path
+
+from django.core.exceptions import MiddlewareNotUsed
+
+from apps.core import profiling
+
+
+def _request_thread_work():
+    time.sleep(0.15)
+
+
+def _pool_worker_work():
+    time.sleep(0.15)
+
+
+def _profiled_view(request):
+    with timing.ContextThreadPoolExecutor(max_workers=1, name='test_pool') as executor:
+        future = executor.submit(_pool_worker_work)
+        _request_thread_work()
+        future.result()
+    return HttpResponse('ok')
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_THRESHOLD_MS=100, PROFILING_MAX_FILES=5)
+class SamplingProfilerTest(SimpleTestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+        sampler = patch.object(profiling, '_sampler', profiling.StackSampler(0.005))
+        sampler.start()
+        self.addCleanup(sampler.stop)
+
+    def _call(self, view, **headers):
+        with override_settings(PROFILING_DIR=self.directory):
+            middleware = profiling.SamplingProfilerMiddleware(view)
+        return middleware(RequestFactory().get('/reports/pdf/', headers=headers))
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            profiling.SamplingProfilerMiddleware(_profiled_view)
+
+    def test_slow_request_profile_covers_pool_workers(self):
+        with self.assertLogs('apps.core.profiling', level='WARNING') as cm:
+            self._call(_profiled_view, X_Request_ID='req-42')
+        [path] = self.directory.glob('*_req-42.folded')
+        lines = path.read_text().splitlines()
+        self.assertTrue(any(
+            line.startswith('request;') and '_request_thread_work' in line for line in lines
+        ))
+        self.assertTrue(any(
+            line.startswith('pool:test_pool;') and '_pool_worker_work' in line for line in lines
+        ))
+        self.assertEqual(cm.records[0].detail['request_id'], 'req-42')
+
+    def test_fast_request_is_discarded(self):
+        self._call(lambda request: HttpResponse('ok'))
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_untrusted_request_id_is_replaced(self):
+        self._call(_profiled_view, X_Request_ID='../../etc/passwd')
+        [path] = self.directory.glob('*.folded')
+        self.assertNotIn('passwd', path.name)
+
+    def test_oldest_profiles_are_rotated(self):
+        for n in range(4):
+            profile = profiling.RequestProfile(f'r{n}')
+            profile.add(('request', 'view'))
+            profiling.write_profile(profile, self.directory, max_files=2)
+        self.assertEqual(len(list(self.directory.glob('*.folded'))), 2)
+
+
+from apps.core.services.arcgis import ArcGISError
+
+
+class ArcGISPagedQueryTest(SimpleTestCase):
+    """iter_features follows exceededTransferLimit past maxRecordCount."""
+
+    MAX_RECORDS = 3
+
+    def setUp(self):
+        self.service = ArcGISService()
+        self.calls = []
+
+    def _layer(self, total, error_at=None, counted=None):
+        def query_layer(layer_id, where, out_fields, **params):
+            self.calls.append(params)
+            if params.get('returnCountOnly'):
+                return {'count': total if counted is None else counted}
+            offset = params['resultOffset']
+            if offset == error_at:
+                return {'error': 'upstream failure'}
+            ids = range(offset, min(offset + self.MAX_RECORDS, total))
+            result = {'features': [{'attributes': {'objectid': i + 1}} for i in ids]}
+            if offset + self.MAX_RECORDS < total:
+                result['exceededTransferLimit'] = True
+            return result
+        return patch.object(self.service, 'query_layer', side_effect=query_layer)
+
+    def _ids(self, features):
+        return [f['attributes']['objectid'] for f in features]
+
+    def test_complete_first_page_is_a_single_call(self):
+        with self._layer(2):
+            self.assertEqual(self._ids(self.service.iter_features(0)), [1, 2])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.calls[0]['orderByFields'], 'objectid ASC')
+
+    def test_truncated_result_is_paged_in_order(self):
+        with self._layer(10):
+            ids = self._ids(self.service.iter_features(0, max_workers=2))
+        self.assertEqual(ids, list(range(1, 11)))
+        offsets = sorted(c['resultOffset'] for c in self.calls if 'resultOffset' in c)
+        self.assertEqual(offsets, [0, 3, 6, 9])
+        self.assertEqual(sum(1 for c in self.calls if c.get('returnCountOnly')), 1)
+
+    def test_features_added_after_the_count_are_read(self):
+        with self._layer(10, counted=4):
+            ids = self._ids(self.service.iter_features(0))
+        self.assertEqual(ids, list(range(1, 11)))
+
+    def test_page_error_raises(self):
+        with self._layer(10, error_at=6):
+            with self.assertRaises(ArcGISError):
+                list(self.service.iter_features(0))
+
+    def test_report_rows_are_not_truncated(self):
+        from apps.reports.services.report_list import get_report_rows
+        cache.clear()
+        with patch('apps.reports.services.report_list.iter_feature_layer', self.service.iter_features), \
+             self._layer(8):
+            rows = get_report_rows('1=1')['rows']
+        self.assertEqual(len(rows), 8)
+
+
+from apps.core import mvt
+
+
+class MvtEncoderTest(SimpleTestCase):
+    """Vector tiles written by apps.core.mvt follow the MVT 2.1 wire format."""
+
+    def test_point_geometry_matches_the_specification_example(self):
+        layer = mvt.Layer('points')
+        layer.add_point(25, 17, {})
+        tile = mvt.encode_tile([layer])
+        # MoveTo(1) to (25, 17): packed [9, 50, 34] (section 4.3.5.1 of the spec)
+        self.assertIn(bytes([0x22, 3, 9, 50, 34]), tile)
+        self.assertEqual(mvt.decode_tile(tile)['points']['features'][0]['x'], 25)
+
+    def test_round_trip_shares_keys_and_values(self):
+        layer = mvt.Layer('reports', extent=512)
+        layer.add_point(-10, 600, {'tratta': 'A7', 'point_count': 3, 'ok': True, 'missing': None}, feature_id=7)
+        layer.add_point(4, 5, {'tratta': 'A7', 'score': -1.5, 'delta': -2, 'flag': 1})
+        decoded = mvt.decode_tile(mvt.encode_tile([layer, mvt.Layer('empty')]))
+        self.assertEqual(list(decoded), ['reports'])
+        self.assertEqual(decoded['reports']['extent'], 512)
+        first, second = decoded['reports']['features']
+        self.assertEqual((first['id'], first['x'], first['y']), (7, -10, 600))
+        self.assertEqual(first['properties'], {'tratta': 'A7', 'point_count': 3, 'ok': True})
+        self.assertEqual(second['properties'], {'tratta': 'A7', 'score': -1.5, 'delta': -2, 'flag': 1})
+        self.assertNotIsInstance(second['properties']['flag'], bool)
+        self.assertEqual(len(layer._values), 6)
+
+    def test_tile_without_features_is_empty(self):
+        self.assertEqual(mvt.encode_tile([mvt.Layer('reports')]), b'')
+        self.assertEqual(mvt.decode_tile(b''), {})
+
+
+import random
+
+from apps.core.intervals import IntervalIndex
+
+
+class IntervalIndexTest(SimpleTestCase):
+    """Overlap queries of apps.core.intervals.IntervalIndex."""
+
+    def test_matches_a_linear_scan(self):
+        rng = random.Random(50)
+        for n in (0, 1, 2, 7, 8, 9, 100, 1000):
+            intervals = []
+            for value in range(n):
+                start = rng.uniform(0, 100)
+                intervals.append((start, start + rng.choice((0, rng.expovariate(0.5))), value))
+            index = IntervalIndex(intervals)
+            for _ in range(50):
+                lo = rng.uniform(-5, 105)
+                hi = lo + rng.expovariate(0.2)
+                expected = sorted(intervals, key=lambda i: (i[0], i[1], i[2]))
+                expected = [v for s, e, v in expected if s <= hi and e >= lo]
+                with self.subTest(n=n, lo=lo, hi=hi):
+                    self.assertEqual(index.overlapping(lo, hi), expected)
+
+    def test_bounds_are_closed_and_reversed_intervals_normalized(self):
+        index = IntervalIndex([(5.0, 1.0, 0), (5.0, 5.0, 1), (6.0, 9.0, 2)])
+        self.assertEqual(index.overlapping(5.0, 5.0), [0, 1])
+        self.assertEqual(index.overlapping(0.0, 1.0), [0])
+        self.assertEqual(index.overlapping(9.0, float('inf')), [2])
+        self.assertEqual(index.overlapping(5.5, 5.9), [])
+        self.assertEqual(len(index), 3)
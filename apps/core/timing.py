@@ -0,0 +1,191 @@
+"""
+Per-request timing and upstream (ArcGIS) call accounting.
+
+ServerTimingMiddleware creates a RequestTiming for every request and makes
+it current through a context variable. While the request runs:
+
+- ArcGISService reports each HTTP call with ``record_upstream``;
+- ``timed(phase)`` (context manager or decorator) adds wall time to a named
+  phase such as ``mapping``, ``render`` or ``pdf``;
+- thread pools must be ``ContextThreadPoolExecutor`` so that their workers
+  see the request's RequestTiming (plain ThreadPoolExecutor workers start
+  from an empty context and record nothing).
+
+At the end of the request the totals are returned in a ``Server-Timing``
+header and logged as one structured line on the ``apps`` log; requests with
+more than UPSTREAM_CALLS_WARN_THRESHOLD upstream calls are logged at WARNING.
+For a streaming response the header can only carry what happened before the
+first byte: calls made while the body streams are counted in the log line,
+which is written when the stream ends.
+Outside a request every hook is a no-op.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from apps.core.metrics import track_pool_task
+from apps.core.profiling import profiled_task
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar("request_timing", default=None)
+# Phases being timed in this context, so nested timed() blocks of the same
+# phase (e.g. process_features -> process_attributes) count once.
+_active_phases = contextvars.ContextVar("request_timing_phases", default=frozenset())
+
+
+class RequestTiming:
+    """Upstream call counters and phase durations (seconds) of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.upstream_calls = 0
+        self.upstream_bytes = 0
+        self.upstream_seconds = 0.0
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def add_upstream(self, seconds, nbytes):
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_bytes += nbytes
+            self.upstream_seconds += seconds
+
+    def add_phase(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def server_timing(self, total_seconds):
+        """Value of the Server-Timing header (durations in milliseconds)."""
+        metrics = [
+            f'arcgis;dur={self.upstream_seconds * 1000:.1f};desc="{self.upstream_calls} calls"'
+        ]
+        metrics += [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        metrics.append(f"total;dur={total_seconds * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+def current_timing():
+    """Return the RequestTiming of the current request, or None."""
+    return _current.get()
+
+
+def record_upstream(seconds, nbytes=0):
+    """Count one upstream HTTP call of the current request."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add_upstream(seconds, nbytes)
+
+
+@contextmanager
+def timed(phase):
+    """Add the wall time of the block to phase on the current request."""
+    timing = _current.get()
+    active = _active_phases.get()
+    if timing is None or phase in active:
+        yield
+        return
+    token = _active_phases.set(active | {phase})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add_phase(phase, time.perf_counter() - start)
+        _active_phases.reset(token)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor whose tasks run in a copy of the submitter's context.
+
+    name labels the pool's queue wait and concurrency metrics and its
+    threads in slow-request profiles (apps.core.profiling).
+    """
+
+    def __init__(self, *args, name='default', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = name
+
+    def submit(self, fn, /, *args, **kwargs):
+        task = track_pool_task(self.name, profiled_task(fn, self.name))
+        return super().submit(contextvars.copy_context().run, task, *args, **kwargs)
+
+
+class ServerTimingMiddleware:
+    """Measure the request and report it via Server-Timing and the apps log."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header_enabled = getattr(settings, 'SERVER_TIMING_HEADER', True)
+        self.warn_threshold = getattr(settings, 'UPSTREAM_CALLS_WARN_THRESHOLD', 20)
+
+    def __call__(self, request):
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - timing.started
+        if self.header_enabled:
+            response['Server-Timing'] = timing.server_timing(total)
+        if response.streaming:
+            response.streaming_content = self._stream(
+                request, response, timing, response.streaming_content,
+            )
+        else:
+            self._log(request, response, timing, total)
+        return response
+
+    def _stream(self, request, response, timing, content):
+        """
+        Yield content with timing current while each chunk is produced.
+
+        The body of a streaming response (e.g. /api/export/) is generated
+        after __call__ has returned, so its upstream calls are counted here
+        and the request is logged once the stream ends (or is closed).
+        """
+        chunks = iter(content)
+        try:
+            while True:
+                token = _current.set(timing)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield chunk
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            self._log(request, response, timing, time.perf_counter() - timing.started)
+
+    def _log(self, request, response, timing, total):
+        flagged = timing.upstream_calls > self.warn_threshold
+        if not flagged and not logger.isEnabledFor(logging.INFO):
+            return
+        logger.log(
+            logging.WARNING if flagged else logging.INFO,
+            "%s %s %s %.1fms, %d upstream calls",
+            request.method, request.path, response.status_code,
+            total * 1000, timing.upstream_calls,
+            extra={"detail": {
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total * 1000, 1),
+                "upstream_calls": timing.upstream_calls,
+                "upstream_bytes": timing.upstream_bytes,
+                "upstream_ms": round(timing.upstream_seconds * 1000, 1),
+                "phases_ms": {p: round(s * 1000, 1) for p, s in timing.phases.items()},
+                "upstream_calls_exceeded": flagged,
+            }},
+        )
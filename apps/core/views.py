@@ -1,11 +1,18 @@
 """Core application views."""
 
+import logging
+
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.db import DatabaseError, connection
 from django.http import JsonResponse
 from django.views import View
 from django.utils.decorators import method_decorator
 
+from apps.core.services.db_pool import get_pool_stats
+
+logger = logging.getLogger(__name__)
+
 
 @method_decorator(login_required, name='dispatch')
 class HomeView(View):
@@ -22,3 +29,16 @@ class HealthView(View):
 
     def get(self, request):
         return JsonResponse({'status': 'ok'})
+
+
+class DatabaseHealthView(View):
+    """Readiness probe: round-trips to the database and reports pool usage. No auth required."""
+
+    def get(self, request):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except DatabaseError:
+            logger.exception("Database health check failed")
+            return JsonResponse({'status': 'error', 'database': 'unavailable'}, status=503)
+        return JsonResponse({'status': 'ok', 'database': 'ok', 'pool': get_pool_stats()})
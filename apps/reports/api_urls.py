@@ -1,12 +1,15 @@
 """URL configuration for reports app - API views."""
 
 from django.urls import path
-from .views.api import get_data, get_filter_options, image_proxy
+from .views.api import export_data, get_data, get_filter_options, get_geo, get_interventions, image_proxy
 
 app_name = 'reports_api'
 
 urlpatterns = [
     path('data/', get_data, name='get_data'),
+    path('export/', export_data, name='export_data'),
     path('filters/', get_filter_options, name='get_filters'),
+    path('geo/', get_geo, name='get_geo'),
+    path('interventions/', get_interventions, name='get_interventions'),
     path('image/<int:layer>/<int:object_id>/<int:attachment_id>/', image_proxy, name='image_proxy'),
 ]
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.reports.services.report_tiles import prune_tiles
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired vector tiles from REPORTS_TILE_CACHE_DIR, then the oldest "
+        "beyond REPORTS_TILE_CACHE_MAX_FILES, and the directories left empty."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age", type=int, default=None,
+            help="Delete tiles older than this many seconds (default: REPORTS_TILE_CACHE_TIMEOUT)",
+        )
+        parser.add_argument(
+            "--max-files", type=int, default=None,
+            help="Tiles to keep at most (default: REPORTS_TILE_CACHE_MAX_FILES)",
+        )
+
+    def handle(self, *args, **options):
+        removed = prune_tiles(max_age=options["max_age"], max_files=options["max_files"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {removed} vector tile(s)"))
@@ -7,6 +7,9 @@ Ported from PHP field_mappings.php
 from datetime import datetime
 from typing import Any, Optional
 
+from apps.core.timing import timed
+from apps.reports.records import ProcessedAttribute, ProcessedFeature
+
 # =============================================================================
 # Field Labels - Map field codes to human-readable labels
 # =============================================================================
@@ -459,6 +462,10 @@ def format_date(timestamp: Any, format_str: str = '%d/%m/%Y') -> str:
         return str(timestamp)
 
 
+# Fallback labels, built once per field so every record shares the string
+_derived_labels = {}
+
+
 def get_field_label(field_name: str) -> str:
     """
     Get the human-readable label for a field.
@@ -473,16 +480,27 @@ def get_field_label(field_name: str) -> str:
         return FIELD_LABELS[field_name]
 
     # Convert snake_case to Title Case as fallback
-    return field_name.replace('_', ' ').title()
+    label = _derived_labels.get(field_name)
+    if label is None:
+        label = _derived_labels[field_name] = field_name.replace('_', ' ').title()
+    return label
 
 
-def get_field_value(field_name: str, value: Any) -> str:
+def get_reports_mappings() -> dict:
+    """CSV mappings of the reports app, to be resolved once per batch of values."""
+    from apps.core.services.csv_mapping import get_csv_mappings
+    return get_csv_mappings(app='reports')
+
+
+def get_field_value(field_name: str, value: Any, csv_mappings: Optional[dict] = None) -> str:
     """
     Get the display value for a field.
 
     Args:
         field_name: The field code/name
         value: The raw value
+        csv_mappings: get_reports_mappings() when mapping many values; each
+            call otherwise reads the mappings from the cache
 
     Returns:
         Human-readable value or original value
@@ -499,9 +517,10 @@ def get_field_value(field_name: str, value: Any) -> str:
                 pass
 
     # CSV-based mapping (primary source, lazy-loaded with TTL refresh).
-    # Raises explicitly on fetch failure — callers receive a Django 500.
-    from apps.core.services.csv_mapping import get_csv_mappings
-    csv_mappings = get_csv_mappings(app='reports')
+    # Falls back to the last persisted snapshot if Portal is unreachable;
+    # raises only when no snapshot exists — callers receive a Django 500.
+    if csv_mappings is None:
+        csv_mappings = get_reports_mappings()
     if field_name in csv_mappings:
         mapping = csv_mappings[field_name]
         raw = str(value)
@@ -529,6 +548,55 @@ def get_field_value(field_name: str, value: Any) -> str:
     return str(value) if value is not None else ''
 
 
+def iter_attributes(attributes: dict, section: str = 'main', csv_mappings: Optional[dict] = None):
+    """
+    Yield the display-ready entries of one feature's attributes, lazily.
+
+    Fields come in FIELD_ORDER for section when it defines one, otherwise in
+    attribute order; empty values are skipped.
+
+    Yields:
+        ProcessedAttribute records
+    """
+    if csv_mappings is None and attributes:
+        csv_mappings = get_reports_mappings()
+    field_order = FIELD_ORDER.get(section, [])
+    if field_order:
+        items = ((f, attributes[f]) for f in field_order if f in attributes)
+    else:
+        items = attributes.items()
+
+    for field_name, original_value in items:
+        if not is_empty(original_value):
+            yield ProcessedAttribute(
+                field_name,
+                get_field_label(field_name),
+                get_field_value(field_name, original_value, csv_mappings),
+                original_value,
+            )
+
+
+def iter_processed_features(features, section: str = 'main'):
+    """
+    Process features one at a time as they are consumed.
+
+    features may be any iterable, e.g. the paged ``iter_feature_layer``
+    stream: only the feature being processed (plus the ArcGIS page it came
+    in) is alive, whatever the size of the layer. The CSV mappings are read
+    once for the whole stream, so all features share the label strings.
+
+    Yields:
+        ProcessedFeature records
+    """
+    csv_mappings = get_reports_mappings()
+    for feature in features:
+        yield ProcessedFeature(
+            list(iter_attributes(feature.get('attributes', {}), section, csv_mappings)),
+            feature.get('geometry'),
+        )
+
+
+@timed('mapping')
 def process_attributes(attributes: dict, section: str = 'main') -> list:
     """
     Process raw attributes into display-ready format.
@@ -538,68 +606,35 @@ def process_attributes(attributes: dict, section: str = 'main') -> list:
         section: Section name for field ordering
 
     Returns:
-        List of dicts with 'field', 'label', 'value', 'original_value' keys
+        List of ProcessedAttribute records (field, label, value, original_value)
     """
-    processed = []
-    field_order = FIELD_ORDER.get(section, [])
-
-    if field_order:
-        # Process fields in defined order
-        for field_name in field_order:
-            if field_name in attributes:
-                original_value = attributes[field_name]
-
-                if not is_empty(original_value):
-                    processed.append({
-                        'field': field_name,
-                        'label': get_field_label(field_name),
-                        'value': get_field_value(field_name, original_value),
-                        'original_value': original_value,
-                    })
-    else:
-        # Process all fields (excluding empty ones)
-        for field_name, original_value in attributes.items():
-            if not is_empty(original_value):
-                processed.append({
-                    'field': field_name,
-                    'label': get_field_label(field_name),
-                    'value': get_field_value(field_name, original_value),
-                    'original_value': original_value,
-                })
-
-    return processed
+    return list(iter_attributes(attributes, section))
 
 
+@timed('mapping')
 def process_features(features: list, section: str = 'main') -> list:
     """
     Process a list of features.
 
+    Use iter_processed_features to stream large feature sets instead.
+
     Args:
         features: List of feature dicts with 'attributes' and optionally 'geometry'
         section: Section name for field ordering
 
     Returns:
-        List of processed feature dicts
+        List of ProcessedFeature records (attributes, geometry)
     """
-    processed = []
-
-    for feature in features:
-        processed.append({
-            'attributes': process_attributes(feature.get('attributes', {}), section),
-            'geometry': feature.get('geometry'),
-        })
-
-    return processed
+    return list(iter_processed_features(features, section))
 
 
 def get_field_options(field_name: str) -> dict:
     """Get all possible values for a field (useful for dropdowns).
 
     CSV-based mappings take priority over hardcoded FIELD_VALUES.
-    Raises explicitly if the CSV fetch fails.
+    Raises if the CSV fetch fails and no persisted snapshot exists.
     """
-    from apps.core.services.csv_mapping import get_csv_mappings
-    csv_mappings = get_csv_mappings(app='reports')
+    csv_mappings = get_reports_mappings()
     if field_name in csv_mappings:
         return csv_mappings[field_name]
     return FIELD_VALUES.get(field_name, {})
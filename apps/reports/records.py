@@ -0,0 +1,102 @@
+"""
+Compact record types for report rows and processed attributes.
+
+Frozen slotted dataclasses instead of one dict per row/attribute: no
+per-instance ``__dict__`` and no repeated key strings. Labels and coded
+values are shared objects (FIELD_LABELS, the CSV mapping in use, or the
+``shared`` table of ``ReportRow.from_attributes``), so a list of thousands of
+records holds one copy of each distinct string.
+
+Templates read the records like the former dicts (``attr.label``), and
+``attr['label']`` / ``attr.get('label')`` keep working for code written
+against dicts.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+
+class _RecordAccess:
+    """Dict-style read access to the fields of a slotted dataclass."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessedAttribute(_RecordAccess):
+    """One display-ready attribute of a feature."""
+
+    field: str
+    label: str
+    value: str
+    original_value: Any = None
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessedFeature(_RecordAccess):
+    """A feature whose attributes went through the display mapping."""
+
+    attributes: list
+    geometry: Any = None
+
+
+@dataclass(frozen=True, slots=True)
+class ReportRow(_RecordAccess):
+    """The layer-0 attributes the report list and its filters need."""
+
+    objectid: Any = None
+    uniquerowid: Any = None
+    nome_operatore: Any = None
+    tratta: Any = None
+    tipologia_appalto: Any = None
+    data_rilevamento: Any = None
+
+    @classmethod
+    def from_attributes(cls, attributes, shared=None):
+        """
+        Build a row from ArcGIS attributes.
+
+        shared maps each coded value to one canonical string; pass the same
+        dict for all the rows of a list so repeated codes are stored once.
+        """
+        if shared is None:
+            shared = {}
+        return cls(
+            attributes.get('objectid'),
+            attributes.get('uniquerowid'),
+            _shared(shared, attributes.get('nome_operatore')),
+            _shared(shared, attributes.get('tratta')),
+            _shared(shared, attributes.get('tipologia_appalto')),
+            attributes.get('data_rilevamento'),
+        )
+
+
+def _shared(table, value):
+    return value if value is None else table.setdefault(value, value)
+
+
+@dataclass(frozen=True, slots=True)
+class Intervention(_RecordAccess):
+    """A report or one of its pavement rows, located by route kilometre."""
+
+    kind: str
+    uniquerowid: Any
+    tratta: Any
+    carreggiata: Any
+    pk_iniz: Any
+    pk_fin: Any
+    data_rilevamento: Any
+    tipologia_appalto: Any
+    corsia: Any = None
+    tipo_intervento_pav: Any = None
@@ -1,16 +1,18 @@
 """Service for fetching and processing report data from ArcGIS."""
 
-import math
 import uuid
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 
 from apps.core.services.arcgis import query_feature_layer, get_attachments
+from apps.core.timing import ContextThreadPoolExecutor
 from apps.reports.mappings import (
     get_field_label,
     get_field_value,
     process_attributes,
     process_features,
 )
+from apps.reports.records import ProcessedAttribute
+from apps.reports.services.report_geo import to_wgs84
 
 
 def _validate_report_id(report_id):
@@ -53,7 +55,7 @@ def get_report_data(report_id):
     main_obj_id = main_attrs.get('objectid')
 
     # Query related records + signature in parallel
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    with ContextThreadPoolExecutor(max_workers=4, name='report_data') as executor:
         future_pk_pav = executor.submit(query_feature_layer, 1, f"parentrowid='{report_id}'")
         future_impresa = executor.submit(query_feature_layer, 2, f"parentrowid='{report_id}'")
         future_foto = executor.submit(query_feature_layer, 3, f"parentrowid='{report_id}'")
@@ -91,16 +93,12 @@ def get_report_data(report_id):
     maps_url = None
     if coords['lat'] is not None and coords['lon'] is not None:
         maps_url = _assemble_maps_url(coords['lat'], coords['lon'])
-        location_data.append({
-            'field': 'latitudine',
-            'label': 'Latitudine',
-            'value': f"{coords['lat']:.6f}",
-        })
-        location_data.append({
-            'field': 'longitudine',
-            'label': 'Longitudine',
-            'value': f"{coords['lon']:.6f}",
-        })
+        location_data.append(ProcessedAttribute(
+            'latitudine', 'Latitudine', f"{coords['lat']:.6f}", coords['lat'],
+        ))
+        location_data.append(ProcessedAttribute(
+            'longitudine', 'Longitudine', f"{coords['lon']:.6f}", coords['lon'],
+        ))
 
     # Process pavement data
     pk_pav_data = []
@@ -108,7 +106,7 @@ def get_report_data(report_id):
     if pk_pav.get('features'):
         pk_pav_processed = process_features(pk_pav['features'], 'pk_pav')
         for feature in pk_pav_processed:
-            filtered = _filter_processed_attributes(feature['attributes'], pk_pav_fields)
+            filtered = _filter_processed_attributes(feature.attributes, pk_pav_fields)
             if filtered:
                 pk_pav_data.append(filtered)
 
@@ -117,8 +115,8 @@ def get_report_data(report_id):
     if impresa.get('features'):
         impresa_processed = process_features(impresa['features'], 'impresa')
         for feature in impresa_processed:
-            if feature['attributes']:
-                impresa_data.append(feature['attributes'])
+            if feature.attributes:
+                impresa_data.append(feature.attributes)
 
     # Process photos — fetch attachment info in parallel
     photos = []
@@ -126,7 +124,7 @@ def get_report_data(report_id):
     foto_obj_ids = [f['attributes'].get('objectid') for f in foto_features if f['attributes'].get('objectid')]
 
     if foto_obj_ids:
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        with ContextThreadPoolExecutor(max_workers=5, name='report_attachments') as executor:
             future_to_obj_id = {
                 executor.submit(get_attachments, 3, obj_id): obj_id
                 for obj_id in foto_obj_ids
@@ -179,35 +177,13 @@ def get_report_data(report_id):
 
 def _filter_processed_attributes(processed, fields_to_include):
     """Filter processed attributes to only include specified fields."""
-    return [attr for attr in processed if attr['field'] in fields_to_include]
+    return [attr for attr in processed if attr.field in fields_to_include]
 
 
 def _get_coordinates(feature):
     """Extract lat/lon from feature geometry."""
-    lat = None
-    lon = None
-    geom = feature.get('geometry')
-
-    if geom:
-        x = geom.get('x')
-        y = geom.get('y')
-
-        if x is not None and y is not None:
-            try:
-                x = float(x)
-                y = float(y)
-
-                if abs(x) <= 180 and abs(y) <= 90:
-                    lon = x
-                    lat = y
-                else:
-                    # Convert Web Mercator (EPSG:3857) to WGS84
-                    lon = (x / 20037508.34) * 180
-                    lat = (y / 20037508.34) * 180
-                    lat = 180 / math.pi * (2 * math.atan(math.exp(lat * math.pi / 180)) - math.pi / 2)
-            except (ValueError, TypeError):
-                pass
-
+    geom = feature.get('geometry') or {}
+    lon, lat = to_wgs84(geom.get('x'), geom.get('y'))
     return {'lat': lat, 'lon': lon}
 
 
@@ -245,5 +221,5 @@ def _get_headers(fields):
 def _get_impresa_headers(impresa_data):
     """Get headers from first company record."""
     if impresa_data and impresa_data[0]:
-        return [attr['label'] for attr in impresa_data[0]]
+        return [attr.label for attr in impresa_data[0]]
     return []
@@ -0,0 +1,117 @@
+"""
+Service for exporting the filtered report list as CSV or XLSX.
+
+Layer-0 rows are read from ArcGIS in chunks of REPORTS_EXPORT_CHUNK_SIZE,
+ordered server-side (sort field, then objectid so the order is total), and
+streamed out as they arrive: at most one chunk is held in memory, whatever
+the number of matching reports.
+"""
+
+import csv
+
+from django.conf import settings
+
+from apps.core.services.arcgis import ArcGISError, query_feature_layer
+from apps.reports.mappings import get_field_label, get_field_value, get_reports_mappings, is_date_field, is_empty
+
+EXPORT_FIELDS = (
+    'uniquerowid',
+    'data_rilevamento',
+    'ora_rilevamento',
+    'nome_operatore',
+    'tratta',
+    'carreggiata',
+    'pk_iniz',
+    'pk_fin',
+    'tipologia_appalto',
+    'nome_dl',
+    'nome_cse',
+    'num_imprese',
+    'note',
+)
+
+
+def iter_report_rows(where='1=1', sort_by='data_rilevamento', sort_order='desc', chunk_size=None):
+    """
+    Yield the layer-0 attributes matching where, sorted by sort_by.
+
+    Chunks are requested with resultOffset/resultRecordCount; a chunk
+    shorter than requested ends the scan unless the server flags
+    exceededTransferLimit (its maxRecordCount is below chunk_size).
+
+    Raises:
+        ArcGISError: if a chunk query fails.
+    """
+    chunk_size = chunk_size or getattr(settings, 'REPORTS_EXPORT_CHUNK_SIZE', 1000)
+    direction = 'DESC' if sort_order == 'desc' else 'ASC'
+    offset = 0
+    while True:
+        result = query_feature_layer(
+            0, where,
+            out_fields=','.join(('objectid',) + EXPORT_FIELDS),
+            orderByFields=f'{sort_by} {direction},objectid {direction}',
+            resultOffset=offset,
+            resultRecordCount=chunk_size,
+            returnGeometry='false',
+        )
+        if 'error' in result:
+            raise ArcGISError(result['error'])
+        features = result.get('features', [])
+        for feature in features:
+            yield feature.get('attributes', {})
+        if not features or (len(features) < chunk_size and not result.get('exceededTransferLimit')):
+            return
+        offset += len(features)
+
+
+def export_header():
+    return [get_field_label(field) for field in EXPORT_FIELDS]
+
+
+def export_values(attrs, csv_mappings=None):
+    """Display values of one row; numbers stay numeric (XLSX numeric cells)."""
+    values = []
+    for field in EXPORT_FIELDS:
+        value = attrs.get(field)
+        if is_empty(value):
+            values.append('')
+        elif isinstance(value, (int, float)) and not is_date_field(field):
+            values.append(value)
+        else:
+            values.append(get_field_value(field, value, csv_mappings))
+    return values
+
+
+def iter_export_values(rows):
+    """export_values of each row, with the CSV mappings read once per export."""
+    csv_mappings = None
+    for attrs in rows:
+        if csv_mappings is None:
+            csv_mappings = get_reports_mappings()
+        yield export_values(attrs, csv_mappings)
+
+
+class _Echo:
+    """File-like object whose write returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_safe(value):
+    # Text starting with a formula character would be evaluated by Excel.
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows, batch_rows=200):
+    """Yield the export as CSV text in batches of rows (UTF-8 BOM for Excel)."""
+    writer = csv.writer(_Echo())
+    lines = ['\ufeff' + writer.writerow(export_header())]
+    for values in iter_export_values(rows):
+        lines.append(writer.writerow([_csv_safe(v) for v in values]))
+        if len(lines) >= batch_rows:
+            yield ''.join(lines)
+            lines.clear()
+    yield ''.join(lines)
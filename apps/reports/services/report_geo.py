@@ -0,0 +1,305 @@
+"""
+Service for the report map: report locations clustered per map tile.
+
+The locations of the reports matching a WHERE clause are read once from
+layer 0 and kept as a columnar point set (``ReportPoints``): Web Mercator
+coordinates normalised to the unit square of the XYZ tile scheme, converted
+column by column and sorted by x, plus the uniquerowid, tratta and
+tipologia_appalto of each point. The point set is cached per WHERE clause
+like the report list rows, and also backs the vector tiles
+(services/report_tiles.py).
+
+A map request is served tile by tile. The points of each tile are grouped
+on a grid of ``REPORTS_GEO_CLUSTER_CELL_SIZE`` pixel cells aligned with the
+tile, so no cell spans two tiles and every tile can be computed and cached
+on its own. A cell holding one report returns the report; a fuller cell
+returns one cluster at the centroid of its points. From
+``REPORTS_GEO_CLUSTER_MAX_ZOOM`` on every report is returned. The JSON of
+each tile is cached, so a pan only computes the tiles that came into view.
+"""
+
+import math
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.fastjson import dumpb
+from apps.core.metrics import record_cache
+from apps.core.services.arcgis import ArcGISError, iter_feature_layer
+from apps.reports.records import _shared
+from apps.reports.services.report_list import _where_digest
+
+POINTS_CACHE_KEY_PREFIX = 'reports_points_'
+TILE_CACHE_KEY_PREFIX = 'reports_geo_tile_'
+
+# Layer-0 attributes kept with each point
+POINT_FIELDS = ('uniquerowid', 'tratta', 'tipologia_appalto')
+
+TILE_SIZE = 256
+MAX_ZOOM = 22
+MAX_LATITUDE = 85.05112878
+MERCATOR_EXTENT = 20037508.342789244
+
+
+def to_wgs84(x, y):
+    """
+    Return (lon, lat) of a layer geometry, or (None, None).
+
+    Coordinates within ±180/±90 are taken as WGS84 already; anything else as
+    Web Mercator (EPSG:3857) metres.
+    """
+    try:
+        x = float(x)
+        y = float(y)
+    except (ValueError, TypeError):
+        return None, None
+    if abs(x) <= 180 and abs(y) <= 90:
+        return x, y
+    lon = x / MERCATOR_EXTENT * 180
+    lat = math.degrees(2 * math.atan(math.exp(y / MERCATOR_EXTENT * math.pi)) - math.pi / 2)
+    return lon, lat
+
+
+def _unit_x(lon):
+    return (lon + 180) / 360
+
+
+def _unit_y(lat):
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    return (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2
+
+
+def to_unit(xs, ys):
+    """
+    Convert columns of layer coordinates to unit-square tile coordinates.
+
+    One pass over the columns, filling two array('d'): Web Mercator points
+    are only rescaled (no trigonometry, no WGS84 round trip), WGS84 points
+    go through the Mercator projection. Points with a missing or invalid
+    coordinate are dropped.
+
+    Returns:
+        tuple: (keep, ux, uy) — the indexes of the converted points and
+        their coordinates, x growing east and y south, within [0, 1].
+    """
+    keep, ux, uy = [], array('d'), array('d')
+    scale = 2 * MERCATOR_EXTENT
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        try:
+            x = float(x)
+            y = float(y)
+        except (ValueError, TypeError):
+            continue
+        if abs(x) <= 180 and abs(y) <= 90:
+            ux.append(_unit_x(x))
+            uy.append(_unit_y(y))
+        else:
+            ux.append(min(max((x + MERCATOR_EXTENT) / scale, 0.0), 1.0))
+            uy.append(min(max((MERCATOR_EXTENT - y) / scale, 0.0), 1.0))
+        keep.append(i)
+    return keep, ux, uy
+
+
+def from_unit(ux, uy):
+    """Return (lon, lat) of a unit-square tile coordinate, rounded to 6 decimals."""
+    lon = ux * 360 - 180
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * uy))))
+    return round(lon, 6), round(lat, 6)
+
+
+def _tile_bounds(bbox, zoom):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    n = 1 << zoom
+    x0 = min(n - 1, max(0, int(_unit_x(min_lon) * n)))
+    x1 = min(n - 1, max(0, int(_unit_x(max_lon) * n)))
+    y0 = min(n - 1, max(0, int(_unit_y(max_lat) * n)))
+    y1 = min(n - 1, max(0, int(_unit_y(min_lat) * n)))
+    return x0, x1, y0, y1
+
+
+def bbox_tile_count(bbox, zoom):
+    """Return the number of tiles at zoom covering bbox, without listing them."""
+    x0, x1, y0, y1 = _tile_bounds(bbox, zoom)
+    return (x1 - x0 + 1) * (y1 - y0 + 1)
+
+
+def bbox_tiles(bbox, zoom):
+    """
+    Return the (x, y) of the tiles at zoom covering bbox.
+
+    The list grows with 4**zoom: check bbox_tile_count against a cap first.
+
+    Args:
+        bbox: (min_lon, min_lat, max_lon, max_lat) in WGS84
+    """
+    x0, x1, y0, y1 = _tile_bounds(bbox, zoom)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+@dataclass(frozen=True, slots=True)
+class ReportPoints:
+    """Report locations and the codes drawn on the map, as columns sorted by ux."""
+
+    uniquerowids: list
+    ux: array
+    uy: array
+    tratte: list
+    tipologie: list
+
+    def __len__(self):
+        return len(self.uniquerowids)
+
+    def in_tile(self, zoom, x, y, buffer=0.0):
+        """Yield the index of each point inside tile zoom/x/y, widened by buffer tiles."""
+        n = 1 << zoom
+        x_min, x_max = (x - buffer) / n, (x + 1 + buffer) / n
+        y_min, y_max = (y - buffer) / n, (y + 1 + buffer) / n
+        # The last column/row also holds the points on the edge of the map
+        if x + 1 == n:
+            x_max = math.inf
+        if y + 1 == n:
+            y_max = math.inf
+        uy = self.uy
+        for i in range(bisect_left(self.ux, x_min), bisect_left(self.ux, x_max)):
+            if y_min <= uy[i] < y_max:
+                yield i
+
+
+def _points_cache_key(where):
+    return f'{POINTS_CACHE_KEY_PREFIX}{_where_digest(where)}'
+
+
+def get_report_points(where='1=1'):
+    """
+    Return the locations of the layer-0 reports matching a WHERE clause.
+
+    Cached per WHERE clause for REPORTS_LIST_CACHE_TIMEOUT seconds.
+
+    Returns:
+        dict: {'points': ReportPoints} or {'error': message}
+    """
+    cache_key = _points_cache_key(where)
+    points = cache.get(cache_key)
+    record_cache('report_points', points is not None)
+    if points is not None:
+        return {'points': points}
+
+    ids, xs, ys, tratte, tipologie = [], [], [], [], []
+    shared = {}
+    try:
+        for feature in iter_feature_layer(0, where, out_fields=','.join(POINT_FIELDS), returnGeometry='true'):
+            geom = feature.get('geometry') or {}
+            attrs = feature.get('attributes', {})
+            ids.append(attrs.get('uniquerowid'))
+            tratte.append(_shared(shared, attrs.get('tratta')))
+            tipologie.append(_shared(shared, attrs.get('tipologia_appalto')))
+            xs.append(geom.get('x'))
+            ys.append(geom.get('y'))
+    except ArcGISError as exc:
+        return {'error': str(exc)}
+
+    keep, ux, uy = to_unit(xs, ys)
+    order = sorted(range(len(keep)), key=ux.__getitem__)
+    rows = [keep[j] for j in order]
+    points = ReportPoints(
+        [ids[i] for i in rows],
+        array('d', [ux[j] for j in order]),
+        array('d', [uy[j] for j in order]),
+        [tratte[i] for i in rows],
+        [tipologie[i] for i in rows],
+    )
+
+    timeout = getattr(settings, 'REPORTS_LIST_CACHE_TIMEOUT', 60)
+    if timeout:
+        cache.set(cache_key, points, timeout=timeout)
+    return {'points': points}
+
+
+def cluster_tile(points, zoom, x, y):
+    """
+    Return the GeoJSON features of tile zoom/x/y: reports and clusters.
+
+    Reports carry their uniquerowid; clusters ``cluster: true`` and their
+    ``point_count``.
+    """
+    cell_size = max(1, min(TILE_SIZE, getattr(settings, 'REPORTS_GEO_CLUSTER_CELL_SIZE', 64)))
+    cells_per_side = TILE_SIZE // cell_size
+    clustered = zoom < getattr(settings, 'REPORTS_GEO_CLUSTER_MAX_ZOOM', 17)
+    scale = (1 << zoom) * cells_per_side
+    ux, uy = points.ux, points.uy
+
+    cells = {}
+    for i in points.in_tile(zoom, x, y):
+        key = (
+            min(int(ux[i] * scale) - x * cells_per_side, cells_per_side - 1),
+            min(int(uy[i] * scale) - y * cells_per_side, cells_per_side - 1),
+        ) if clustered else i
+        cell = cells.get(key)
+        if cell is None:
+            cells[key] = [1, ux[i], uy[i], i]
+        else:
+            cell[0] += 1
+            cell[1] += ux[i]
+            cell[2] += uy[i]
+
+    features = []
+    for count, sum_x, sum_y, first in cells.values():
+        if count == 1:
+            properties = {'uniquerowid': points.uniquerowids[first]}
+        else:
+            properties = {'cluster': True, 'point_count': count}
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': from_unit(sum_x / count, sum_y / count)},
+            'properties': properties,
+        })
+    return features
+
+
+def _tile_cache_key(where, zoom, x, y):
+    return f'{TILE_CACHE_KEY_PREFIX}{_where_digest(where)}_{zoom}_{x}_{y}'
+
+
+def get_geo_features(where, bbox, zoom):
+    """
+    Return the map features for a bbox at a zoom level as GeoJSON bytes.
+
+    Each tile covering bbox is served from its cache entry when present and
+    otherwise clustered from get_report_points; the report points are only
+    loaded when a tile is missing. Tiles are cached for
+    REPORTS_LIST_CACHE_TIMEOUT seconds.
+
+    Returns:
+        dict: {'content': FeatureCollection JSON bytes, 'count': reports in
+        the tiles} or {'error': message}
+    """
+    tiles = bbox_tiles(bbox, zoom)
+    keys = {_tile_cache_key(where, zoom, x, y): (x, y) for x, y in tiles}
+    cached = cache.get_many(keys)
+    for key in keys:
+        record_cache('geo_tiles', key in cached)
+
+    missing = {key: tile for key, tile in keys.items() if key not in cached}
+    if missing:
+        result = get_report_points(where)
+        if 'error' in result:
+            return result
+        computed = {}
+        for key, (x, y) in missing.items():
+            features = cluster_tile(result['points'], zoom, x, y)
+            count = sum(f['properties'].get('point_count', 1) for f in features)
+            computed[key] = (count, dumpb(features)[1:-1])
+        timeout = getattr(settings, 'REPORTS_LIST_CACHE_TIMEOUT', 60)
+        if timeout:
+            cache.set_many(computed, timeout=timeout)
+        cached.update(computed)
+
+    parts = [cached[key] for key in keys]
+    body = b','.join(fragment for _, fragment in parts if fragment)
+    return {
+        'content': b'{"type":"FeatureCollection","features":[' + body + b']}',
+        'count': sum(count for count, _ in parts),
+    }
@@ -0,0 +1,305 @@
+"""
+Service for the report list: cached layer-0 rows, keyset pages and filter options.
+
+Two ways to page through the list:
+
+- ``get_report_rows``: every row matching the filters, cached per WHERE
+  clause, sliced by page number in the view (offset mode).
+- ``get_report_page``: one page per ArcGIS query using a keyset predicate on
+  (sort field, objectid), addressed by opaque cursors (cursor mode). Deep
+  pages cost the same as the first one and rows inserted while paging do
+  not shift pages, so nothing is shown twice or skipped. Rows without a
+  value in the sort field follow the others, by objectid. Cursors are
+  signed and bound to the sort and filters they were issued for.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from apps.core.metrics import record_cache
+from apps.core.services.arcgis import ArcGISError, iter_feature_layer, query_feature_layer
+from apps.reports.mappings import get_field_value, get_reports_mappings
+from apps.reports.records import ReportRow
+
+logger = logging.getLogger(__name__)
+
+ROWS_CACHE_KEY_PREFIX = 'reports_rows_'
+COUNT_CACHE_KEY_PREFIX = 'reports_count_'
+FILTER_OPTIONS_CACHE_KEY = 'reports_filter_options'
+CURSOR_SALT = 'apps.reports.list_cursor'
+
+# Only the attributes the list and the filter dropdowns need are requested.
+LIST_FIELDS = ('uniquerowid', 'nome_operatore', 'tratta', 'tipologia_appalto', 'data_rilevamento')
+FILTER_FIELDS = ('nome_operatore', 'tratta', 'tipologia_appalto')
+
+
+def _where_digest(where):
+    return hashlib.sha256(where.encode('utf-8')).hexdigest()
+
+
+def _rows_cache_key(where):
+    return f'{ROWS_CACHE_KEY_PREFIX}{_where_digest(where)}'
+
+
+def get_report_rows(where='1=1'):
+    """
+    Return the layer-0 rows matching a WHERE clause.
+
+    Rows beyond the service's maxRecordCount are paged in (iter_feature_layer).
+    Results are cached per WHERE clause for REPORTS_LIST_CACHE_TIMEOUT
+    seconds, so paging and re-sorting the same filtered list does not query
+    ArcGIS again.
+
+    Returns:
+        dict: {'rows': [ReportRow, ...]} or {'error': message}
+    """
+    cache_key = _rows_cache_key(where)
+    rows = cache.get(cache_key)
+    record_cache('report_rows', rows is not None)
+    if rows is not None:
+        logger.debug("Report rows cache hit for WHERE clause: %s", where)
+        return {'rows': rows}
+
+    shared = {}
+    try:
+        rows = [ReportRow.from_attributes(feature.get('attributes', {}), shared)
+                for feature in iter_feature_layer(0, where, out_fields=','.join(LIST_FIELDS))]
+    except ArcGISError as exc:
+        return {'error': str(exc)}
+
+    timeout = getattr(settings, 'REPORTS_LIST_CACHE_TIMEOUT', 60)
+    if timeout:
+        cache.set(cache_key, rows, timeout=timeout)
+    return {'rows': rows}
+
+
+def count_reports(where='1=1'):
+    """
+    Return the number of layer-0 rows matching where, cached like the rows.
+
+    Returns:
+        dict: {'count': n} or {'error': message}
+    """
+    cache_key = f'{COUNT_CACHE_KEY_PREFIX}{_where_digest(where)}'
+    count = cache.get(cache_key)
+    record_cache('report_rows', count is not None)
+    if count is not None:
+        return {'count': count}
+
+    result = query_feature_layer(0, where, out_fields='objectid', returnCountOnly='true')
+    if 'error' in result:
+        return {'error': result['error']}
+
+    count = int(result.get('count', 0))
+    timeout = getattr(settings, 'REPORTS_LIST_CACHE_TIMEOUT', 60)
+    if timeout:
+        cache.set(cache_key, count, timeout=timeout)
+    return {'count': count}
+
+
+def _sql_literal(field, value):
+    if field == 'data_rilevamento':
+        moment = datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+        return f"TIMESTAMP '{moment.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}'"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    escaped = str(value).replace("'", "''")
+    return f"'{escaped}'"
+
+
+def _keyset_predicate(sort_by, key, descending):
+    """WHERE predicate selecting the rows after key in (sort_by, objectid) order."""
+    value, objectid = key
+    op = '<' if descending else '>'
+    literal = _sql_literal(sort_by, value)
+    return f"({sort_by} {op} {literal} OR ({sort_by} = {literal} AND objectid {op} {int(objectid)}))"
+
+
+def _cursor_scope(where, sort_by, sort_order):
+    return f'{sort_by}:{sort_order}:{_where_digest(where)[:16]}'
+
+
+def encode_cursor(direction, row, where, sort_by, sort_order):
+    """Opaque cursor pointing before ('prev') or after ('next') row."""
+    return signing.dumps(
+        {'d': direction, 'k': [row.get(sort_by), row.get('objectid')],
+         's': _cursor_scope(where, sort_by, sort_order)},
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def decode_cursor(cursor, where, sort_by, sort_order):
+    """
+    Return (direction, key) of a cursor issued for the same filters and sort.
+
+    Raises:
+        ValueError: for a tampered cursor or one issued for another list.
+    """
+    try:
+        payload = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValueError('Invalid cursor')
+    if payload.get('s') != _cursor_scope(where, sort_by, sort_order) or payload.get('d') not in ('next', 'prev'):
+        raise ValueError('Cursor does not match the current filters or sort')
+    value, objectid = payload['k']
+    if objectid is None:
+        raise ValueError('Invalid cursor')
+    return payload['d'], (value, objectid)
+
+
+def _segment_query(where, sort_by, key, descending, nulls, limit):
+    """
+    Rows of one segment of the list in scan order, after key when given.
+
+    The non-null segment is ordered on (sort_by, objectid), the null one
+    (rows without a sort_by value) on objectid alone.
+    """
+    order = 'DESC' if descending else 'ASC'
+    if nulls:
+        conditions = [f'({where})', f'{sort_by} IS NULL']
+        if key is not None:
+            conditions.append(f"objectid {'<' if descending else '>'} {int(key[1])}")
+        order_by = f'objectid {order}'
+    else:
+        conditions = [f'({where})', f'{sort_by} IS NOT NULL']
+        if key is not None:
+            conditions.append(_keyset_predicate(sort_by, key, descending))
+        order_by = f'{sort_by} {order},objectid {order}'
+    return query_feature_layer(
+        0, ' AND '.join(conditions),
+        out_fields=','.join(('objectid',) + LIST_FIELDS),
+        orderByFields=order_by,
+        resultRecordCount=limit,
+        returnGeometry='false',
+    )
+
+
+def get_report_page(where, sort_by, sort_order, per_page, cursor=None):
+    """
+    Return one page of layer-0 rows by keyset, sorted on (sort_by, objectid).
+
+    ArcGIS sorts by the stored values (codes, not labels). Rows without a
+    value in sort_by come after all the others in either sort order, by
+    objectid; a page spanning both segments costs a second query.
+
+    Args:
+        cursor: a next_cursor/prev_cursor of a previous page, or None for
+            the first page.
+
+    Returns:
+        dict: {'rows', 'next_cursor', 'prev_cursor', 'total'} or
+        {'error': message}
+
+    Raises:
+        ValueError: if cursor is invalid for this where/sort.
+    """
+    direction, key = decode_cursor(cursor, where, sort_by, sort_order) if cursor else ('next', None)
+    descending = sort_order == 'desc'
+    # A 'prev' page is read backwards from the cursor and reversed, through
+    # the null segment first.
+    forward = direction == 'next'
+    scan_descending = descending if forward else not descending
+    segments = (False, True) if forward else (True, False)
+    if key is not None:
+        # Start in the segment of the cursor row
+        segments = segments[segments.index(key[0] is None):]
+
+    shared = {}
+    rows = []
+    for n, nulls in enumerate(segments):
+        # Only the first segment continues from the cursor; the next one is
+        # read from its start
+        result = _segment_query(where, sort_by, key if n == 0 else None, scan_descending, nulls,
+                                per_page + 1 - len(rows))
+        if 'error' in result:
+            return {'error': result['error']}
+        rows.extend(ReportRow.from_attributes(feature.get('attributes', {}), shared)
+                    for feature in result.get('features', []))
+        if len(rows) > per_page:
+            break
+
+    total = count_reports(where)
+    if 'error' in total:
+        return total
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+    has_next = more if forward else True
+    has_prev = key is not None if forward else more
+
+    return {
+        'rows': rows,
+        'next_cursor': encode_cursor('next', rows[-1], where, sort_by, sort_order) if rows and has_next else None,
+        'prev_cursor': encode_cursor('prev', rows[0], where, sort_by, sort_order) if rows and has_prev else None,
+        'total': total['count'],
+    }
+
+
+def build_filter_options(rows):
+    """Build dropdown options and the date range from layer-0 rows."""
+    unique_values = {field: set() for field in FILTER_FIELDS}
+    timestamps = []
+
+    for attrs in rows:
+        for field in FILTER_FIELDS:
+            if attrs.get(field):
+                unique_values[field].add(attrs[field])
+
+        if attrs.get('data_rilevamento'):
+            try:
+                timestamp = float(attrs['data_rilevamento'])
+                if timestamp > 9999999999:
+                    timestamp = timestamp / 1000
+                timestamps.append(timestamp)
+            except (ValueError, TypeError):
+                pass
+
+    filter_options = {}
+    csv_mappings = get_reports_mappings() if any(unique_values.values()) else None
+    for field in FILTER_FIELDS:
+        filter_options[field] = [
+            {'value': v, 'label': get_field_value(field, v, csv_mappings)}
+            for v in sorted(unique_values[field])
+        ]
+
+    if timestamps:
+        filter_options['date_range'] = {
+            'min': datetime.fromtimestamp(min(timestamps)).strftime('%Y-%m-%d'),
+            'max': datetime.fromtimestamp(max(timestamps)).strftime('%Y-%m-%d'),
+        }
+
+    return filter_options
+
+
+def get_filter_options():
+    """
+    Return filter dropdown options, cached for REPORTS_FILTER_OPTIONS_CACHE_TIMEOUT.
+
+    Built from the unfiltered row set, which is shared with the default
+    report list cache.
+
+    Returns:
+        dict: the options, or {'error': message}
+    """
+    options = cache.get(FILTER_OPTIONS_CACHE_KEY)
+    record_cache('filters', options is not None)
+    if options is not None:
+        return options
+
+    result = get_report_rows()
+    if 'error' in result:
+        return result
+
+    options = build_filter_options(result['rows'])
+    timeout = getattr(settings, 'REPORTS_FILTER_OPTIONS_CACHE_TIMEOUT', 300)
+    if timeout:
+        cache.set(FILTER_OPTIONS_CACHE_KEY, options, timeout=timeout)
+    return options
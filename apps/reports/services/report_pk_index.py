@@ -0,0 +1,243 @@
+"""
+Service for locating interventions by route kilometre (pk).
+
+Every report of layer 0 spans pk_iniz..pk_fin on its tratta, and each of
+its pavement rows (layer 1) spans pk_iniz_pav..pk_fin_pav on the same
+tratta. ``PkIndex`` holds one ``IntervalIndex`` per tratta over all of
+these intervals, plus the columns needed to describe them, so "everything
+between km 40 and 55 on the A7" is answered in O(log n + k) without
+querying ArcGIS. A missing pk end is taken as equal to the other one (a
+point); rows with neither are not indexed.
+
+The index is built from two full-layer reads and cached as flat arrays for
+REPORTS_PK_INDEX_CACHE_TIMEOUT seconds, under a version token stored next
+to it. Unpickling the whole index takes tens of milliseconds, so each
+process also keeps the index it last loaded and only reads it from the
+cache again when the token changes (the memo of apps/authorization/acl.py).
+A query costs one small cache read plus O(log n + k).
+"""
+
+import math
+import threading
+import uuid
+from array import array
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.intervals import IntervalIndex
+from apps.core.metrics import record_cache
+from apps.core.services.arcgis import ArcGISError, iter_feature_layer
+from apps.reports.records import Intervention, _shared
+
+PK_INDEX_VERSION_KEY = 'reports_pk_index_version'
+PK_INDEX_CACHE_KEY_PREFIX = 'reports_pk_index_'
+
+REPORT_FIELDS = (
+    'uniquerowid', 'tratta', 'carreggiata', 'pk_iniz', 'pk_fin', 'data_rilevamento', 'tipologia_appalto',
+)
+PAVEMENT_FIELDS = ('parentrowid', 'corsia', 'tipo_intervento_pav', 'pk_iniz_pav', 'pk_fin_pav')
+
+KIND_REPORT = 'report'
+KIND_PAVEMENT = 'pavement'
+
+_local_index = {"version": None, "index": None}
+_local_index_lock = threading.Lock()
+
+
+def _pk(value):
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _span(start, end):
+    start, end = _pk(start), _pk(end)
+    if start is None and end is None:
+        return None
+    return (end if start is None else start), (start if end is None else end)
+
+
+@dataclass(frozen=True, slots=True)
+class PkIndex:
+    """
+    Interval indexes per tratta over intervention rows, with their columns.
+
+    Row columns: pavement (0 for a report row, 1 for a pavement row), report
+    (the row's report number), pk_iniz, pk_fin and, for pavement rows,
+    corsia and tipo_intervento_pav.
+    Report columns, by report number: uniquerowid, carreggiata,
+    data_rilevamento and tipologia_appalto.
+    """
+
+    routes: dict
+    pavement: array
+    report: array
+    pk_iniz: array
+    pk_fin: array
+    corsie: list
+    tipi_pav: list
+    uniquerowids: list
+    tratte: list
+    carreggiate: list
+    dates: list
+    tipologie: list
+
+    def __len__(self):
+        return len(self.report)
+
+    def overlapping(self, lo, hi, tratte=None):
+        """Rows overlapping [lo, hi] on the given tratte (all when empty), by tratta then pk."""
+        routes = sorted(self.routes) if not tratte else [t for t in tratte if t in self.routes]
+        return [row for tratta in routes for row in self.routes[tratta].overlapping(lo, hi)]
+
+    def intervention(self, row):
+        report = self.report[row]
+        return Intervention(
+            KIND_PAVEMENT if self.pavement[row] else KIND_REPORT,
+            self.uniquerowids[report],
+            self.tratte[report],
+            self.carreggiate[report],
+            self.pk_iniz[row],
+            self.pk_fin[row],
+            self.dates[report],
+            self.tipologie[report],
+            self.corsie[row],
+            self.tipi_pav[row],
+        )
+
+
+def build_pk_index(reports, pavement):
+    """
+    Build a PkIndex from layer-0 and layer-1 features (iterables).
+
+    Pavement rows are attached to their report by parentrowid and dropped
+    when it is not among reports.
+    """
+    shared = {}
+    report_numbers = {}
+    uniquerowids, tratte, carreggiate, dates, tipologie = [], [], [], [], []
+    rows = {
+        'pavement': array('b'), 'report': array('q'), 'pk_iniz': array('d'), 'pk_fin': array('d'),
+        'corsie': [], 'tipi_pav': [],
+    }
+    intervals = {}
+
+    def add_row(number, span, corsia=None, tipo=None, pavement=0):
+        row = len(rows['report'])
+        rows['pavement'].append(pavement)
+        rows['report'].append(number)
+        rows['pk_iniz'].append(span[0])
+        rows['pk_fin'].append(span[1])
+        rows['corsie'].append(corsia)
+        rows['tipi_pav'].append(tipo)
+        intervals.setdefault(tratte[number], []).append((span[0], span[1], row))
+
+    for feature in reports:
+        attrs = feature.get('attributes', {})
+        if attrs.get('tratta') is None:
+            continue
+        number = len(uniquerowids)
+        report_numbers[attrs.get('uniquerowid')] = number
+        uniquerowids.append(attrs.get('uniquerowid'))
+        tratte.append(_shared(shared, attrs.get('tratta')))
+        carreggiate.append(_shared(shared, attrs.get('carreggiata')))
+        dates.append(attrs.get('data_rilevamento'))
+        tipologie.append(_shared(shared, attrs.get('tipologia_appalto')))
+        span = _span(attrs.get('pk_iniz'), attrs.get('pk_fin'))
+        if span is not None:
+            add_row(number, span)
+
+    for feature in pavement:
+        attrs = feature.get('attributes', {})
+        number = report_numbers.get(attrs.get('parentrowid'))
+        span = _span(attrs.get('pk_iniz_pav'), attrs.get('pk_fin_pav'))
+        if number is not None and span is not None:
+            add_row(number, span, _shared(shared, attrs.get('corsia')),
+                    _shared(shared, attrs.get('tipo_intervento_pav')), pavement=1)
+
+    return PkIndex(
+        {tratta: IntervalIndex(spans) for tratta, spans in intervals.items()},
+        rows['pavement'], rows['report'], rows['pk_iniz'], rows['pk_fin'], rows['corsie'], rows['tipi_pav'],
+        uniquerowids, tratte, carreggiate, dates, tipologie,
+    )
+
+
+def get_pk_index():
+    """
+    Return the PkIndex of all reports, cached for REPORTS_PK_INDEX_CACHE_TIMEOUT.
+
+    Returns:
+        dict: {'index': PkIndex} or {'error': message}
+    """
+    timeout = getattr(settings, 'REPORTS_PK_INDEX_CACHE_TIMEOUT', 300)
+    version = cache.get(PK_INDEX_VERSION_KEY) if timeout else None
+    index = None
+    if version is not None:
+        if _local_index["version"] == version:
+            index = _local_index["index"]
+        else:
+            index = cache.get(f'{PK_INDEX_CACHE_KEY_PREFIX}{version}')
+    record_cache('pk_index', index is not None)
+    if index is not None:
+        with _local_index_lock:
+            _local_index["version"] = version
+            _local_index["index"] = index
+        return {'index': index}
+
+    try:
+        index = build_pk_index(
+            iter_feature_layer(0, out_fields=','.join(REPORT_FIELDS), returnGeometry='false'),
+            iter_feature_layer(1, out_fields=','.join(PAVEMENT_FIELDS), returnGeometry='false'),
+        )
+    except ArcGISError as exc:
+        return {'error': str(exc)}
+
+    if timeout:
+        # The index is stored before the token that points to it; both expire
+        # together, so the next request after the timeout rebuilds.
+        version = uuid.uuid4().hex
+        cache.set(f'{PK_INDEX_CACHE_KEY_PREFIX}{version}', index, timeout=timeout)
+        cache.set(PK_INDEX_VERSION_KEY, version, timeout=timeout)
+        with _local_index_lock:
+            _local_index["version"] = version
+            _local_index["index"] = index
+    return {'index': index}
+
+
+def find_interventions(lo, hi, tratte=None, carreggiate=None, date_from=None, date_to=None, kind=None):
+    """
+    Return the interventions overlapping pk [lo, hi], by tratta then pk.
+
+    Args:
+        lo, hi: pk bounds (use -inf/inf for an open side)
+        tratte, carreggiate: codes to keep (all when empty)
+        date_from, date_to: data_rilevamento bounds in epoch ms (date_from
+            inclusive, date_to exclusive)
+        kind: KIND_REPORT or KIND_PAVEMENT to keep only one kind
+
+    Returns:
+        dict: {'interventions': [Intervention, ...]} or {'error': message}
+    """
+    result = get_pk_index()
+    if 'error' in result:
+        return result
+    index = result['index']
+
+    interventions = []
+    for row in index.overlapping(lo, hi, tratte):
+        report = index.report[row]
+        if carreggiate and index.carreggiate[report] not in carreggiate:
+            continue
+        date = index.dates[report]
+        if date_from is not None and (date is None or date < date_from):
+            continue
+        if date_to is not None and (date is None or date >= date_to):
+            continue
+        if kind and (KIND_PAVEMENT if index.pavement[row] else KIND_REPORT) != kind:
+            continue
+        interventions.append(index.intervention(row))
+    return {'interventions': interventions}
@@ -0,0 +1,202 @@
+"""
+Service for the report vector tiles: Mapbox Vector Tiles cached on disk.
+
+A tile is rendered from the report points of services/report_geo.py (the
+same point set /api/geo/ clusters), as one ``reports`` point layer with the
+display values of tratta and tipologia_appalto. Reports with the same
+values on the same pixel are drawn once:
+
+- below REPORTS_GEO_CLUSTER_MAX_ZOOM (where /api/geo/ clusters) a pixel is
+  one of the 256 per side the tile is displayed at, and every feature
+  carries the ``point_count`` of its pixel, so a full-network view holds at
+  most one feature per screen pixel and value pair;
+- from there on a pixel is one of the ``EXTENT`` tile units and a single
+  report carries its uniquerowid instead.
+
+Points within ``TILE_BUFFER`` of the tile edge are included so symbols are
+not cut at tile boundaries.
+
+Tiles are written to REPORTS_TILE_CACHE_DIR, one directory per filter set,
+and reused for REPORTS_TILE_CACHE_TIMEOUT seconds. The ETag is a digest of
+the tile bytes, so a tile regenerated from unchanged data keeps its ETag.
+Empty tiles are not written. ``prune_tiles`` deletes expired tiles and the
+oldest ones beyond REPORTS_TILE_CACHE_MAX_FILES; it runs at most once per
+REPORTS_TILE_CACHE_TIMEOUT after a tile is written (across workers sharing
+the cache) and as the ``prune_tiles`` management command.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.metrics import record_cache
+from apps.core.mvt import EXTENT, Layer, encode_tile
+from apps.reports.mappings import get_field_value, get_reports_mappings
+from apps.reports.services.report_geo import TILE_SIZE, get_report_points
+from apps.reports.services.report_list import _where_digest
+
+logger = logging.getLogger(__name__)
+
+LAYER_NAME = 'reports'
+TILE_SUFFIX = '.mvt'
+PRUNE_LOCK_KEY = 'reports_tiles_pruned'
+# Buffer around each tile, in tile units (64 of 4096)
+TILE_BUFFER = 64 / EXTENT
+
+
+def tile_etag(content):
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def _tile_directory():
+    return Path(getattr(settings, 'REPORTS_TILE_CACHE_DIR', settings.BASE_DIR / 'cache' / 'tiles'))
+
+
+def _tile_path(where, zoom, x, y):
+    return _tile_directory() / _where_digest(where)[:16] / str(zoom) / str(x) / f'{y}{TILE_SUFFIX}'
+
+
+def render_tile(points, zoom, x, y):
+    """Return the MVT bytes of tile zoom/x/y for a ReportPoints set."""
+    clustered = zoom < getattr(settings, 'REPORTS_GEO_CLUSTER_MAX_ZOOM', 17)
+    grid = TILE_SIZE if clustered else EXTENT
+    step = EXTENT // grid
+    scale = (1 << zoom) * grid
+    ux, uy = points.ux, points.uy
+    groups = {}
+    for i in points.in_tile(zoom, x, y, TILE_BUFFER):
+        key = (
+            int(ux[i] * scale) - x * grid,
+            int(uy[i] * scale) - y * grid,
+            points.tratte[i],
+            points.tipologie[i],
+        )
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [1, i]
+        else:
+            group[0] += 1
+
+    layer = Layer(LAYER_NAME, EXTENT)
+    if groups:
+        csv_mappings = get_reports_mappings()
+        labels = {}
+
+        def label(field, code):
+            if code is None:
+                return None
+            if (field, code) not in labels:
+                labels[field, code] = get_field_value(field, code, csv_mappings)
+            return labels[field, code]
+
+        for (px, py, tratta, tipologia), (count, first) in groups.items():
+            properties = {
+                'tratta': label('tratta', tratta),
+                'tipologia_appalto': label('tipologia_appalto', tipologia),
+            }
+            if count == 1 and not clustered:
+                properties['uniquerowid'] = points.uniquerowids[first]
+            else:
+                properties['point_count'] = count
+            layer.add_point(px * step + step // 2, py * step + step // 2, properties)
+    return encode_tile([layer])
+
+
+def _read_fresh(path, timeout):
+    try:
+        if time.time() - path.stat().st_mtime < timeout:
+            return path.read_bytes()
+    except OSError:
+        pass
+    return None
+
+
+def _write(path, content):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except OSError:
+        logger.warning("Could not write vector tile %s", path, exc_info=True)
+
+
+def prune_tiles(directory=None, max_age=None, max_files=None):
+    """
+    Delete expired tiles, then the oldest beyond max_files, and empty directories.
+
+    Defaults to REPORTS_TILE_CACHE_DIR, REPORTS_TILE_CACHE_TIMEOUT and
+    REPORTS_TILE_CACHE_MAX_FILES.
+
+    Returns:
+        int: number of tiles deleted
+    """
+    directory = Path(directory) if directory is not None else _tile_directory()
+    max_age = getattr(settings, 'REPORTS_TILE_CACHE_TIMEOUT', 300) if max_age is None else max_age
+    max_files = getattr(settings, 'REPORTS_TILE_CACHE_MAX_FILES', 20000) if max_files is None else max_files
+    if not directory.is_dir():
+        return 0
+
+    now = time.time()
+    tiles = []
+    for path in directory.rglob(f'*{TILE_SUFFIX}'):
+        try:
+            tiles.append((path.stat().st_mtime, path))
+        except OSError:
+            pass
+    tiles.sort()
+    expired = sum(1 for mtime, _ in tiles if now - mtime >= max_age)
+    doomed = tiles[:max(expired, len(tiles) - max_files)]
+    for _, path in doomed:
+        path.unlink(missing_ok=True)
+
+    # Deepest first, so a directory emptied by its children goes too
+    for path in sorted((p for p in directory.rglob('*') if p.is_dir()), key=lambda p: len(p.parts), reverse=True):
+        try:
+            path.rmdir()
+        except OSError:
+            pass
+    return len(doomed)
+
+
+def _maybe_prune(timeout):
+    # cache.add is atomic: one sweep per timeout across the workers
+    if cache.add(PRUNE_LOCK_KEY, True, timeout=timeout):
+        try:
+            prune_tiles()
+        except OSError:
+            logger.warning("Could not prune the vector tile cache", exc_info=True)
+
+
+def get_tile(where, zoom, x, y):
+    """
+    Return vector tile zoom/x/y of the reports matching where.
+
+    Served from the disk cache while fresh; otherwise rendered from
+    get_report_points and written back.
+
+    Returns:
+        dict: {'content': MVT bytes, 'etag': quoted ETag} or {'error': message}
+    """
+    timeout = getattr(settings, 'REPORTS_TILE_CACHE_TIMEOUT', 300)
+    path = _tile_path(where, zoom, x, y)
+    content = _read_fresh(path, timeout) if timeout else None
+    record_cache('vector_tiles', content is not None)
+
+    if content is None:
+        result = get_report_points(where)
+        if 'error' in result:
+            return result
+        content = render_tile(result['points'], zoom, x, y)
+        if timeout and content:
+            _write(path, content)
+            _maybe_prune(timeout)
+
+    return {'content': content, 'etag': tile_etag(content)}
@@ -1,6 +1,7 @@
 import json
 from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -101,6 +102,7 @@ class ExceptionSanitizationTest(TestCase):
     """H-5: Raw exception messages must not be returned to API clients."""
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username='apiuser', password='testpassword123',
             is_superuser=True,
@@ -108,14 +110,14 @@ class ExceptionSanitizationTest(TestCase):
         self.client.force_login(self.user, backend='apps.accounts.auth.SuperuserOnlyModelBackend')
 
     def test_get_data_500_returns_generic_message(self):
-        with patch('apps.reports.views.api.query_feature_layer', side_effect=RuntimeError('secret connection string')):
+        with patch('apps.core.services.arcgis.ArcGISService.query_layer', side_effect=RuntimeError('secret connection string')):
             response = self.client.get('/api/data/')
         self.assertEqual(response.status_code, 500)
         body = json.loads(response.content)
         self.assertNotIn('secret connection string', body.get('error', ''))
 
     def test_get_filter_options_500_returns_generic_message(self):
-        with patch('apps.reports.views.api.query_feature_layer', side_effect=RuntimeError('secret connection string')):
+        with patch('apps.core.services.arcgis.ArcGISService.query_layer', side_effect=RuntimeError('secret connection string')):
             response = self.client.get('/api/filters/')
         self.assertEqual(response.status_code, 500)
         body = json.loads(response.content)
@@ -132,6 +134,7 @@ class PaginationValidationTest(TestCase):
     """M-3: Pagination parameters must be validated before int() conversion."""
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username='pageuser', password='testpassword123',
             is_superuser=True,
@@ -148,7 +151,7 @@ class PaginationValidationTest(TestCase):
 
     def test_negative_page_is_clamped_to_1(self):
         """Negative page should not cause a negative offset — clamp to 1."""
-        with patch('apps.reports.views.api.query_feature_layer', return_value={'features': []}):
+        with patch('apps.core.services.arcgis.ArcGISService.query_layer', return_value={'features': []}):
             response = self.client.get('/api/data/', {'page': '-5'})
         self.assertIn(response.status_code, [200, 400])
         if response.status_code == 200:
@@ -202,3 +205,624 @@ class FilterAllowlistTest(TestCase):
         from apps.reports.views.api import build_where_clause
         with self.assertRaises(ValueError):
             build_where_clause({'nome_operatore': ["admin'; DROP TABLE"]})
+
+
+import io
+import zipfile
+
+from django.test import override_settings
+
+
+def _export_features(start, count):
+    return [
+        {'attributes': {
+            'objectid': n,
+            'uniquerowid': f'{{0000000{n}-0000-4000-8000-000000000000}}',
+            'nome_operatore': 'g_vitale',
+            'data_rilevamento': 1718000000000,
+            'pk_iniz': 12.5,
+            'note': '=HYPERLINK("x")' if n == 1 else 'ok',
+        }}
+        for n in range(start, start + count)
+    ]
+
+
+@override_settings(REPORTS_EXPORT_CHUNK_SIZE=2, REPORTS_EXPORT_RATE_LIMIT='')
+@patch('apps.core.services.csv_mapping.get_csv_mappings', return_value={})
+class ReportExportTest(TestCase):
+    """Streaming CSV/XLSX export of the filtered list."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='exportuser', password='testpassword123',
+            is_superuser=True,
+        )
+        self.client.force_login(self.user, backend='apps.accounts.auth.SuperuserOnlyModelBackend')
+
+    def _pages(self, *pages):
+        return patch(
+            'apps.reports.services.report_export.query_feature_layer',
+            side_effect=[{'features': page} for page in pages],
+        )
+
+    def test_csv_pages_through_arcgis_in_chunks(self, _mappings):
+        pages = (_export_features(1, 2), _export_features(3, 2), _export_features(5, 1))
+        with self._pages(*pages) as query:
+            response = self.client.get('/api/export/', {'tratta': 'A50', 'sort_order': 'asc'})
+            body = b''.join(response.streaming_content).decode('utf-8-sig')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        lines = body.strip().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[0].startswith('ID Univoco,Data Rilevamento'))
+        self.assertIn('Giovanni Vitale', lines[1])
+        self.assertIn("'=HYPERLINK", lines[1])
+        self.assertEqual([c.kwargs['resultOffset'] for c in query.call_args_list], [0, 2, 4])
+        self.assertEqual(query.call_args.args[1], "tratta = 'A50'")
+        self.assertEqual(query.call_args.kwargs['orderByFields'], 'data_rilevamento ASC,objectid ASC')
+
+    def test_short_page_with_exceeded_transfer_limit_continues(self, _mappings):
+        with patch('apps.reports.services.report_export.query_feature_layer', side_effect=[
+            {'features': _export_features(1, 1), 'exceededTransferLimit': True},
+            {'features': []},
+        ]) as query:
+            response = self.client.get('/api/export/')
+            b''.join(response.streaming_content)
+        self.assertEqual(query.call_count, 2)
+
+    def test_xlsx_export_is_a_valid_workbook(self, _mappings):
+        with self._pages(_export_features(1, 2), []):
+            response = self.client.get('/api/export/', {'format': 'xlsx'})
+            archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('<c><v>12.5</v></c>', sheet)
+        self.assertIn('Giovanni Vitale', sheet)
+
+    def test_unknown_format_returns_400(self, _mappings):
+        self.assertEqual(self.client.get('/api/export/', {'format': 'pdf'}).status_code, 400)
+
+    def test_invalid_filter_returns_400(self, _mappings):
+        response = self.client.get('/api/export/', {'nome_operatore': "x'; DROP"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_arcgis_error_before_streaming_returns_generic_500(self, _mappings):
+        with patch('apps.reports.services.report_export.query_feature_layer',
+                   return_value={'error': 'secret upstream detail'}):
+            response = self.client.get('/api/export/')
+        self.assertEqual(response.status_code, 500)
+        self.assertNotIn(b'secret upstream detail', response.content)
+
+
+@patch('apps.core.services.csv_mapping.get_csv_mappings', return_value={})
+class CursorPaginationTest(TestCase):
+    """Keyset pagination of /api/data/ with signed cursors."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='cursoruser', password='testpassword123',
+            is_superuser=True,
+        )
+        self.client.force_login(self.user, backend='apps.accounts.auth.SuperuserOnlyModelBackend')
+
+    def _arcgis(self, *pages, count=5):
+        pages = iter(pages)
+
+        def query(layer_id, where, out_fields='*', **params):
+            if params.get('returnCountOnly'):
+                return {'count': count}
+            return {'features': next(pages)}
+
+        return patch('apps.reports.services.report_list.query_feature_layer', side_effect=query)
+
+    def test_first_page_fetches_one_extra_row_and_returns_next_cursor(self, _mappings):
+        with self._arcgis(_export_features(1, 3)) as query:
+            response = self.client.get('/api/data/', {'cursor': '', 'per_page': 2, 'tratta': 'A50'})
+        body = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(body['data']), 2)
+        self.assertEqual(body['total'], 5)
+        self.assertIsNone(body['prev_cursor'])
+        self.assertTrue(body['next_cursor'])
+        page_call = query.call_args_list[0]
+        self.assertEqual(page_call.args[1], "(tratta = 'A50') AND data_rilevamento IS NOT NULL")
+        self.assertEqual(page_call.kwargs['resultRecordCount'], 3)
+        self.assertEqual(page_call.kwargs['orderByFields'], 'data_rilevamento DESC,objectid DESC')
+
+    def test_next_cursor_adds_keyset_predicate(self, _mappings):
+        with self._arcgis(_export_features(1, 3), _export_features(3, 2), []) as query:
+            first = json.loads(self.client.get('/api/data/', {'cursor': '', 'per_page': 2}).content)
+            response = self.client.get('/api/data/', {'cursor': first['next_cursor'], 'per_page': 2})
+        body = json.loads(response.content)
+        where = query.call_args_list[2].args[1]
+        self.assertIn("(data_rilevamento < TIMESTAMP '2024-06-10 06:13:20.000' OR "
+                      "(data_rilevamento = TIMESTAMP '2024-06-10 06:13:20.000' AND objectid < 2))", where)
+        self.assertIsNone(body['next_cursor'])
+        self.assertTrue(body['prev_cursor'])
+
+    def test_prev_cursor_scans_backwards(self, _mappings):
+        from apps.reports.services.report_list import encode_cursor
+        cursor = encode_cursor('prev', {'objectid': 5, 'tratta': 'A50'}, '1=1', 'tratta', 'asc')
+        rows = [{'attributes': {'objectid': n, 'tratta': 'A50'}} for n in (4, 3, 2)]
+        with self._arcgis(rows) as query:
+            body = json.loads(self.client.get(
+                '/api/data/', {'cursor': cursor, 'per_page': 2, 'sort_by': 'tratta', 'sort_order': 'asc'}).content)
+        self.assertEqual(query.call_args_list[0].kwargs['orderByFields'], 'tratta DESC,objectid DESC')
+        self.assertIn("objectid < 5", query.call_args_list[0].args[1])
+        self.assertTrue(body['prev_cursor'])
+        self.assertTrue(body['next_cursor'])
+
+    def test_rows_without_sort_value_follow_the_others(self, _mappings):
+        undated = [{'attributes': {'objectid': n, 'uniquerowid': f'u{n}', 'data_rilevamento': None}} for n in (9, 8)]
+        with self._arcgis(_export_features(1, 1), undated, count=3) as query:
+            body = json.loads(self.client.get('/api/data/', {'cursor': '', 'per_page': 3}).content)
+        self.assertEqual([row['uniquerowid'] for row in body['data']][1:], ['u9', 'u8'])
+        self.assertEqual((len(body['data']), body['total']), (3, 3))
+        self.assertIsNone(body['next_cursor'])
+        null_call = query.call_args_list[1]
+        self.assertEqual(null_call.args[1], '(1=1) AND data_rilevamento IS NULL')
+        self.assertEqual(null_call.kwargs['orderByFields'], 'objectid DESC')
+        self.assertEqual(null_call.kwargs['resultRecordCount'], 3)
+
+    def test_cursors_in_the_null_segment(self, _mappings):
+        from apps.reports.services.report_list import encode_cursor
+        row = {'objectid': 8, 'data_rilevamento': None}
+        after = encode_cursor('next', row, '1=1', 'data_rilevamento', 'desc')
+        before = encode_cursor('prev', row, '1=1', 'data_rilevamento', 'desc')
+        undated = [{'attributes': {'objectid': 9, 'data_rilevamento': None}}]
+        with self._arcgis([], undated, _export_features(1, 2)) as query:
+            self.client.get('/api/data/', {'cursor': after, 'per_page': 2})
+            body = json.loads(self.client.get('/api/data/', {'cursor': before, 'per_page': 2}).content)
+        self.assertEqual(query.call_args_list[0].args[1], '(1=1) AND data_rilevamento IS NULL AND objectid < 8')
+        # Backwards: the rest of the null segment, then the end of the dated rows
+        self.assertEqual(query.call_args_list[2].args[1], '(1=1) AND data_rilevamento IS NULL AND objectid > 8')
+        self.assertEqual(query.call_args_list[3].args[1], '(1=1) AND data_rilevamento IS NOT NULL')
+        self.assertEqual(query.call_args_list[3].kwargs['orderByFields'], 'data_rilevamento ASC,objectid ASC')
+        self.assertEqual(query.call_args_list[3].kwargs['resultRecordCount'], 2)
+        self.assertEqual(len(body['data']), 2)
+        self.assertTrue(body['prev_cursor'])
+
+    def test_tampered_cursor_returns_400(self, _mappings):
+        response = self.client.get('/api/data/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_is_bound_to_filters_and_sort(self, _mappings):
+        with self._arcgis(_export_features(1, 3)):
+            cursor = json.loads(self.client.get('/api/data/', {'cursor': '', 'per_page': 2}).content)['next_cursor']
+        for params in ({'tratta': 'A50'}, {'sort_order': 'asc'}, {'sort_by': 'tratta'}):
+            response = self.client.get('/api/data/', {'cursor': cursor, 'per_page': 2, **params})
+            self.assertEqual(response.status_code, 400, params)
+
+
+@patch('apps.core.services.csv_mapping.get_csv_mappings', return_value={})
+class FeaturePipelineTest(TestCase):
+    """Lazy processing stages and page-only record building in get_data."""
+
+    def test_iter_processed_features_is_lazy(self, _mappings):
+        from apps.reports.mappings import iter_processed_features, process_features
+
+        consumed = []
+
+        def features():
+            for n in range(3):
+                consumed.append(n)
+                yield {'attributes': {'note': f'nota {n}', 'num_imprese': None}, 'geometry': None}
+
+        stream = iter_processed_features(features(), 'main')
+        self.assertEqual(consumed, [])
+        first = next(stream)
+        self.assertEqual(consumed, [0])
+        self.assertEqual([a['field'] for a in first['attributes']], ['note'])
+        self.assertEqual(list(stream), process_features(list(features())[1:], 'main'))
+
+    def test_sort_rows_matches_sort_records(self, mappings):
+        mappings.return_value = {'tratta': {'a7': 'B7 Milano', 'a50': 'a50 Tangenziale', 'b1': 'A1'}}
+        from apps.reports.views import api
+
+        rows = [{'uniquerowid': str(n), 'tratta': ('b1', 'a7', 'a50')[n % 3], 'data_rilevamento': 1718000000000 - n % 4}
+                for n in range(9)]
+        for sort_by in ('tratta', 'data_rilevamento'):
+            for order in ('asc', 'desc'):
+                records = [api._list_record(row) for row in rows]
+                expected = [r['uniquerowid'] for r in api.sort_records(records, sort_by, order)]
+                actual = [row['uniquerowid'] for row in api.sort_rows(rows, sort_by, order)]
+                self.assertEqual(actual, expected, (sort_by, order))
+
+    def test_sort_rows_maps_each_distinct_value_once(self, _mappings):
+        from apps.reports.views import api
+
+        rows = [{'tratta': ('b1', 'a7', 'a50')[n % 3]} for n in range(30)]
+        with patch.object(api, 'get_field_value', wraps=api.get_field_value) as lookup:
+            api.sort_rows(rows, 'tratta', 'asc')
+        self.assertEqual(lookup.call_count, 3)
+
+
+import pickle
+
+from django.template import Context, Template
+
+
+@patch('apps.core.services.csv_mapping.get_csv_mappings',
+       return_value={'tratta': {'a50': 'A50 Tangenziale Ovest'}})
+class RecordTypesTest(TestCase):
+    """Slotted records keep the dict shape for templates and callers."""
+
+    def test_processed_attribute_reads_like_the_former_dict(self, _mappings):
+        from apps.reports.mappings import process_attributes
+
+        attr = process_attributes({'tratta': 'a50'}, 'main')[0]
+        self.assertFalse(hasattr(attr, '__dict__'))
+        self.assertEqual(attr['label'], attr.label)
+        self.assertEqual(attr.get('value'), 'A50 Tangenziale Ovest')
+        self.assertIsNone(attr.get('missing'))
+        with self.assertRaises(KeyError):
+            attr['missing']
+        self.assertEqual(attr.as_dict(), {
+            'field': 'tratta', 'label': attr.label,
+            'value': 'A50 Tangenziale Ovest', 'original_value': 'a50',
+        })
+        rendered = Template('{{ a.label }}: {{ a.value }}').render(Context({'a': attr}))
+        self.assertEqual(rendered, f'{attr.label}: A50 Tangenziale Ovest')
+
+    def test_labels_and_values_are_shared_across_features(self, mappings):
+        from apps.reports.mappings import process_features
+
+        features = process_features([{'attributes': {'tratta': 'a50', 'campo_libero': 'x'}}] * 3, 'altro')
+        first, *others = [f.attributes for f in features]
+        for attrs in others:
+            self.assertIs(attrs[0].value, first[0].value)
+            self.assertIs(attrs[1].label, first[1].label)
+        self.assertEqual(mappings.call_count, 1)
+
+    def test_report_rows_share_codes_and_survive_the_cache(self, _mappings):
+        from apps.reports.records import ReportRow
+
+        shared = {}
+        rows = [ReportRow.from_attributes({'tratta': ''.join(['a', '50']), 'uniquerowid': str(n)}, shared)
+                for n in range(3)]
+        self.assertIs(rows[0].tratta, rows[2].tratta)
+        self.assertEqual(rows[1].get('uniquerowid'), '1')
+        self.assertEqual(pickle.loads(pickle.dumps(rows)), rows)
+
+
+def _geo_features(points):
+    return [
+        {'attributes': {'uniquerowid': f'r{n}'}, 'geometry': {'x': x, 'y': y}}
+        for n, (x, y) in enumerate(points)
+    ]
+
+
+@override_settings(REPORTS_GEO_CLUSTER_CELL_SIZE=64, REPORTS_GEO_CLUSTER_MAX_ZOOM=17, REPORTS_GEO_MAX_TILES=4)
+class GeoClusterTest(TestCase):
+    """Clustered report locations served per tile by /api/geo/."""
+
+    # Three reports a few metres apart in Milan (Web Mercator) and one in Genoa (WGS84).
+    POINTS = [(1017000.0, 5695000.0), (1017010.0, 5695010.0), (1017020.0, 5695000.0), (8.93, 44.41)]
+    BBOX = '8.5,44.0,9.5,45.7'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='geouser', password='testpassword123',
+            is_superuser=True,
+        )
+        self.client.force_login(self.user, backend='apps.accounts.auth.SuperuserOnlyModelBackend')
+
+    def _arcgis(self, points=POINTS):
+        return patch('apps.reports.services.report_geo.iter_feature_layer',
+                     side_effect=lambda *args, **kwargs: iter(_geo_features(points)))
+
+    def test_unit_coordinates_round_trip_mercator_and_wgs84(self):
+        from apps.reports.services.report_data import _get_coordinates
+        from apps.reports.services.report_geo import from_unit, to_unit
+
+        keep, ux, uy = to_unit([1017000.0, None, 8.93], [5695000.0, 5.0, 44.41])
+        self.assertEqual(keep, [0, 2])
+        coords = _get_coordinates({'geometry': {'x': 1017000.0, 'y': 5695000.0}})
+        self.assertEqual(from_unit(ux[0], uy[0]), (round(coords['lon'], 6), round(coords['lat'], 6)))
+        self.assertEqual(from_unit(ux[1], uy[1]), (8.93, 44.41))
+
+    def test_nearby_reports_are_clustered_and_far_ones_kept(self):
+        with self._arcgis():
+            response = self.client.get('/api/geo/', {'bbox': self.BBOX, 'zoom': 8})
+        body = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body['type'], 'FeatureCollection')
+        properties = sorted((f['properties'] for f in body['features']), key=str)
+        self.assertEqual(properties, [{'cluster': True, 'point_count': 3}, {'uniquerowid': 'r3'}])
+
+    def test_max_zoom_returns_every_report(self):
+        from apps.reports.services.report_geo import get_report_points, cluster_tile
+
+        with self._arcgis(self.POINTS[:3]):
+            points = get_report_points()['points']
+        x, y = int(points.ux[0] * 2 ** 17), int(points.uy[0] * 2 ** 17)
+        self.assertEqual(len(cluster_tile(points, 16, x // 2, y // 2)), 1)
+        features = cluster_tile(points, 17, x, y)
+        self.assertEqual(sorted(f['properties']['uniquerowid'] for f in features), ['r0', 'r1', 'r2'])
+
+    def test_tiles_are_cached_per_filter_set(self):
+        with self._arcgis() as query:
+            first = self.client.get('/api/geo/', {'bbox': self.BBOX, 'zoom': 8, 'tratta': 'A7'})
+            second = self.client.get('/api/geo/', {'bbox': self.BBOX, 'zoom': 8, 'tratta': 'A7'})
+            self.client.get('/api/geo/', {'bbox': self.BBOX, 'zoom': 8})
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(query.call_count, 2)
+        self.assertEqual(query.call_args_list[0].args[1], "tratta = 'A7'")
+
+    def test_invalid_bbox_zoom_or_too_many_tiles_return_400(self):
+        for params in ({'zoom': 8}, {'bbox': '9,45,8,46', 'zoom': 8}, {'bbox': '8,44,9,nan', 'zoom': 8},
+                       {'bbox': self.BBOX, 'zoom': 23}, {'bbox': self.BBOX, 'zoom': 'x'},
+                       {'bbox': self.BBOX, 'zoom': 12}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/geo/', params).status_code, 400)
+
+    def test_world_bbox_at_max_zoom_is_rejected_without_listing_tiles(self):
+        from apps.reports.services.report_geo import bbox_tile_count
+
+        world = (-180.0, -90.0, 180.0, 90.0)
+        self.assertEqual(bbox_tile_count(world, 22), (1 << 22) ** 2)
+        with patch('apps.reports.services.report_geo.bbox_tiles') as tiles, self._arcgis() as query:
+            response = self.client.get('/api/geo/', {'bbox': '-180,-90,180,90', 'zoom': 22})
+        self.assertEqual(response.status_code, 400)
+        tiles.assert_not_called()
+        query.assert_not_called()
+
+
+import shutil
+import tempfile
+from pathlib import Path
+
+
+class VectorTileTest(TestCase):
+    """Report points served as Mapbox Vector Tiles from the disk cache."""
+
+    # Two reports on the same spot, a third with another route, one far away.
+    POINTS = [(1017000.0, 5695000.0, 'A7'), (1017000.0, 5695000.0, 'A7'),
+              (1017000.0, 5695000.0, 'A50'), (8.93, 44.41, 'A7')]
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        settings = override_settings(REPORTS_TILE_CACHE_DIR=self.directory, REPORTS_TILE_CACHE_TIMEOUT=300)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.user = User.objects.create_user(
+            username='tileuser', password='testpassword123',
+            is_superuser=True,
+        )
+        self.client.force_login(self.user, backend='apps.accounts.auth.SuperuserOnlyModelBackend')
+        features = [
+            {'attributes': {'uniquerowid': f'r{n}', 'tratta': tratta, 'tipologia_appalto': 'pav'},
+             'geometry': {'x': x, 'y': y}}
+            for n, (x, y, tratta) in enumerate(self.POINTS)
+        ]
+        layer = patch('apps.reports.services.report_geo.iter_feature_layer',
+                      side_effect=lambda *args, **kwargs: iter(features))
+        self.query = layer.start()
+        self.addCleanup(layer.stop)
+        mappings = patch('apps.core.services.csv_mapping.get_csv_mappings',
+                         return_value={'tratta': {'A7': 'A7 Milano-Serravalle'}})
+        mappings.start()
+        self.addCleanup(mappings.stop)
+
+    def _url(self, zoom=12):
+        from apps.reports.services.report_geo import to_unit
+        _, ux, uy = to_unit([1017000.0], [5695000.0])
+        return f'/tiles/{zoom}/{int(ux[0] * 2 ** zoom)}/{int(uy[0] * 2 ** zoom)}.mvt'
+
+    def test_tile_holds_labelled_points_merged_per_pixel(self):
+        from apps.core.mvt import MVT_CONTENT_TYPE, decode_tile
+
+        response = self.client.get(self._url(17))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], MVT_CONTENT_TYPE)
+        features = decode_tile(response.content)['reports']['features']
+        properties = sorted((f['properties'] for f in features), key=lambda p: p['tratta'])
+        self.assertEqual(properties, [
+            {'tratta': 'A50', 'tipologia_appalto': 'pav', 'uniquerowid': 'r2'},
+            {'tratta': 'A7 Milano-Serravalle', 'tipologia_appalto': 'pav', 'point_count': 2},
+        ])
+        self.assertTrue(all(0 <= f['x'] < 4096 and 0 <= f['y'] < 4096 for f in features))
+
+    def test_clustered_zooms_only_count_points(self):
+        from apps.core.mvt import decode_tile
+
+        features = decode_tile(self.client.get(self._url(12)).content)['reports']['features']
+        self.assertEqual(sorted(f['properties'].get('point_count') for f in features), [1, 2])
+        self.assertFalse(any('uniquerowid' in f['properties'] for f in features))
+
+    def test_tile_is_reused_from_disk_and_revalidated_by_etag(self):
+        first = self.client.get(self._url())
+        cache.clear()
+        second = self.client.get(self._url(), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.query.call_count, 1)
+        self.assertEqual(len(list(Path(self.directory).rglob('*.mvt'))), 1)
+
+    def test_filters_get_their_own_tiles(self):
+        self.client.get(self._url(), {'tratta': 'A50'})
+        self.client.get(self._url())
+        self.assertEqual(self.query.call_args_list[0].args[1], "tratta = 'A50'")
+        self.assertEqual(len(list(Path(self.directory).rglob('*.mvt'))), 2)
+
+    def test_empty_tile_and_invalid_coordinates(self):
+        response = self.client.get('/tiles/12/0/0.mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(list(Path(self.directory).rglob('*.mvt')), [])
+        for url in ('/tiles/23/0/0.mvt', '/tiles/2/4/0.mvt', '/tiles/2/0/4.mvt'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(self._url(), {'tratta': "A7'; --"}).status_code, 400)
+
+
+    def test_prune_deletes_expired_and_oldest_tiles(self):
+        import os
+        import time
+        from django.core.management import call_command
+        from apps.reports.services.report_tiles import prune_tiles
+
+        root = Path(self.directory)
+        now = time.time()
+        for n, age in enumerate((1000, 50, 40, 30)):
+            path = root / f'digest{n}' / '12' / '1' / '2.mvt'
+            path.parent.mkdir(parents=True)
+            path.write_bytes(b'tile')
+            os.utime(path, (now - age, now - age))
+        self.assertEqual(prune_tiles(max_age=300, max_files=2), 2)
+        self.assertEqual(sorted(p.parts[-4] for p in root.rglob('*.mvt')), ['digest2', 'digest3'])
+        self.assertFalse((root / 'digest0').exists())
+        call_command('prune_tiles', '--max-age', '0', stdout=io.StringIO())
+        self.assertEqual(list(root.iterdir()), [])
+
+    def test_tile_writes_sweep_the_directory_once_per_timeout(self):
+        from apps.reports.services.report_tiles import PRUNE_LOCK_KEY
+
+        with override_settings(REPORTS_TILE_CACHE_MAX_FILES=1):
+            self.client.get(self._url(), {'tratta': 'A50'})
+            self.client.get(self._url())
+            self.assertEqual(len(list(Path(self.directory).rglob('*.mvt'))), 2)
+            cache.delete(PRUNE_LOCK_KEY)
+            self.client.get(self._url(), {'tratta': 'A7'})
+        self.assertEqual(len(list(Path(self.directory).rglob('*.mvt'))), 1)
+
+
+class PkRangeFilterTest(TestCase):
+    """Route kilometre filter of /api/data/."""
+
+    def test_pk_range_becomes_an_overlap_predicate(self):
+        from apps.reports.views.api import build_where_clause
+
+        where = build_where_clause({'tratta': ['A7'], 'pk_from': '40', 'pk_to': '55,5'})
+        self.assertTrue(where.startswith("tratta = 'A7' AND ("))
+        self.assertIn('(pk_iniz <= 55.5 AND pk_fin >= 40.0)', where)
+        self.assertIn('(pk_fin <= 55.5 AND pk_iniz >= 40.0)', where)
+        self.assertIn('pk_fin IS NULL', where)
+
+    def test_open_range_and_no_range(self):
+        from apps.reports.views.api import build_where_clause, parse_pk_range
+
+        self.assertIsNone(parse_pk_range({}))
+        self.assertEqual(parse_pk_range({'pk_to': '12'}), (None, 12.0))
+        where = build_where_clause({'pk_from': '40'})
+        self.assertIn('(pk_iniz IS NOT NULL AND pk_fin >= 40.0)', where)
+        self.assertEqual(build_where_clause({}), '1=1')
+
+    def test_invalid_pk_is_rejected(self):
+        from apps.reports.views.api import build_where_clause
+
+        for filters in ({'pk_from': 'abc'}, {'pk_from': 'nan'}, {'pk_to': 'inf'},
+                        {'pk_from': '10', 'pk_to': '5'}, {'pk_from': "1) OR (1=1"}):
+            with self.subTest(filters=filters):
+                with self.assertRaises(ValueError):
+                    build_where_clause(filters)
+
+
+@override_settings(REPORTS_PK_INDEX_CACHE_TIMEOUT=300)
+class InterventionsTest(TestCase):
+    """Reports and pavement rows served by route kilometre from the pk index."""
+
+    # 2024-03-01 and 2024-06-01 UTC, in epoch ms
+    MARCH, JUNE = 1709251200000, 1717200000000
+    REPORTS = [
+        {'uniquerowid': 'r1', 'tratta': 'A7', 'carreggiata': 'N', 'pk_iniz': 40.0, 'pk_fin': 42.5,
+         'data_rilevamento': MARCH, 'tipologia_appalto': 'pav'},
+        {'uniquerowid': 'r2', 'tratta': 'A7', 'carreggiata': 'S', 'pk_iniz': 60.0, 'pk_fin': 50.0,
+         'data_rilevamento': JUNE, 'tipologia_appalto': 'pav'},
+        {'uniquerowid': 'r3', 'tratta': 'A50', 'carreggiata': 'N', 'pk_iniz': 45.0, 'pk_fin': None,
+         'data_rilevamento': JUNE, 'tipologia_appalto': 'seg'},
+        {'uniquerowid': 'r4', 'tratta': 'A7', 'carreggiata': 'N', 'pk_iniz': None, 'pk_fin': None,
+         'data_rilevamento': JUNE, 'tipologia_appalto': 'pav'},
+    ]
+    PAVEMENT = [
+        {'parentrowid': 'r1', 'corsia': '1', 'tipo_intervento_pav': 'fresatura',
+         'pk_iniz_pav': 54.0, 'pk_fin_pav': 54.2},
+        {'parentrowid': 'r4', 'corsia': '2', 'tipo_intervento_pav': 'fresatura',
+         'pk_iniz_pav': 41.0, 'pk_fin_pav': 41.1},
+        {'parentrowid': 'missing', 'corsia': '1', 'tipo_intervento_pav': 'fresatura',
+         'pk_iniz_pav': 41.0, 'pk_fin_pav': 41.1},
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='pkuser', password='testpassword123',
+            is_superuser=True,
+        )
+        self.client.force_login(self.user, backend='apps.accounts.auth.SuperuserOnlyModelBackend')
+        layers = {0: self.REPORTS, 1: self.PAVEMENT}
+        layer = patch('apps.reports.services.report_pk_index.iter_feature_layer',
+                      side_effect=lambda layer_id, *args, **kwargs: iter(
+                          {'attributes': attrs} for attrs in layers[layer_id]))
+        self.query = layer.start()
+        self.addCleanup(layer.stop)
+        mappings = patch('apps.core.services.csv_mapping.get_csv_mappings',
+                         return_value={'tratta': {'A7': 'A7 Milano-Serravalle'}})
+        mappings.start()
+        self.addCleanup(mappings.stop)
+
+    def _get(self, **params):
+        response = self.client.get('/api/interventions/', params)
+        return response, json.loads(response.content)
+
+    def test_reports_and_pavement_rows_overlapping_the_range(self):
+        response, body = self._get(pk_from='41', pk_to='55')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body['total'], 5)
+        self.assertEqual(
+            [(item['tratta'], item['kind'], item['uniquerowid'], item['pk_iniz'], item['pk_fin']) for item in body['data']],
+            [('A50', 'report', 'r3', 45.0, 45.0),
+             ('A7 Milano-Serravalle', 'report', 'r1', 40.0, 42.5),
+             ('A7 Milano-Serravalle', 'pavement', 'r4', 41.0, 41.1),
+             ('A7 Milano-Serravalle', 'report', 'r2', 60.0, 50.0),
+             ('A7 Milano-Serravalle', 'pavement', 'r1', 54.0, 54.2)],
+        )
+        pavement = body['data'][2]
+        self.assertEqual((pavement['corsia'], pavement['tipo_intervento_pav']), ('2', 'fresatura'))
+        self.assertEqual(body['data'][0]['data_rilevamento'], '01/06/2024')
+
+    def test_filters_and_pagination(self):
+        _, body = self._get(pk_from='41', pk_to='55', tratta='A7', carreggiata='N', kind='report')
+        self.assertEqual([item['uniquerowid'] for item in body['data']], ['r1'])
+        _, body = self._get(pk_to='100', date_from='2024-03-01', date_to='2024-03-01')
+        self.assertEqual([(item['kind'], item['uniquerowid']) for item in body['data']],
+                         [('report', 'r1'), ('pavement', 'r1')])
+        _, body = self._get(pk_from='0', per_page='2', page='3')
+        self.assertEqual((body['total'], len(body['data'])), (5, 1))
+
+    def test_index_is_built_once_and_cached(self):
+        self._get(pk_from='41')
+        self._get(pk_from='0', pk_to='10')
+        self.assertEqual(self.query.call_count, 2)
+        self.assertEqual([c.args[0] for c in self.query.call_args_list], [0, 1])
+
+    def test_index_is_memoised_per_process_under_a_cache_version(self):
+        from apps.reports.services import report_pk_index
+
+        self._get(pk_from='41')
+        with patch.object(report_pk_index, 'cache', wraps=cache) as cached:
+            self._get(pk_from='41')
+        # Only the version token is read; the index is not unpickled again
+        self.assertEqual([c.args[0] for c in cached.get.call_args_list], [report_pk_index.PK_INDEX_VERSION_KEY])
+        # A process without the memo loads it from the cache
+        report_pk_index._local_index.update(version=None, index=None)
+        _, body = self._get(pk_from='41')
+        self.assertEqual((self.query.call_count, body['total']), (2, 5))
+        # When the token expires the index is rebuilt
+        cache.delete(report_pk_index.PK_INDEX_VERSION_KEY)
+        self._get(pk_from='41')
+        self.assertEqual(self.query.call_count, 4)
+
+    def test_missing_or_invalid_parameters_return_400(self):
+        for params in ({}, {'tratta': 'A7'}, {'pk_from': '10', 'pk_to': '5'}, {'pk_from': 'x'},
+                       {'pk_from': '1', 'kind': 'other'}, {'pk_from': '1', 'date_from': '2024'},
+                       {'pk_from': '1', 'per_page': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self._get(**params)[0].status_code, 400)
+        self.assertEqual(self.query.call_count, 0)
@@ -3,6 +3,7 @@
 from django.urls import path
 from .views.pages import ReportListView, ReportDetailView
 from .views.pdf import export_pdf
+from .views.tiles import vector_tile
 
 app_name = 'reports'
 
@@ -10,4 +11,5 @@ urlpatterns = [
     path('reports/', ReportListView.as_view(), name='report_list'),
     path('reports/detail/', ReportDetailView.as_view(), name='report_detail'),
     path('reports/pdf/', export_pdf, name='report_pdf'),
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', vector_tile, name='vector_tile'),
 ]
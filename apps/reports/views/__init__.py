@@ -1,3 +1,4 @@
 from .pages import *
 from .api import *
 from .pdf import *
+from .tiles import *
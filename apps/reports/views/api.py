@@ -1,15 +1,29 @@
 """API views for reports app."""
 
 import logging
+import math
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from itertools import chain, islice
 from django.conf import settings
-from django.http import JsonResponse, HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_GET
 
-from apps.core.services.arcgis import query_feature_layer, get_attachments, get_arcgis_service
-from apps.reports.mappings import get_field_value, format_date
+from apps.core.fastjson import FastJsonResponse
+from apps.core.metrics import IMAGE_PROXY_BYTES
+from apps.core.ratelimit import rate_limit
+from apps.core.services.arcgis import get_arcgis_service
+from apps.core.xlsx import XLSX_CONTENT_TYPE, stream_xlsx
+from apps.reports.mappings import get_field_value, get_reports_mappings, format_date
+from apps.reports.services.report_geo import MAX_ZOOM, bbox_tile_count, get_geo_features
+from apps.reports.services.report_pk_index import KIND_PAVEMENT, KIND_REPORT, find_interventions
+from apps.reports.services.report_export import export_header, iter_export_values, iter_report_rows, stream_csv
+from apps.reports.services.report_list import (
+    get_report_page,
+    get_report_rows,
+    get_filter_options as load_filter_options,
+)
 from apps.audit.utils import emit_audit_event
 from config.strings import UI_STRINGS
 
@@ -41,12 +55,90 @@ def normalize_filter(value):
 _FILTER_VALUE_RE = re.compile(r'^[\w\-\. ]+$', re.UNICODE)
 
 
+def parse_date_range(filters):
+    """
+    Return the (start, end) datetimes of the date_from/date_to filters.
+
+    end is the day after date_to, to be used as an exclusive bound; either
+    is None when its filter is empty.
+
+    Raises:
+        ValueError: if a date is not YYYY-MM-DD.
+    """
+    date_from = filters.get('date_from', '')
+    date_to = filters.get('date_to', '')
+    start = end = None
+
+    if date_from:
+        try:
+            start = datetime.strptime(date_from, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError(f"Invalid date_from format (expected YYYY-MM-DD): {date_from!r}")
+
+    if date_to:
+        try:
+            end = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+        except ValueError:
+            raise ValueError(f"Invalid date_to format (expected YYYY-MM-DD): {date_to!r}")
+
+    return start, end
+
+
+def parse_pk_range(filters):
+    """
+    Return the (lo, hi) route kilometres of the pk_from/pk_to filters, or None.
+
+    An empty side is None (open range).
+
+    Raises:
+        ValueError: if a bound is not a finite number or lo > hi.
+    """
+    bounds = []
+    for name in ('pk_from', 'pk_to'):
+        value = filters.get(name, '')
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            number = float(value.replace(',', '.'))
+        except ValueError:
+            number = math.nan
+        if not math.isfinite(number):
+            raise ValueError(f"Invalid {name} (expected a number): {value!r}")
+        bounds.append(number)
+    lo, hi = bounds
+    if lo is None and hi is None:
+        return None
+    if lo is not None and hi is not None and lo > hi:
+        raise ValueError(f"pk_from is greater than pk_to: {lo} > {hi}")
+    return lo, hi
+
+
+def _pk_overlap_condition(lo, hi):
+    """
+    WHERE predicate of the reports whose pk_iniz..pk_fin span overlaps [lo, hi].
+
+    Spans may run in either direction and a missing end stands for the other
+    one, as in the pk index (services/report_pk_index.py).
+    """
+    def cmp(field, op, bound):
+        return f"{field} {op} {bound!r}" if bound is not None else f"{field} IS NOT NULL"
+
+    return '(' + ' OR '.join((
+        f"({cmp('pk_iniz', '<=', hi)} AND {cmp('pk_fin', '>=', lo)})",
+        f"({cmp('pk_fin', '<=', hi)} AND {cmp('pk_iniz', '>=', lo)})",
+        f"(pk_fin IS NULL AND {cmp('pk_iniz', '>=', lo)} AND {cmp('pk_iniz', '<=', hi)})",
+        f"(pk_iniz IS NULL AND {cmp('pk_fin', '>=', lo)} AND {cmp('pk_fin', '<=', hi)})",
+    )) + ')'
+
+
 def build_where_clause(filters):
     """
     Build an ArcGIS SQL WHERE clause from the parsed filters dict.
 
     String fields use IN (...) for multiple values or = for a single value.
-    Date fields are validated strictly as YYYY-MM-DD before being interpolated.
+    Date fields are validated strictly as YYYY-MM-DD before being interpolated;
+    pk bounds are interpolated from parsed floats.
 
     Raises:
         ValueError: if any filter value fails allowlist/format validation.
@@ -73,22 +165,16 @@ def build_where_clause(filters):
             conditions.append(f"{field} IN ({in_list})")
 
     # Date range — ArcGIS accepts TIMESTAMP 'YYYY-MM-DD HH:MM:SS' literals
-    date_from = filters.get('date_from', '')
-    date_to = filters.get('date_to', '')
-
+    date_from, date_to = parse_date_range(filters)
     if date_from:
-        try:
-            dt = datetime.strptime(date_from, '%Y-%m-%d')
-        except ValueError:
-            raise ValueError(f"Invalid date_from format (expected YYYY-MM-DD): {date_from!r}")
-        conditions.append(f"data_rilevamento >= TIMESTAMP '{dt.strftime('%Y-%m-%d %H:%M:%S')}'")
-
+        conditions.append(f"data_rilevamento >= TIMESTAMP '{date_from.strftime('%Y-%m-%d %H:%M:%S')}'")
     if date_to:
-        try:
-            dt = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
-        except ValueError:
-            raise ValueError(f"Invalid date_to format (expected YYYY-MM-DD): {date_to!r}")
-        conditions.append(f"data_rilevamento < TIMESTAMP '{dt.strftime('%Y-%m-%d %H:%M:%S')}'")
+        conditions.append(f"data_rilevamento < TIMESTAMP '{date_to.strftime('%Y-%m-%d %H:%M:%S')}'")
+
+    # Route kilometre range — numbers only, rendered from parsed floats
+    pk_range = parse_pk_range(filters)
+    if pk_range:
+        conditions.append(_pk_overlap_condition(*pk_range))
 
     return ' AND '.join(conditions) if conditions else '1=1'
 
@@ -143,33 +229,132 @@ def apply_filters(attributes, filters):
     return True
 
 
+def _sort_key(sort_by, value):
+    # Special handling for dates
+    if sort_by == 'data_rilevamento':
+        try:
+            ts = float(value)
+            if ts > 9999999999:
+                ts = ts / 1000
+            return ts
+        except (ValueError, TypeError):
+            return 0
+
+    # For strings, use case-insensitive comparison
+    if isinstance(value, str):
+        return value.lower()
+
+    return value or ''
+
+
 def sort_records(records, sort_by, sort_order):
     """Sort records by a field."""
     if not records:
         return records
 
-    reverse = sort_order == 'desc'
-
-    def get_sort_key(record):
-        value = record.get(sort_by, '')
-
-        # Special handling for dates
-        if sort_by == 'data_rilevamento':
-            try:
-                ts = float(value)
-                if ts > 9999999999:
-                    ts = ts / 1000
-                return ts
-            except (ValueError, TypeError):
-                return 0
+    return sorted(records, key=lambda record: _sort_key(sort_by, record.get(sort_by, '')),
+                  reverse=sort_order == 'desc')
 
-        # For strings, use case-insensitive comparison
-        if isinstance(value, str):
-            return value.lower()
 
-        return value or ''
+def sort_rows(rows, sort_by, sort_order):
+    """
+    Sort raw layer-0 rows in the order sort_records gives their list records.
 
-    return sorted(records, key=get_sort_key, reverse=reverse)
+    Mapped fields sort by display value, computed once per distinct raw
+    value rather than once per row; the rows themselves are not copied.
+    """
+    if not rows:
+        return []
+    if sort_by == 'data_rilevamento':
+        def key(row):
+            return _sort_key(sort_by, row.get(sort_by, ''))
+    else:
+        keys = {}
+        csv_mappings = get_reports_mappings()
+
+        def key(row):
+            raw = row.get(sort_by, '')
+            try:
+                return keys[raw]
+            except KeyError:
+                keys[raw] = _sort_key(sort_by, get_field_value(sort_by, raw, csv_mappings))
+                return keys[raw]
+
+    return sorted(rows, key=key, reverse=sort_order == 'desc')
+
+
+# Allowlist of sort fields — prevents field enumeration
+_ALLOWED_SORT_FIELDS = {'data_rilevamento', 'nome_operatore', 'tratta', 'tipologia_appalto'}
+
+
+def parse_sort(request):
+    """Return (sort_by, sort_order) from the query string, with safe defaults."""
+    sort_by = request.GET.get('sort_by', 'data_rilevamento')
+    if sort_by not in _ALLOWED_SORT_FIELDS:
+        sort_by = 'data_rilevamento'
+    sort_order = request.GET.get('sort_order', 'desc').lower()
+    if sort_order not in ('asc', 'desc'):
+        sort_order = 'desc'
+    return sort_by, sort_order
+
+
+def parse_filters(request):
+    """Return the filters dict expected by build_where_clause from the query string."""
+    return {
+        'nome_operatore': normalize_filter(request.GET.getlist('nome_operatore') or request.GET.get('nome_operatore')),
+        'tratta': normalize_filter(request.GET.getlist('tratta') or request.GET.get('tratta')),
+        'tipologia_appalto': normalize_filter(request.GET.getlist('tipologia_appalto') or request.GET.get('tipologia_appalto')),
+        'date_from': request.GET.get('date_from', '').strip(),
+        'date_to': request.GET.get('date_to', '').strip(),
+        'pk_from': request.GET.get('pk_from', '').strip(),
+        'pk_to': request.GET.get('pk_to', '').strip(),
+    }
+
+
+def _list_record(attrs, csv_mappings=None):
+    """Record of the report list with mapped values (date still raw)."""
+    if csv_mappings is None:
+        csv_mappings = get_reports_mappings()
+    return {
+        'uniquerowid': attrs.get('uniquerowid', ''),
+        'nome_operatore': get_field_value('nome_operatore', attrs.get('nome_operatore', ''), csv_mappings),
+        'tratta': get_field_value('tratta', attrs.get('tratta', ''), csv_mappings),
+        'tipologia_appalto': get_field_value('tipologia_appalto', attrs.get('tipologia_appalto', ''), csv_mappings),
+        'data_rilevamento': attrs.get('data_rilevamento', ''),  # Keep original for sorting
+    }
+
+
+def _format_dates(records):
+    for record in records:
+        if record['data_rilevamento']:
+            record['data_rilevamento'] = format_date(record['data_rilevamento'])
+    return records
+
+
+def _get_data_page(request, where, sort_by, sort_order, per_page):
+    """Cursor mode of get_data: one keyset page straight from ArcGIS."""
+    try:
+        result = get_report_page(where, sort_by, sort_order, per_page, request.GET.get('cursor') or None)
+    except ValueError as exc:
+        logger.warning("Invalid cursor in get_data: %s", exc)
+        return FastJsonResponse({'error': UI_STRINGS['error_pagination_params']}, status=400)
+
+    if 'error' in result:
+        return FastJsonResponse({'error': result['error']}, status=500)
+
+    emit_audit_event(request, "data.arcgis.queried", detail={
+        "layer_id": 0,
+        "record_count": len(result['rows']),
+    })
+    csv_mappings = get_reports_mappings() if result['rows'] else None
+    return FastJsonResponse({
+        'data': _format_dates([_list_record(attrs, csv_mappings) for attrs in result['rows']]),
+        'total': result['total'],
+        'sort_by': sort_by,
+        'sort_order': sort_order,
+        'next_cursor': result['next_cursor'],
+        'prev_cursor': result['prev_cursor'],
+    })
 
 
 @login_required
@@ -178,7 +363,13 @@ def get_data(request):
     """
     Get paginated report data with filtering and sorting.
 
+    Passing ``cursor`` (empty for the first page) switches to cursor mode:
+    pages are read from ArcGIS by keyset and the response adds
+    ``next_cursor``/``prev_cursor`` (null at either end), to be passed back
+    unchanged with the same sort and filters; ``page`` is then ignored.
+
     Query params:
+        - cursor: Opaque cursor from a previous response (cursor mode)
         - page: Page number (default: 1)
         - per_page: Items per page (default: 10)
         - sort_by: Field to sort by (default: data_rilevamento)
@@ -188,6 +379,8 @@ def get_data(request):
         - tipologia_appalto: Filter by contract type (supports multiple values)
         - date_from: Filter by start date (YYYY-MM-DD)
         - date_to: Filter by end date (YYYY-MM-DD)
+        - pk_from, pk_to: Reports whose pk_iniz..pk_fin span overlaps this
+          route kilometre range (either side may be omitted)
     """
     try:
         # Parse pagination params
@@ -198,73 +391,35 @@ def get_data(request):
                 settings.MAX_ITEMS_PER_PAGE,
             )
         except (ValueError, TypeError):
-            return JsonResponse({'error': UI_STRINGS['error_pagination_params']}, status=400)
+            return FastJsonResponse({'error': UI_STRINGS['error_pagination_params']}, status=400)
         offset = (page - 1) * per_page
 
-        # Parse sorting params — allowlist to prevent field enumeration
-        _ALLOWED_SORT_FIELDS = {'data_rilevamento', 'nome_operatore', 'tratta', 'tipologia_appalto'}
-        sort_by = request.GET.get('sort_by', 'data_rilevamento')
-        if sort_by not in _ALLOWED_SORT_FIELDS:
-            sort_by = 'data_rilevamento'
-        sort_order = request.GET.get('sort_order', 'desc').lower()
-        if sort_order not in ('asc', 'desc'):
-            sort_order = 'desc'
-
-        # Parse filters
-        filters = {
-            'nome_operatore': normalize_filter(request.GET.getlist('nome_operatore') or request.GET.get('nome_operatore')),
-            'tratta': normalize_filter(request.GET.getlist('tratta') or request.GET.get('tratta')),
-            'tipologia_appalto': normalize_filter(request.GET.getlist('tipologia_appalto') or request.GET.get('tipologia_appalto')),
-            'date_from': request.GET.get('date_from', '').strip(),
-            'date_to': request.GET.get('date_to', '').strip(),
-        }
+        sort_by, sort_order = parse_sort(request)
 
         # Build server-side WHERE clause and query only matching features
-        where = build_where_clause(filters)
+        where = build_where_clause(parse_filters(request))
         logger.debug(f"ArcGIS WHERE clause: {where}")
-        result = query_feature_layer(0, where)
+        if 'cursor' in request.GET:
+            return _get_data_page(request, where, sort_by, sort_order, per_page)
+        result = get_report_rows(where)
 
         if 'error' in result:
-            return JsonResponse({'error': result['error']}, status=500)
-
-        if "features" in result:
-            emit_audit_event(request, "data.arcgis.queried", detail={
-                "layer_id": 0,
-                "record_count": len(result.get("features", [])),
-            })
-
-        features = result.get('features', [])
-
-        # Build records from returned features (all already match the filters)
-        records = []
-        for feature in features:
-            attrs = feature.get('attributes', {})
-
-            # Build record with mapped values
-            record = {
-                'uniquerowid': attrs.get('uniquerowid', ''),
-                'nome_operatore': get_field_value('nome_operatore', attrs.get('nome_operatore', '')),
-                'tratta': get_field_value('tratta', attrs.get('tratta', '')),
-                'tipologia_appalto': get_field_value('tipologia_appalto', attrs.get('tipologia_appalto', '')),
-                'data_rilevamento': attrs.get('data_rilevamento', ''),  # Keep original for sorting
-            }
-            records.append(record)
-
-        # Sort records
-        records = sort_records(records, sort_by, sort_order)
-
-        # Calculate total
-        total = len(records)
-
-        # Apply pagination
-        paginated_records = records[offset:offset + per_page]
-
-        # Format dates for display
-        for record in paginated_records:
-            if record['data_rilevamento']:
-                record['data_rilevamento'] = format_date(record['data_rilevamento'])
-
-        return JsonResponse({
+            return FastJsonResponse({'error': result['error']}, status=500)
+
+        rows = result['rows']
+        emit_audit_event(request, "data.arcgis.queried", detail={
+            "layer_id": 0,
+            "record_count": len(rows),
+        })
+
+        # Sort the raw rows (all already match the filters) and build the
+        # list records of the requested page only
+        total = len(rows)
+        page_rows = list(islice(sort_rows(rows, sort_by, sort_order), offset, offset + per_page))
+        csv_mappings = get_reports_mappings() if page_rows else None
+        paginated_records = _format_dates([_list_record(attrs, csv_mappings) for attrs in page_rows])
+
+        return FastJsonResponse({
             'data': paginated_records,
             'total': total,
             'sort_by': sort_by,
@@ -273,10 +428,209 @@ def get_data(request):
 
     except ValueError as exc:
         logger.warning("Invalid filter parameter in get_data: %s", exc)
-        return JsonResponse({'error': UI_STRINGS['error_filter_param']}, status=400)
+        return FastJsonResponse({'error': UI_STRINGS['error_filter_param']}, status=400)
     except Exception:
         logger.exception("Error in get_data")
-        return JsonResponse({'error': UI_STRINGS['error_internal']}, status=500)
+        return FastJsonResponse({'error': UI_STRINGS['error_internal']}, status=500)
+
+
+_EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'xlsx': (XLSX_CONTENT_TYPE, 'xlsx'),
+}
+
+
+@login_required
+@require_GET
+@rate_limit('report_export', 'REPORTS_EXPORT_RATE_LIMIT')
+def export_data(request):
+    """
+    Stream the whole filtered and sorted report list as CSV or XLSX.
+
+    Query params: format (csv or xlsx, default csv), sort_by, sort_order and
+    the filters of get_data. Rows are read from ArcGIS in chunks and written
+    as they arrive, so memory does not grow with the number of reports.
+    """
+    export_format = request.GET.get('format', 'csv').lower()
+    if export_format not in _EXPORT_FORMATS:
+        return FastJsonResponse({'error': UI_STRINGS['error_invalid_params']}, status=400)
+
+    try:
+        sort_by, sort_order = parse_sort(request)
+        where = build_where_clause(parse_filters(request))
+        rows = iter_report_rows(where, sort_by, sort_order)
+        # Fetch the first chunk now so an ArcGIS failure is still an error response.
+        first = list(islice(rows, 1))
+    except ValueError as exc:
+        logger.warning("Invalid filter parameter in export_data: %s", exc)
+        return FastJsonResponse({'error': UI_STRINGS['error_filter_param']}, status=400)
+    except Exception:
+        logger.exception("Error in export_data")
+        return FastJsonResponse({'error': UI_STRINGS['error_internal']}, status=500)
+
+    emit_audit_event(request, "data.report_list.exported", detail={
+        "format": export_format,
+        "where": where,
+    })
+
+    rows = chain(first, rows)
+    if export_format == 'xlsx':
+        content = stream_xlsx(export_header(), iter_export_values(rows), sheet_name='Verbali')
+    else:
+        content = stream_csv(rows)
+    content_type, extension = _EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(content, content_type=content_type)
+    filename = f"verbali_{datetime.now():%Y%m%d_%H%M}.{extension}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Let nginx pass chunks through as they are produced.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def parse_bbox(value):
+    """
+    Parse a ``min_lon,min_lat,max_lon,max_lat`` bbox in WGS84.
+
+    Raises:
+        ValueError: if it is malformed, out of range or not ordered min/max.
+    """
+    try:
+        bbox = tuple(float(v) for v in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid bbox: {value!r}")
+    if len(bbox) != 4 or not all(math.isfinite(v) for v in bbox):
+        raise ValueError(f"Invalid bbox: {value!r}")
+    min_lon, min_lat, max_lon, max_lat = bbox
+    if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise ValueError(f"Invalid bbox: {value!r}")
+    return bbox
+
+
+@login_required
+@require_GET
+def get_geo(request):
+    """
+    Report locations in a bbox as a GeoJSON FeatureCollection, clustered by zoom.
+
+    Below REPORTS_GEO_CLUSTER_MAX_ZOOM nearby reports are merged into
+    Point features with ``cluster: true`` and ``point_count``; single
+    reports carry their ``uniquerowid``. The result covers the whole map
+    tiles the bbox touches, each computed and cached on its own.
+
+    Query params:
+        - bbox: min_lon,min_lat,max_lon,max_lat in WGS84 (required)
+        - zoom: Map zoom level, 0 to 22 (required)
+        - the filters of get_data
+    """
+    try:
+        try:
+            bbox = parse_bbox(request.GET.get('bbox'))
+            zoom = int(request.GET.get('zoom', ''))
+        except (ValueError, TypeError):
+            return FastJsonResponse({'error': UI_STRINGS['error_invalid_params']}, status=400)
+        if not 0 <= zoom <= MAX_ZOOM or bbox_tile_count(bbox, zoom) > settings.REPORTS_GEO_MAX_TILES:
+            return FastJsonResponse({'error': UI_STRINGS['error_invalid_params']}, status=400)
+
+        where = build_where_clause(parse_filters(request))
+        result = get_geo_features(where, bbox, zoom)
+
+        if 'error' in result:
+            return FastJsonResponse({'error': result['error']}, status=500)
+
+        emit_audit_event(request, "data.arcgis.queried", detail={
+            "layer_id": 0,
+            "record_count": result['count'],
+        })
+        return HttpResponse(result['content'], content_type='application/json')
+
+    except ValueError as exc:
+        logger.warning("Invalid filter parameter in get_geo: %s", exc)
+        return FastJsonResponse({'error': UI_STRINGS['error_filter_param']}, status=400)
+    except Exception:
+        logger.exception("Error in get_geo")
+        return FastJsonResponse({'error': UI_STRINGS['error_internal']}, status=500)
+
+
+def _epoch_ms(moment):
+    return None if moment is None else int(moment.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _intervention_record(intervention, csv_mappings):
+    """Record of /api/interventions/ with mapped values and formatted date."""
+    record = {'kind': intervention.kind, 'uniquerowid': intervention.uniquerowid}
+    for field in ('tratta', 'carreggiata', 'tipologia_appalto', 'corsia', 'tipo_intervento_pav'):
+        value = intervention[field]
+        record[field] = get_field_value(field, value, csv_mappings) if value is not None else None
+    record['pk_iniz'] = intervention.pk_iniz
+    record['pk_fin'] = intervention.pk_fin
+    record['data_rilevamento'] = format_date(intervention.data_rilevamento)
+    return record
+
+
+@login_required
+@require_GET
+def get_interventions(request):
+    """
+    Reports and pavement interventions overlapping a route kilometre range.
+
+    Answered from the pk index (services/report_pk_index.py) in
+    O(log n + k), ordered by tratta then pk_iniz, paginated like get_data.
+
+    Query params:
+        - pk_from, pk_to: Route kilometre range (at least one required)
+        - tratta: Routes (supports multiple values; all when omitted)
+        - carreggiata: Carriageways (supports multiple values)
+        - date_from, date_to: Date range of the report (YYYY-MM-DD)
+        - kind: report or pavement to return only one kind
+        - page, per_page: Pagination (default 1 and 10)
+    """
+    try:
+        try:
+            page = max(1, int(request.GET.get('page', 1)))
+            per_page = min(
+                max(1, int(request.GET.get('per_page', 10))),
+                settings.MAX_ITEMS_PER_PAGE,
+            )
+        except (ValueError, TypeError):
+            return FastJsonResponse({'error': UI_STRINGS['error_pagination_params']}, status=400)
+
+        filters = parse_filters(request)
+        pk_range = parse_pk_range(filters)
+        kind = request.GET.get('kind', '').strip() or None
+        if pk_range is None or kind not in (None, KIND_REPORT, KIND_PAVEMENT):
+            return FastJsonResponse({'error': UI_STRINGS['error_invalid_params']}, status=400)
+        lo, hi = pk_range
+        date_from, date_to = parse_date_range(filters)
+
+        result = find_interventions(
+            -math.inf if lo is None else lo,
+            math.inf if hi is None else hi,
+            tratte=filters['tratta'],
+            carreggiate=normalize_filter(request.GET.getlist('carreggiata') or request.GET.get('carreggiata')),
+            date_from=_epoch_ms(date_from),
+            date_to=_epoch_ms(date_to),
+            kind=kind,
+        )
+        if 'error' in result:
+            return FastJsonResponse({'error': result['error']}, status=500)
+
+        interventions = result['interventions']
+        offset = (page - 1) * per_page
+        page_items = interventions[offset:offset + per_page]
+        csv_mappings = get_reports_mappings() if page_items else None
+        return FastJsonResponse({
+            'data': [_intervention_record(item, csv_mappings) for item in page_items],
+            'total': len(interventions),
+            'pk_from': lo,
+            'pk_to': hi,
+        })
+
+    except ValueError as exc:
+        logger.warning("Invalid filter parameter in get_interventions: %s", exc)
+        return FastJsonResponse({'error': UI_STRINGS['error_filter_param']}, status=400)
+    except Exception:
+        logger.exception("Error in get_interventions")
+        return FastJsonResponse({'error': UI_STRINGS['error_internal']}, status=500)
 
 
 @login_required
@@ -288,77 +642,21 @@ def get_filter_options(request):
     Returns unique values for each filterable field.
     """
     try:
-        result = query_feature_layer(0)
+        filter_options = load_filter_options()
 
-        if 'error' in result:
-            return JsonResponse({'error': result['error']}, status=500)
-
-        features = result.get('features', [])
-
-        unique_values = {
-            'nome_operatore': set(),
-            'tratta': set(),
-            'tipologia_appalto': set(),
-            'data_rilevamento': [],
-        }
-
-        # Extract unique values
-        for feature in features:
-            attrs = feature.get('attributes', {})
-
-            if attrs.get('nome_operatore'):
-                unique_values['nome_operatore'].add(attrs['nome_operatore'])
-
-            if attrs.get('tratta'):
-                unique_values['tratta'].add(attrs['tratta'])
-
-            if attrs.get('tipologia_appalto'):
-                unique_values['tipologia_appalto'].add(attrs['tipologia_appalto'])
-
-            if attrs.get('data_rilevamento'):
-                unique_values['data_rilevamento'].append(attrs['data_rilevamento'])
-
-        # Build filter options
-        filter_options = {}
-
-        for field in ['nome_operatore', 'tratta', 'tipologia_appalto']:
-            values = sorted(unique_values[field])
-            filter_options[field] = [
-                {'value': v, 'label': get_field_value(field, v)}
-                for v in values
-            ]
-
-        # Process date range
-        if unique_values['data_rilevamento']:
-            converted_dates = []
-            for ts in unique_values['data_rilevamento']:
-                try:
-                    timestamp = float(ts)
-                    if timestamp > 9999999999:
-                        timestamp = timestamp / 1000
-                    converted_dates.append(timestamp)
-                except (ValueError, TypeError):
-                    pass
-
-            if converted_dates:
-                from datetime import datetime
-                min_date = datetime.fromtimestamp(min(converted_dates)).strftime('%Y-%m-%d')
-                max_date = datetime.fromtimestamp(max(converted_dates)).strftime('%Y-%m-%d')
-
-                filter_options['date_range'] = {
-                    'min': min_date,
-                    'max': max_date,
-                }
-
-        return JsonResponse(filter_options)
+        if 'error' in filter_options:
+            return FastJsonResponse({'error': filter_options['error']}, status=500)
+
+        return FastJsonResponse(filter_options)
 
     except Exception:
         logger.exception("Error in get_filter_options")
-        return JsonResponse({'error': UI_STRINGS['error_internal']}, status=500)
+        return FastJsonResponse({'error': UI_STRINGS['error_internal']}, status=500)
 
 
 @login_required
 @require_GET
+@rate_limit('image_proxy', 'IMAGE_PROXY_RATE_LIMIT')
 def image_proxy(request, layer, object_id, attachment_id):
     """
     Proxy for ArcGIS attachment images.
@@ -383,6 +681,7 @@ def image_proxy(request, layer, object_id, attachment_id):
         if content_type not in allowed_types:
             return HttpResponse(UI_STRINGS['error_content_type'], status=415)
 
+        IMAGE_PROXY_BYTES.inc(len(content))
         response = HttpResponse(content, content_type=content_type)
         response['X-Content-Type-Options'] = 'nosniff'
         response['Content-Disposition'] = 'inline'
@@ -10,6 +10,7 @@ from django.conf import settings
 from apps.reports.mappings import get_field_label
 from apps.reports.services.report_data import get_report_data
 from apps.audit.utils import emit_audit_event
+from apps.core.timing import timed
 from config.strings import UI_STRINGS
 
 
@@ -59,4 +60,5 @@ class ReportDetailView(View):
             })
 
         emit_audit_event(request, "data.report.viewed", detail={"report_id": report_id})
-        return render(request, self.template_name, data)
+        with timed('render'):
+            return render(request, self.template_name, data)
@@ -2,7 +2,7 @@
 
 import io
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import as_completed
 
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
@@ -18,6 +18,9 @@ from apps.reports.services.image_utils import (
     local_image_to_base64_uri,
 )
 from apps.audit.utils import emit_audit_event
+from apps.core.metrics import PDF_RENDER_SECONDS
+from apps.core.ratelimit import rate_limit
+from apps.core.timing import ContextThreadPoolExecutor, timed
 from config.strings import UI_STRINGS
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,7 @@ logger = logging.getLogger(__name__)
 
 @login_required
 @require_GET
+@rate_limit('pdf_export', 'PDF_EXPORT_RATE_LIMIT')
 def export_pdf(request):
     """Generate and return a PDF for a report."""
     report_id = request.GET.get('rowid')
@@ -61,7 +65,7 @@ def export_pdf(request):
     # Photos from layer 3 — fetch in parallel
     photos_base64 = []
     if data['photos']:
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        with ContextThreadPoolExecutor(max_workers=5, name='pdf_photos') as executor:
             future_to_photo = {
                 executor.submit(
                     fetch_attachment_as_base64,
@@ -105,16 +109,18 @@ def export_pdf(request):
     }
 
     # Render HTML and generate PDF
-    html_string = render_to_string('reports/report_pdf.html', context)
+    with timed('render'):
+        html_string = render_to_string('reports/report_pdf.html', context)
 
     response = HttpResponse(content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename="Verbale_{report_id}.pdf"'
 
-    pdf_status = pisa.CreatePDF(
-        io.BytesIO(html_string.encode('utf-8')),
-        dest=response,
-        encoding='utf-8',
-    )
+    with timed('pdf'), PDF_RENDER_SECONDS.time():
+        pdf_status = pisa.CreatePDF(
+            io.BytesIO(html_string.encode('utf-8')),
+            dest=response,
+            encoding='utf-8',
+        )
 
     # If PDF generation failed, pisa.CreatePDF returns a non-zero error code
     if isinstance(pdf_status, int) and pdf_status != 0:
@@ -0,0 +1,50 @@
+"""Vector tile view for the report map."""
+
+import logging
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from apps.core.mvt import MVT_CONTENT_TYPE
+from apps.reports.services.report_geo import MAX_ZOOM
+from apps.reports.services.report_tiles import get_tile
+from apps.reports.views.api import build_where_clause, parse_filters
+from config.strings import UI_STRINGS
+
+logger = logging.getLogger(__name__)
+
+
+@login_required
+@require_GET
+def vector_tile(request, z, x, y):
+    """
+    Report points of tile z/x/y as a Mapbox Vector Tile (layer ``reports``).
+
+    Accepts the filters of /api/data/ as query params. Responds 304 when
+    If-None-Match holds the tile's current ETag.
+    """
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < 1 << z and 0 <= y < 1 << z):
+        return HttpResponse(UI_STRINGS['error_invalid_params'], status=400)
+
+    try:
+        where = build_where_clause(parse_filters(request))
+        result = get_tile(where, z, x, y)
+    except ValueError as exc:
+        logger.warning("Invalid filter parameter in vector_tile: %s", exc)
+        return HttpResponse(UI_STRINGS['error_filter_param'], status=400)
+    except Exception:
+        logger.exception("Error in vector_tile")
+        return HttpResponse(UI_STRINGS['error_internal'], status=500)
+
+    if 'error' in result:
+        return HttpResponse(UI_STRINGS['error_internal'], status=500)
+
+    response = get_conditional_response(request, etag=result['etag'])
+    if response is None:
+        response = HttpResponse(result['content'], content_type=MVT_CONTENT_TYPE)
+    response['ETag'] = result['etag']
+    patch_cache_control(response, private=True, max_age=settings.REPORTS_TILE_CACHE_TIMEOUT)
+    return response
@@ -9,10 +9,11 @@ following the pattern in apps/reports/views/api.py.
 """
 
 import logging
-from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_GET
 
+from apps.core.fastjson import FastJsonResponse
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,7 +25,7 @@ def get_data(request):
 
     TODO: Replace with real ArcGIS query (see module docstring).
     """
-    return JsonResponse({'data': [], 'total': 0})
+    return FastJsonResponse({'data': [], 'total': 0})
 
 
 @login_required
@@ -35,4 +36,4 @@ def get_filter_options(request):
 
     TODO: Replace with real ArcGIS query (see module docstring).
     """
-    return JsonResponse({})
+    return FastJsonResponse({})
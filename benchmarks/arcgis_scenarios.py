@@ -0,0 +1,207 @@
+"""
+Benchmark: end-to-end report scenarios against the fake ArcGIS server.
+
+Starts benchmarks.fake_arcgis in a subprocess, points the ArcGIS settings at
+it and replays the main user flows through the Django test client with a
+logged-in superuser:
+
+- list paging      GET /api/data/?page=k&per_page=25
+- list cursor      GET /api/data/?cursor=<next_cursor>&per_page=25 (walks forward)
+- filter options   GET /api/filters/
+- detail           GET /reports/detail/?id=<guid>
+- image proxy      GET /api/image/3/<oid>/<aid>/
+- PDF export       GET /reports/pdf/?rowid=<guid>
+- CSV export       GET /api/export/?format=csv (latency is time to first byte)
+
+Each scenario runs ``cold`` (cache cleared before every request: token, CSV
+mappings and list rows are fetched again) and ``warm`` (cache kept). The
+table reports p50/p95 latency, the mean number of upstream ArcGIS calls per
+request (from the request's log line, which unlike the Server-Timing header
+also counts the calls made while a streamed export is sent) and the process's
+peak RSS after the scenario. Peak RSS is a high-water mark, so scenarios run
+from the lightest to the heaviest. Rate limits are disabled for the run; runs against a
+throw-away test database created from the configured DATABASES.
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.arcgis_scenarios
+    SECRET_KEY=bench uv run python -m benchmarks.arcgis_scenarios \\
+        --features 500000 --photos 10 --latency-ms 40 --iterations 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+from benchmarks.fake_arcgis import free_port, photo_object_id, report_guid, spawn
+
+PORT = free_port()
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+os.environ["ARCGIS_PORTAL_TOKEN_URL"] = f"{BASE_URL}/portal/sharing/rest/generateToken"
+os.environ["ARCGIS_PORTAL_BASE_URL"] = f"{BASE_URL}/portal"
+os.environ["ARCGIS_FEATURE_SERVICE_URL"] = f"{BASE_URL}/server/rest/services/bench/FeatureServer"
+os.environ["PDF_EXPORT_RATE_LIMIT"] = ""
+os.environ["IMAGE_PROXY_RATE_LIMIT"] = ""
+os.environ["REPORTS_EXPORT_RATE_LIMIT"] = ""
+os.environ["SERVER_TIMING_HEADER"] = "True"
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: E402
+
+
+PER_PAGE = 25
+
+
+class _UpstreamCalls(logging.Handler):
+    """Collect the upstream call count of every request logged by ServerTimingMiddleware."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.calls = []
+
+    def emit(self, record):
+        self.calls.append(record.detail["upstream_calls"])
+
+
+def _scenarios(features, photos, rnd):
+    # Each scenario maps (iteration, previous response) to the next path.
+    def list_paging(i, last):
+        return f"/api/data/?page={i % 20 + 1}&per_page={PER_PAGE}"
+
+    def list_cursor(i, last):
+        cursor = json.loads(last.content)["next_cursor"] if last is not None else ""
+        return f"/api/data/?cursor={cursor or ''}&per_page={PER_PAGE}"
+
+    def filter_options(i, last):
+        return "/api/filters/"
+
+    def detail(i, last):
+        return f"/reports/detail/?id={report_guid(rnd.randrange(features))}"
+
+    def image_proxy(i, last):
+        oid = photo_object_id(rnd.randrange(features), rnd.randrange(photos), photos)
+        return f"/api/image/3/{oid}/{oid}/"
+
+    def pdf_export(i, last):
+        return f"/reports/pdf/?rowid={report_guid(rnd.randrange(features))}"
+
+    def csv_export(i, last):
+        return "/api/export/?format=csv"
+
+    scenarios = {
+        "filter options": filter_options,
+        "list paging": list_paging,
+        "list cursor": list_cursor,
+        "detail": detail,
+        "image proxy": image_proxy,
+        "pdf export": pdf_export,
+        "csv export": csv_export,
+    }
+    if not photos:
+        del scenarios["image proxy"]
+    return scenarios
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(0, -(-len(ordered) * pct // 100) - 1)]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _run(client, path_for, iterations, cold, upstream):
+    latencies, calls = [], []
+    cache.clear()
+    last = None
+    if not cold:
+        client.get(path_for(0, None))
+    for i in range(iterations):
+        if cold:
+            cache.clear()
+        path = path_for(i, last)
+        start = time.perf_counter()
+        response = client.get(path)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        last = response
+        if hasattr(response, "streaming_content"):
+            b"".join(response.streaming_content)
+        calls.append(upstream.calls[-1])
+    return latencies, calls
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end report scenarios against a fake ArcGIS server.")
+    parser.add_argument("--features", type=int, default=10_000, help="reports on layer 0")
+    parser.add_argument("--photos", type=int, default=6, help="photos per report")
+    parser.add_argument("--latency-ms", type=float, default=20, help="latency added to every upstream call")
+    parser.add_argument("--max-record-count", type=int, default=0, help="server page size cap (0 = none)")
+    parser.add_argument("--iterations", type=int, default=10, help="requests per scenario and mode")
+    parser.add_argument("--only", action="append", help="run only this scenario (repeatable)")
+    args = parser.parse_args(argv)
+
+    server = spawn(PORT, args.features, args.photos, args.latency_ms, args.max_record_count)
+    try:
+        _run_scenarios(args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _run_scenarios(args):
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user = User.objects.create_superuser("arcgis-bench", password="bench")
+        client = Client()
+        client.force_login(user, backend="apps.accounts.auth.SuperuserOnlyModelBackend")
+        scenarios = _scenarios(args.features, args.photos, random.Random(42))
+        upstream = _UpstreamCalls()
+        timing_logger = logging.getLogger("apps.core.timing")
+        timing_logger.setLevel(logging.INFO)
+        timing_logger.propagate = False
+        timing_logger.addHandler(upstream)
+
+        print(f"{args.iterations} requests per row, {args.latency_ms:g} ms upstream latency")
+        print(f"{'scenario':<16}{'mode':<6}{'p50 ms':>9}{'p95 ms':>9}{'calls/req':>11}{'peak RSS MB':>13}")
+        for name, path_for in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            for mode in ("cold", "warm"):
+                latencies, calls = _run(
+                    client, path_for, args.iterations, cold=mode == "cold", upstream=upstream,
+                )
+                print(
+                    f"{name:<16}{mode:<6}"
+                    f"{_percentile(latencies, 50) * 1000:>9.1f}"
+                    f"{_percentile(latencies, 95) * 1000:>9.1f}"
+                    f"{statistics.mean(calls):>11.1f}"
+                    f"{_peak_rss_mb():>13.1f}"
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: cost of emit_audit_event on the calling (request) thread.
+
+Compares the audit logger writing straight to the rotating file handler
+(JSON formatting and file I/O inline) with the queued setup from LOGGING,
+where the caller only enqueues the record. Both write to a temporary file.
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.audit_logging
+"""
+
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+from types import SimpleNamespace
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+import django  # noqa: E402
+
+django.setup()
+
+from apps.audit.formatters import NIS2JsonFormatter  # noqa: E402
+from apps.audit.handlers import BoundedQueueHandler  # noqa: E402
+from apps.audit.utils import audit_logger, emit_audit_event  # noqa: E402
+from config.settings import WindowsSafeTimedRotatingFileHandler  # noqa: E402
+
+EVENTS = 20000
+
+
+def _request():
+    return SimpleNamespace(
+        user=SimpleNamespace(is_authenticated=True, username="bench.user"),
+        META={"REMOTE_ADDR": "10.0.0.1"},
+        session=SimpleNamespace(session_key="s" * 32),
+        path="/api/data/",
+        method="GET",
+    )
+
+
+def _file_handler(path):
+    handler = WindowsSafeTimedRotatingFileHandler(path, when="midnight", encoding="utf-8")
+    handler.setFormatter(NIS2JsonFormatter())
+    return handler
+
+
+def _time_events(handler):
+    audit_logger.handlers = [handler]
+    request = _request()
+    detail = {"record_count": 25, "filters": {"tratta": "A7"}}
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        emit_audit_event(request, "data.arcgis.queried", detail)
+    return (time.perf_counter() - start) / EVENTS * 1e6
+
+
+def main():
+    saved = audit_logger.handlers
+    with tempfile.TemporaryDirectory() as tmp:
+        direct = _file_handler(os.path.join(tmp, "direct.log"))
+        sync_us = _time_events(direct)
+        direct.close()
+
+        target = _file_handler(os.path.join(tmp, "queued.log"))
+        queued = BoundedQueueHandler(queue.Queue(EVENTS), policy="block")
+        queued.listener = QueueListener(queued.queue, target, respect_handler_level=True)
+        queued.listener.start()
+        queued_us = _time_events(queued)
+        drain_start = time.perf_counter()
+        queued.listener.stop()
+        drain_ms = (time.perf_counter() - drain_start) * 1e3
+        target.close()
+    audit_logger.handlers = saved
+
+    print(f"{EVENTS} audit events, µs per emit_audit_event on the calling thread")
+    print(f"{'direct file handler':<24}{sync_us:>10.1f}")
+    print(f"{'queue handler':<24}{queued_us:>10.1f}  (listener drained the rest in {drain_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
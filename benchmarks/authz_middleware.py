@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: ServiceAccessMiddleware overhead per request.
+
+Compares URL resolution as it was done before (``django.urls.resolve`` on
+every request) with the memoised ``resolve_app_label``, then times a full
+middleware pass on the high-volume routes. The image proxy and vector tile
+rows use a different path (photo or tile) on every call, as real traffic
+does; the memo is keyed on the route, not the path. The ACL check itself is stubbed:
+it is a couple of cache reads (see apps/authorization/acl.py) and depends on
+the cache backend, not on the middleware.
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.authz_middleware
+"""
+
+import itertools
+import os
+import timeit
+from types import SimpleNamespace
+from unittest.mock import patch
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.http import HttpResponse  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.urls import resolve  # noqa: E402
+
+from apps.authorization.middleware import ServiceAccessMiddleware, resolve_app_label  # noqa: E402
+
+# label -> path factory; the counter gives each call of a row its own path
+_counter = itertools.count()
+PATHS = {
+    "/api/data/": lambda: "/api/data/",
+    "/api/image/<distinct>/": lambda: f"/api/image/3/{next(_counter)}/7/",
+    "/tiles/<distinct>.mvt": lambda: f"/tiles/14/{next(_counter) % 16384}/{next(_counter) % 16384}.mvt",
+    "/reports/": lambda: "/reports/",
+    "/reports/detail/": lambda: "/reports/detail/",
+}
+ITERATIONS = 20000
+
+
+def _legacy_resolve(path):
+    match = resolve(path)
+    return match.app_name or match.func.__module__.split(".")[0]
+
+
+def _per_call_us(func):
+    seconds = timeit.timeit(func, number=ITERATIONS)
+    return seconds / ITERATIONS * 1e6
+
+
+def main():
+    factory = RequestFactory()
+    user = SimpleNamespace(is_authenticated=True, is_superuser=False)
+    middleware = ServiceAccessMiddleware(lambda request: HttpResponse())
+
+    handler_only = _per_call_us(lambda: HttpResponse())
+
+    print(f"{'path':<26}{'resolve()':>12}{'memoised':>12}{'mw overhead':>14}  (µs/request)")
+    with patch("apps.authorization.middleware.service_access", new=lambda request, app_label: True):
+        for label, make_path in PATHS.items():
+            requests = (factory.get(make_path()) for _ in itertools.repeat(None))
+
+            def request_with_user():
+                request = next(requests)
+                request.user = user
+                return request
+
+            building = _per_call_us(request_with_user)
+            before = _per_call_us(lambda: _legacy_resolve(make_path()))
+            after = _per_call_us(lambda: resolve_app_label(make_path()))
+            overhead = _per_call_us(lambda: middleware(request_with_user())) - handler_only - building
+            print(f"{label:<26}{before:>12.2f}{after:>12.2f}{overhead:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,505 @@
+"""
+Stand-in ArcGIS Enterprise server for the offline benchmarks.
+
+Serves the endpoints the dashboard calls from synthetic data of configurable
+size, so performance can be measured without a live Portal/Server:
+
+- POST /portal/sharing/rest/generateToken
+- GET  /portal/sharing/rest/content/items/<id>        (item metadata)
+- GET  /portal/sharing/rest/content/items/<id>/data   (choice-list CSV)
+- GET  /server/rest/services/bench/FeatureServer/<layer>/query
+- GET  /server/rest/services/bench/FeatureServer/<layer>/<oid>/attachments
+- GET  /server/rest/services/bench/FeatureServer/<layer>/<oid>/attachments/<id>
+
+Layer 0 holds the reports (one signature attachment each); layers 1 and 2
+the pavement and company repeats; layer 3 ``--photos`` photo records per
+report with one JPEG attachment each. Report N has objectid N + 1 and the
+uniquerowid returned by ``report_guid(N)``; its photos have objectids
+``photo_object_id(N, j)``. Values are drawn from FIELD_VALUES with a fixed
+seed, so runs are repeatable.
+
+The query endpoint understands the WHERE clauses the dashboard builds
+(``1=1``, ``field = '..'``, ``field IN (..)``, ``data_rilevamento >=/<
+TIMESTAMP '..'`` joined by AND) plus outFields, returnGeometry,
+orderByFields, resultOffset, resultRecordCount and returnCountOnly.
+``--max-record-count`` caps page sizes like a hosted service does (2000);
+the default 0 returns every match. Every response is delayed by
+``--latency-ms``.
+
+Usage (stand-alone; benchmarks.arcgis_scenarios starts it itself):
+    uv run python -m benchmarks.fake_arcgis --features 100000 --photos 6 --latency-ms 40
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SERVICE_PATH = "/server/rest/services/bench/FeatureServer"
+PORTAL_PATH = "/portal"
+
+# 2024-01-01 .. 2026-01-01, epoch milliseconds
+DATE_START_MS = 1704067200000
+DATE_SPAN_MS = 2 * 365 * 24 * 3600 * 1000
+
+REPORT_FIELDS = ("nome_operatore", "tratta", "tipologia_appalto")
+
+
+def report_guid(index):
+    """uniquerowid of report index (a valid braced GUID that encodes it)."""
+    return "{%08X-0000-4000-8000-%012X}" % (index, index)
+
+
+def report_index(guid):
+    """Inverse of report_guid; None for a GUID the dataset did not issue."""
+    match = re.fullmatch(r"\{([0-9A-F]{8})-0000-4000-8000-([0-9A-F]{12})\}", guid.strip().upper())
+    if not match or int(match.group(1), 16) != int(match.group(2), 16):
+        return None
+    return int(match.group(1), 16)
+
+
+def photo_object_id(index, photo, photos_per_report):
+    return index * photos_per_report + photo + 1
+
+
+def _jpeg(width, height, seed):
+    from PIL import Image
+
+    rnd = random.Random(seed)
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    overlay = Image.new("RGB", (width, height), tuple(rnd.randrange(256) for _ in range(3)))
+    buf = io.BytesIO()
+    Image.blend(image, overlay, 0.6).save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _png(width, height):
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (width, height), "white")
+    ImageDraw.Draw(image).line([(10, height - 20), (width - 10, 20)], fill="black", width=4)
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class SyntheticDataset:
+    """Column-stored synthetic reports; rows are materialised per response."""
+
+    def __init__(self, features, photos_per_report, field_values, seed=42):
+        rnd = random.Random(seed)
+        self.features = features
+        self.photos_per_report = photos_per_report
+        self.choices = {f: sorted(field_values.get(f, {}) or {f"{f}_{n}": "" for n in range(5)})
+                        for f in REPORT_FIELDS}
+        self.columns = {
+            f: array("H", (rnd.randrange(len(self.choices[f])) for _ in range(features)))
+            for f in REPORT_FIELDS
+        }
+        self.dates = array("q", (DATE_START_MS + rnd.randrange(DATE_SPAN_MS) for _ in range(features)))
+        self.field_values = field_values
+
+    def value(self, field, index):
+        return self.choices[field][self.columns[field][index]]
+
+    def report(self, index, geometry=True):
+        attrs = {
+            "objectid": index + 1,
+            "globalid": "{%08X-0000-4000-9000-%012X}" % (index, index),
+            "uniquerowid": report_guid(index),
+            "nome_operatore": self.value("nome_operatore", index),
+            "tratta": self.value("tratta", index),
+            "tipologia_appalto": self.value("tipologia_appalto", index),
+            "data_rilevamento": self.dates[index],
+            "ora_rilevamento": "%02d:%02d" % (7 + index % 10, index % 60),
+            "presenza_dl": "si",
+            "nome_dl": self._pick("nome_dl", index),
+            "presenza_cse": "no",
+            "nome_cse": self._pick("nome_cse", index),
+            "carreggiata": "nord" if index % 2 else "sud",
+            "pk_iniz": round(index % 120 + 0.25, 3),
+            "pk_fin": round(index % 120 + 1.5, 3),
+            "num_imprese": 1,
+            "note": f"Verbale di benchmark n. {index}",
+        }
+        feature = {"attributes": attrs}
+        if geometry:
+            feature["geometry"] = {"x": 8.9 + (index % 1000) / 5000, "y": 45.2 + (index % 700) / 5000}
+        return feature
+
+    def _pick(self, field, index):
+        values = sorted(self.field_values.get(field, {})) or [""]
+        return values[index % len(values)]
+
+    def children(self, layer, index):
+        guid = report_guid(index)
+        if layer == 1:
+            return [{"attributes": {
+                "objectid": index * 2 + n + 1,
+                "parentrowid": guid,
+                "corsia": "marcia" if n else "sorpasso",
+                "tipo_intervento_pav": self._pick("tipo_intervento_pav", index + n),
+                "pk_iniz_pav": round(index % 120 + n, 3),
+                "pk_fin_pav": round(index % 120 + n + 0.5, 3),
+            }} for n in range(2)]
+        if layer == 2:
+            return [{"attributes": {
+                "objectid": index + 1,
+                "parentrowid": guid,
+                "nome_impresa": self._pick("nome_impresa", index),
+                "rapp_contrattuale": "appaltatore",
+                "n_uomini": 4,
+                "n_mezzi": 2,
+            }}]
+        if layer == 3:
+            return [{"attributes": {
+                "objectid": photo_object_id(index, n, self.photos_per_report),
+                "parentrowid": guid,
+            }} for n in range(self.photos_per_report)]
+        return []
+
+    # -- WHERE clause evaluation ------------------------------------------------
+
+    _EQ_RE = re.compile(r"^(\w+)\s*=\s*'([^']*)'$")
+    _IN_RE = re.compile(r"^(\w+)\s+IN\s*\((.*)\)$", re.IGNORECASE)
+    _TS_RE = re.compile(r"^data_rilevamento\s*(>=|<|>|<=)\s*(TIMESTAMP\s*'[^']+')$", re.IGNORECASE)
+    _NOT_NULL_RE = re.compile(r"^\w+\s+IS\s+NOT\s+NULL$", re.IGNORECASE)
+    # Every synthetic report has all its fields: IS NULL matches nothing
+    _NULL_RE = re.compile(r"^\w+\s+IS\s+NULL$", re.IGNORECASE)
+    _OBJECTID_RE = re.compile(r"^objectid\s*([<>])\s*(\d+)$", re.IGNORECASE)
+    # Keyset predicate of the cursor pagination: (f < v OR (f = v AND objectid < id))
+    _KEYSET_RE = re.compile(
+        r"^\((\w+) ([<>]) (.+?) OR \(\1 = \3 AND objectid \2 (\d+)\)\)$", re.IGNORECASE
+    )
+
+    def matching_reports(self, where):
+        """Indexes of the reports matching a dashboard WHERE clause."""
+        where = (where or "1=1").strip()
+        if where == "1=1":
+            return range(self.features)
+
+        conditions = self._split_and(where)
+        for condition in conditions:
+            match = self._EQ_RE.match(condition)
+            if match and match.group(1) == "uniquerowid":
+                index = report_index(match.group(2))
+                return [index] if index is not None and index < self.features else []
+
+        predicates = [p for c in conditions for p in self._predicates(c)]
+        return [i for i in range(self.features) if all(p(i) for p in predicates)]
+
+    @staticmethod
+    def _split_and(where):
+        """Operands of the top-level ANDs of a WHERE clause."""
+        parts, depth, quoted, start = [], 0, False, 0
+        for pos, char in enumerate(where):
+            if char == "'":
+                quoted = not quoted
+            elif not quoted and char in "()":
+                depth += 1 if char == "(" else -1
+            elif not quoted and depth == 0 and where[pos:pos + 5].upper() == " AND ":
+                parts.append(where[start:pos])
+                start = pos + 5
+        parts.append(where[start:])
+        return [part.strip() for part in parts if part.strip()]
+
+    def _predicates(self, condition):
+        if condition == "1=1" or self._NOT_NULL_RE.match(condition):
+            return []
+        if self._NULL_RE.match(condition):
+            return [lambda i: False]
+        match = self._OBJECTID_RE.match(condition)
+        if match:
+            bound = int(match.group(2))
+            return [(lambda i: i + 1 < bound) if match.group(1) == "<" else (lambda i: i + 1 > bound)]
+        match = self._KEYSET_RE.match(condition)
+        if match:
+            return [self._keyset_predicate(match.group(1), match.group(2), match.group(3), int(match.group(4)))]
+        if condition.startswith("(") and condition.endswith(")"):
+            return [p for c in self._split_and(condition[1:-1]) for p in self._predicates(c)]
+        match = self._EQ_RE.match(condition)
+        if match:
+            return [self._in_predicate(match.group(1), [match.group(2)])]
+        match = self._IN_RE.match(condition)
+        if match:
+            return [self._in_predicate(match.group(1), re.findall(r"'([^']*)'", match.group(2)))]
+        match = self._TS_RE.match(condition)
+        if match:
+            return [self._date_predicate(match.group(1), self._literal(match.group(2)))]
+        raise ValueError(f"Unsupported WHERE condition: {condition}")
+
+    @staticmethod
+    def _literal(text):
+        match = re.fullmatch(r"TIMESTAMP\s*'([^']+)'", text, flags=re.IGNORECASE)
+        if match:
+            value = match.group(1)
+            fmt = "%Y-%m-%d %H:%M:%S.%f" if "." in value else "%Y-%m-%d %H:%M:%S"
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp() * 1000
+        match = re.fullmatch(r"'((?:[^']|'')*)'", text)
+        if match:
+            return match.group(1).replace("''", "'")
+        return float(text)
+
+    def _keyset_predicate(self, field, op, literal, object_id):
+        bound = self._literal(literal)
+        key = self.sort_key(field)
+        after = (lambda a, b: a < b) if op == "<" else (lambda a, b: a > b)
+        return lambda i: after(key(i), bound) or (key(i) == bound and after(i + 1, object_id))
+
+    def sort_key(self, field):
+        if field == "data_rilevamento":
+            return self.dates.__getitem__
+        if field in REPORT_FIELDS:
+            return lambda i: self.value(field, i)
+        if field == "objectid":
+            return lambda i: i + 1
+        raise ValueError(f"Unsupported field: {field}")
+
+    def _in_predicate(self, field, values):
+        if field not in self.columns:
+            raise ValueError(f"Unsupported WHERE field: {field}")
+        codes = {self.choices[field].index(v) for v in values if v in self.choices[field]}
+        column = self.columns[field]
+        return lambda i: column[i] in codes
+
+    def _date_predicate(self, op, bound):
+        dates = self.dates
+        return {
+            ">=": lambda i: dates[i] >= bound,
+            ">": lambda i: dates[i] > bound,
+            "<": lambda i: dates[i] < bound,
+            "<=": lambda i: dates[i] <= bound,
+        }[op]
+
+
+class FakeArcGISHandler(BaseHTTPRequestHandler):
+    server_version = "FakeArcGIS/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def dataset(self):
+        return self.server.dataset
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self._delay()
+        if urlsplit(self.path).path == f"{PORTAL_PATH}/sharing/rest/generateToken":
+            expires = int(time.time() * 1000) + 3600 * 1000
+            return self._json({"token": "bench-token", "expires": expires, "ssl": False})
+        self._json({"error": {"code": 404, "message": "Not found"}}, status=404)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self._delay()
+        try:
+            if url.path.startswith(f"{PORTAL_PATH}/sharing/rest/content/items/"):
+                return self._portal_item(url.path, params)
+            if url.path.startswith(f"{SERVICE_PATH}/"):
+                return self._feature_service(url.path[len(SERVICE_PATH) + 1:].split("/"), params)
+        except ValueError as exc:
+            return self._json({"error": {"code": 400, "message": str(exc)}})
+        self._json({"error": {"code": 404, "message": "Not found"}}, status=404)
+
+    def _delay(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def _portal_item(self, path, params):
+        item_id, _, rest = path.rsplit("/items/", 1)[1].partition("/")
+        field = self.server.csv_items.get(item_id)
+        if field is None:
+            return self._json({"error": {"code": 400, "message": "Item does not exist"}})
+        if rest == "data":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(["list_name", "name", "label"])
+            for name, label in self.dataset.field_values.get(field, {}).items():
+                writer.writerow([field, name, label])
+            return self._send(buf.getvalue().encode("utf-8"), "text/csv")
+        return self._json({"id": item_id, "type": "CSV", "modified": self.server.started_ms})
+
+    def _feature_service(self, parts, params):
+        layer = int(parts[0])
+        if len(parts) == 2 and parts[1] == "query":
+            return self._json(self._query(layer, params))
+        if len(parts) == 3 and parts[2] == "attachments":
+            return self._json({"attachmentInfos": self._attachment_infos(layer, int(parts[1]))})
+        if len(parts) == 4 and parts[2] == "attachments":
+            if int(parts[3]) not in {a["id"] for a in self._attachment_infos(layer, int(parts[1]))}:
+                return self._send(b"Not found", "text/plain", status=404)
+            if layer == 0:
+                return self._send(self.server.signature, "image/png")
+            return self._send(self.server.photo, "image/jpeg")
+        raise ValueError("Unsupported feature service request")
+
+    def _query(self, layer, params):
+        where = params.get("where", "1=1")
+        if layer == 0:
+            indexes = self.dataset.matching_reports(where)
+        else:
+            match = re.fullmatch(r"parentrowid\s*=\s*'([^']*)'", where.strip())
+            if not match:
+                raise ValueError(f"Unsupported WHERE clause for layer {layer}: {where}")
+            index = report_index(match.group(1))
+            indexes = [index] if index is not None and index < self.dataset.features else []
+
+        if params.get("returnCountOnly", "").lower() == "true":
+            if layer == 0:
+                return {"count": len(indexes)}
+            return {"count": sum(len(self.dataset.children(layer, i)) for i in indexes)}
+
+        order = params.get("orderByFields", "").strip()
+        if layer == 0 and order:
+            # Stable sorts from the last key to the first give the multi-key order
+            indexes = list(indexes)
+            for term in reversed(order.split(",")):
+                field, _, direction = term.strip().partition(" ")
+                indexes.sort(key=self.dataset.sort_key(field), reverse=direction.strip().upper() == "DESC")
+
+        offset = int(params.get("resultOffset") or 0)
+        limit = int(params.get("resultRecordCount") or 0) or None
+        if self.server.max_record_count:
+            limit = min(limit or self.server.max_record_count, self.server.max_record_count)
+        page = indexes[offset:offset + limit] if limit else indexes[offset:]
+        exceeded = limit is not None and offset + len(page) < len(indexes)
+
+        geometry = params.get("returnGeometry", "true").lower() != "false"
+        if layer == 0:
+            features = [self.dataset.report(i, geometry) for i in page]
+        else:
+            features = [f for i in page for f in self.dataset.children(layer, i)]
+        fields = params.get("outFields", "*")
+        if fields.strip() != "*":
+            wanted = {f.strip() for f in fields.split(",")}
+            for feature in features:
+                feature["attributes"] = {k: v for k, v in feature["attributes"].items() if k in wanted}
+
+        result = {"objectIdFieldName": "objectid", "features": features}
+        if exceeded:
+            result["exceededTransferLimit"] = True
+        return result
+
+    def _attachment_infos(self, layer, object_id):
+        if layer == 0 and 1 <= object_id <= self.dataset.features:
+            return [{"id": 1, "name": "firma_op.png", "contentType": "image/png",
+                     "size": len(self.server.signature)}]
+        photos = self.dataset.features * self.dataset.photos_per_report
+        if layer == 3 and 1 <= object_id <= photos:
+            return [{"id": object_id, "name": f"foto_{object_id}.jpg", "contentType": "image/jpeg",
+                     "size": len(self.server.photo)}]
+        return []
+
+    def _json(self, payload, status=200):
+        self._send(json.dumps(payload, separators=(",", ":")).encode("utf-8"), "application/json", status)
+
+    def _send(self, body, content_type, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(features, photos, latency_ms=0, max_record_count=0, photo_width=1600,
+                host="127.0.0.1", port=0):
+    """Build the dataset and a ThreadingHTTPServer serving it (not started)."""
+    from django.conf import settings
+
+    from apps.reports.mappings import FIELD_VALUES
+
+    server = ThreadingHTTPServer((host, port), FakeArcGISHandler)
+    server.daemon_threads = True
+    server.dataset = SyntheticDataset(features, photos, FIELD_VALUES)
+    server.latency = latency_ms / 1000
+    server.max_record_count = max_record_count
+    server.started_ms = int(time.time() * 1000)
+    server.csv_items = {
+        item_id: field
+        for mapping in settings.ARCGIS_FIELD_MAPPINGS.values()
+        for field, item_id in mapping.items()
+    }
+    server.photo = _jpeg(photo_width, photo_width * 3 // 4, seed=1)
+    server.signature = _png(400, 150)
+    return server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn(port, features, photos, latency_ms=0, max_record_count=0):
+    """Start the server in a subprocess and wait until it listens; returns the Popen."""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_arcgis",
+            "--port", str(port),
+            "--features", str(features),
+            "--photos", str(photos),
+            "--latency-ms", str(latency_ms),
+            "--max-record-count", str(max_record_count),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    ready = process.stdout.readline()
+    if not ready:
+        process.wait()
+        raise RuntimeError("Fake ArcGIS server did not start")
+    print(ready.strip())
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--features", type=int, default=10_000)
+    parser.add_argument("--photos", type=int, default=6, help="photos per report")
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--max-record-count", type=int, default=0)
+    parser.add_argument("--photo-width", type=int, default=1600)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+    import django
+
+    django.setup()
+
+    server = make_server(
+        args.features, args.photos, args.latency_ms, args.max_record_count,
+        args.photo_width, args.host, args.port,
+    )
+    host, port = server.server_address[:2]
+    print(f"Fake ArcGIS listening on http://{host}:{port} "
+          f"({args.features} reports, {args.photos} photos each)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
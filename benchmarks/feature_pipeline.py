@@ -0,0 +1,116 @@
+"""
+Benchmark: memory of a full-layer pass, eager lists vs lazy generator stages.
+
+Starts benchmarks.fake_arcgis with a 100k-report layer 0 capped at
+``--max-record-count`` rows per query, so every pass goes through the paged
+``iter_feature_layer`` stream, and compares:
+
+- process features   every feature through the display mapping
+                     (process_features on a list vs iter_processed_features
+                     on the stream)
+- list page          one /api/data/ page out of the whole list (records for
+                     every row then sort and slice, as get_data used to, vs
+                     sort_rows on the raw rows and records for the page only)
+
+For each pipeline the table reports the wall time and the peak memory
+traced by tracemalloc while it runs. The CSV mappings and the ArcGIS token
+are loaded before measuring. No database is needed.
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.feature_pipeline
+    SECRET_KEY=bench uv run python -m benchmarks.feature_pipeline --features 500000
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from itertools import islice
+
+from benchmarks.fake_arcgis import free_port, spawn
+
+PORT = free_port()
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+os.environ["ARCGIS_PORTAL_TOKEN_URL"] = f"{BASE_URL}/portal/sharing/rest/generateToken"
+os.environ["ARCGIS_PORTAL_BASE_URL"] = f"{BASE_URL}/portal"
+os.environ["ARCGIS_FEATURE_SERVICE_URL"] = f"{BASE_URL}/server/rest/services/bench/FeatureServer"
+
+import django  # noqa: E402
+
+django.setup()
+
+from apps.core.services.arcgis import iter_feature_layer  # noqa: E402
+from apps.core.services.csv_mapping import get_csv_mappings  # noqa: E402
+from apps.reports.mappings import iter_processed_features, process_features  # noqa: E402
+from apps.reports.services.report_list import LIST_FIELDS  # noqa: E402
+from apps.reports.views.api import _list_record, sort_records, sort_rows  # noqa: E402
+
+PER_PAGE = 25
+
+
+def _features():
+    return iter_feature_layer(0, returnGeometry="false")
+
+
+def process_eager():
+    features = list(_features())
+    return len(process_features(features, "main"))
+
+
+def process_lazy():
+    return sum(1 for _ in iter_processed_features(_features(), "main"))
+
+
+def _rows():
+    return [f["attributes"] for f in iter_feature_layer(0, out_fields=",".join(LIST_FIELDS))]
+
+
+def page_eager(rows):
+    records = [_list_record(attrs) for attrs in rows]
+    return sort_records(records, "tratta", "asc")[:PER_PAGE]
+
+
+def page_lazy(rows):
+    return [_list_record(attrs) for attrs in islice(sort_rows(rows, "tratta", "asc"), PER_PAGE)]
+
+
+def _measure(func, *args):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory of eager vs lazy feature pipelines.")
+    parser.add_argument("--features", type=int, default=100_000, help="reports on layer 0")
+    parser.add_argument("--max-record-count", type=int, default=2000, help="server page size cap")
+    args = parser.parse_args(argv)
+
+    server = spawn(PORT, args.features, photos=0, max_record_count=args.max_record_count)
+    try:
+        get_csv_mappings(app="reports")
+        rows = _rows()
+        print(f"{args.features} features, pages of {args.max_record_count}")
+        print(f"{'pipeline':<20}{'mode':<7}{'time s':>9}{'peak MB':>10}")
+        for name, eager, lazy, call_args in (
+            ("process features", process_eager, process_lazy, ()),
+            ("list page", page_eager, page_lazy, (rows,)),
+        ):
+            for mode, func in (("eager", eager), ("lazy", lazy)):
+                elapsed, peak = _measure(func, *call_args)
+                print(f"{name:<20}{mode:<7}{elapsed:>9.2f}{peak:>10.1f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
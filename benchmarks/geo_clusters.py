@@ -0,0 +1,145 @@
+"""
+Benchmark: size and time of the /api/geo/ map responses for a large layer.
+
+Starts benchmarks.fake_arcgis with a 100k-report layer 0 and, for a
+1280x1024 viewport centred on the dataset at several zoom levels (the whole
+dataset fits the viewport up to zoom 11), compares the clustered
+FeatureCollection of get_geo_features with the plain GeoJSON of every
+report in the same tiles, and the Mapbox Vector Tiles of those tiles
+(get_tile, all tiles added up) with GeoJSON holding the same features and
+properties. Times are for a cold tile cache (the report
+points already loaded) and a warm one; for the vector tiles the warm cache
+is the tile directory on disk.
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.geo_clusters
+    SECRET_KEY=bench uv run python -m benchmarks.geo_clusters --features 500000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.fake_arcgis import free_port, spawn
+
+PORT = free_port()
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+os.environ["ARCGIS_PORTAL_TOKEN_URL"] = f"{BASE_URL}/portal/sharing/rest/generateToken"
+os.environ["ARCGIS_PORTAL_BASE_URL"] = f"{BASE_URL}/portal"
+os.environ["ARCGIS_FEATURE_SERVICE_URL"] = f"{BASE_URL}/server/rest/services/bench/FeatureServer"
+os.environ["REPORTS_TILE_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_tiles_")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+
+from apps.core.fastjson import dumpb  # noqa: E402
+from apps.core.mvt import decode_tile  # noqa: E402
+from apps.reports.services.report_geo import (  # noqa: E402
+    TILE_SIZE,
+    bbox_tiles,
+    from_unit,
+    get_geo_features,
+    get_report_points,
+    to_unit,
+)
+from apps.reports.services.report_tiles import get_tile  # noqa: E402
+
+# The fake dataset spreads its reports over 0.2 x 0.14 degrees near Pavia.
+CENTER = (9.0, 45.27)
+VIEWPORT = (1280, 1024)
+ZOOMS = (8, 11, 14, 17)
+
+
+def viewport_bbox(zoom):
+    """WGS84 bbox of a VIEWPORT pixels map centred on CENTER at zoom."""
+    scale = TILE_SIZE * 2 ** zoom
+    ux, uy = to_unit([CENTER[0]], [CENTER[1]])[1:]
+    half_w, half_h = VIEWPORT[0] / 2 / scale, VIEWPORT[1] / 2 / scale
+    min_lon, min_lat = from_unit(ux[0] - half_w, uy[0] + half_h)
+    max_lon, max_lat = from_unit(ux[0] + half_w, uy[0] - half_h)
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def plain_geojson(points, bbox, zoom):
+    """Every report in the tiles of bbox, unclustered."""
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": from_unit(points.ux[i], points.uy[i])},
+            "properties": {"uniquerowid": points.uniquerowids[i]},
+        }
+        for x, y in bbox_tiles(bbox, zoom)
+        for i in points.in_tile(zoom, x, y)
+    ]
+    return dumpb({"type": "FeatureCollection", "features": features})
+
+
+def vector_tiles(bbox, zoom):
+    """Total bytes of the vector tiles covering bbox."""
+    return sum(len(get_tile("1=1", zoom, x, y)["content"]) for x, y in bbox_tiles(bbox, zoom))
+
+
+def vector_tiles_as_geojson(bbox, zoom):
+    """Features and GeoJSON bytes of the same features as the vector tiles."""
+    features = []
+    for x, y in bbox_tiles(bbox, zoom):
+        layer = decode_tile(get_tile("1=1", zoom, x, y)["content"]).get("reports")
+        for feature in layer["features"] if layer else ():
+            scale = layer["extent"] * 2 ** zoom
+            coordinates = from_unit((x * layer["extent"] + feature["x"]) / scale,
+                                    (y * layer["extent"] + feature["y"]) / scale)
+            features.append({"type": "Feature", "geometry": {"type": "Point", "coordinates": coordinates},
+                             "properties": feature["properties"]})
+    return len(features), len(dumpb({"type": "FeatureCollection", "features": features}))
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Size and time of clustered map responses.")
+    parser.add_argument("--features", type=int, default=100_000, help="reports on layer 0")
+    args = parser.parse_args(argv)
+
+    server = spawn(PORT, args.features, photos=0, max_record_count=2000)
+    try:
+        cache.clear()
+        _, load_ms = _timed(get_report_points)
+        points = get_report_points()["points"]
+        print(f"{len(points)} reports loaded in {load_ms:.0f} ms")
+        print(f"{'':>11}{'-- /api/geo/ ':-<48}  {'-- vector tiles ':-<55}")
+        print(f"{'zoom':>4}{'tiles':>7}{'features':>10}{'plain KB':>11}{'geo KB':>9}"
+              f"{'cold ms':>9}{'warm ms':>9}{'features':>10}{'json KB':>9}{'mvt KB':>9}"
+              f"{'cold ms':>9}{'warm ms':>9}")
+        for zoom in ZOOMS:
+            bbox = viewport_bbox(zoom)
+            plain = plain_geojson(points, bbox, zoom)
+            result, cold = _timed(get_geo_features, "1=1", bbox, zoom)
+            _, warm = _timed(get_geo_features, "1=1", bbox, zoom)
+            mvt_bytes, mvt_cold = _timed(vector_tiles, bbox, zoom)
+            _, mvt_warm = _timed(vector_tiles, bbox, zoom)
+            mvt_features, mvt_json = vector_tiles_as_geojson(bbox, zoom)
+            features = result["content"].count(b'"Feature"')
+            print(f"{zoom:>4}{len(bbox_tiles(bbox, zoom)):>7}{features:>10}"
+                  f"{len(plain) / 1024:>11.0f}{len(result['content']) / 1024:>9.1f}"
+                  f"{cold:>9.1f}{warm:>9.1f}{mvt_features:>10}{mvt_json / 1024:>9.0f}"
+                  f"{mvt_bytes / 1024:>9.1f}{mvt_cold:>9.1f}{mvt_warm:>9.1f}")
+    finally:
+        shutil.rmtree(os.environ["REPORTS_TILE_CACHE_DIR"], ignore_errors=True)
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: JSON serialisation of a 10k-record get_data payload and of log records.
+
+Compares Django's JsonResponse (stdlib encoder) with FastJsonResponse, and
+the log formatters' per-record cost, using whichever backend
+apps.core.fastjson selected (orjson when installed).
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.json_payload
+"""
+
+import logging
+import os
+import random
+import timeit
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.http import JsonResponse  # noqa: E402
+
+from apps.audit.formatters import NIS2JsonFormatter  # noqa: E402
+from apps.core.fastjson import BACKEND, FastJsonResponse  # noqa: E402
+
+RECORDS = 10_000
+REPEAT = 20
+
+OPERATORS = ["Mario Rossi", "Giulia Bianchi", "Luca Verdi", "Anna Galli", "Paolo Neri"]
+TRATTE = ["A7 Milano-Serravalle", "A7 Serravalle-Genova", "A50 Tangenziale Ovest", "A51 Est", "A52 Nord"]
+APPALTI = ["Manutenzione ordinaria", "Manutenzione straordinaria", "Pavimentazioni", "Opere d'arte"]
+
+
+def _payload():
+    rnd = random.Random(42)
+    data = [
+        {
+            "uniquerowid": f"{{{rnd.getrandbits(128):032x}}}",
+            "nome_operatore": rnd.choice(OPERATORS),
+            "tratta": rnd.choice(TRATTE),
+            "tipologia_appalto": rnd.choice(APPALTI),
+            "data_rilevamento": f"{rnd.randint(1, 28):02d}/{rnd.randint(1, 12):02d}/2025 10:{i % 60:02d}",
+        }
+        for i in range(RECORDS)
+    ]
+    return {"data": data, "total": RECORDS, "sort_by": "data_rilevamento", "sort_order": "desc"}
+
+
+def _ms(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e3
+
+
+def main():
+    payload = _payload()
+    stdlib_ms = _ms(lambda: JsonResponse(payload), REPEAT)
+    fast_ms = _ms(lambda: FastJsonResponse(payload), REPEAT)
+    size_std = len(JsonResponse(payload).content)
+    size_fast = len(FastJsonResponse(payload).content)
+
+    record = logging.LogRecord("audit", logging.INFO, "", 0, "data.arcgis.queried", None, None)
+    record.__dict__.update(
+        event_type="data.arcgis.queried", user="mario.rossi", ip="10.0.0.1",
+        session_id="s" * 32, path="/api/data/", method="GET",
+        detail={"layer_id": 0, "record_count": RECORDS},
+    )
+    formatter = NIS2JsonFormatter()
+    format_us = _ms(lambda: formatter.format(record), 20_000) * 1e3
+
+    print(f"backend: {BACKEND}")
+    print(f"get_data payload, {RECORDS} records")
+    print(f"  {'JsonResponse':<20}{stdlib_ms:>8.2f} ms  {size_std / 1024:>7.0f} KiB")
+    print(f"  {'FastJsonResponse':<20}{fast_ms:>8.2f} ms  {size_fast / 1024:>7.0f} KiB")
+    print(f"NIS2JsonFormatter.format: {format_us:.2f} µs/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: route kilometre queries, pk index vs a scan of every row.
+
+Builds the PkIndex of /api/interventions/ from the fake ArcGIS dataset
+(each report spans about a kilometre of one of its routes and has two
+pavement rows) and times overlap queries of several widths on one route
+against a linear scan of the index rows filtered on route and span, as a
+list view would filter cached rows. Also reports the build time and the
+pickled size of the index, and what a request pays to get it: a full read
+(unpickle) from the Django cache, as every request did before the
+per-process memo, and get_pk_index with the memo warm. The request column
+adds get_pk_index to the index query. No server or database is needed
+(the default LocMemCache pickles like Redis does).
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.pk_index
+    SECRET_KEY=bench uv run python -m benchmarks.pk_index --features 500000
+"""
+
+import argparse
+import os
+import pickle
+import time
+import uuid
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+
+from apps.reports.mappings import FIELD_VALUES  # noqa: E402
+from apps.reports.services.report_pk_index import (  # noqa: E402
+    PK_INDEX_CACHE_KEY_PREFIX,
+    PK_INDEX_VERSION_KEY,
+    build_pk_index,
+    get_pk_index,
+)
+from benchmarks.fake_arcgis import SyntheticDataset  # noqa: E402
+
+# (pk_from, pk_to) of the queries, widest last
+RANGES = ((50.0, 50.0), (40.0, 41.0), (40.0, 55.0), (0.0, 120.0))
+REPEAT = 20
+
+
+def _timed(func, *args, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Route kilometre index vs linear scan.")
+    parser.add_argument("--features", type=int, default=100_000, help="reports on layer 0")
+    args = parser.parse_args(argv)
+
+    dataset = SyntheticDataset(args.features, 0, FIELD_VALUES)
+    reports = [dataset.report(i, geometry=False) for i in range(args.features)]
+    pavement = [f for i in range(args.features) for f in dataset.children(1, i)]
+
+    index, build_ms = _timed(build_pk_index, reports, pavement)
+    print(f"{len(reports)} reports + {len(pavement)} pavement rows: {len(index)} intervals "
+          f"indexed in {build_ms:.0f} ms, {len(pickle.dumps(index)) / 2 ** 20:.1f} MiB pickled")
+
+    # Store the index as get_pk_index does and time getting it back
+    version = uuid.uuid4().hex
+    cache.set(f"{PK_INDEX_CACHE_KEY_PREFIX}{version}", index, timeout=None)
+    cache.set(PK_INDEX_VERSION_KEY, version, timeout=None)
+    _, unpickle_ms = _timed(cache.get, f"{PK_INDEX_CACHE_KEY_PREFIX}{version}", repeat=5)
+    get_pk_index()
+    _, memo_ms = _timed(get_pk_index, repeat=REPEAT)
+    print(f"cache read of the index {unpickle_ms:.1f} ms, get_pk_index with the memo {memo_ms:.3f} ms")
+
+    # The scan baseline: every row of the index, filtered on route and span
+    tratta = max(index.routes, key=lambda t: len(index.routes[t]))
+    columns = list(zip(index.report, index.pk_iniz, index.pk_fin))
+
+    def scan(lo, hi):
+        return [
+            row for row, (report, start, end) in enumerate(columns)
+            if index.tratte[report] == tratta and min(start, end) <= hi and max(start, end) >= lo
+        ]
+
+    print(f"route {tratta}: {len(index.routes[tratta])} intervals")
+    print(f"{'pk range':>14}{'results':>10}{'index ms':>11}{'request ms':>12}{'scan ms':>10}{'speed-up':>10}")
+    for lo, hi in RANGES:
+        found, index_ms = _timed(index.overlapping, lo, hi, [tratta], repeat=REPEAT)
+        _, scan_ms = _timed(scan, lo, hi, repeat=max(1, REPEAT // 4))
+        request_ms = memo_ms + index_ms
+        print(f"{lo:>6.0f} - {hi:<5.0f}{len(found):>10}{index_ms:>11.3f}{request_ms:>12.3f}{scan_ms:>10.2f}"
+              f"{scan_ms / request_ms:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
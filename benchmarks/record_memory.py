@@ -0,0 +1,139 @@
+"""
+Benchmark: memory of report records, plain dicts vs slotted records.
+
+- per report   processed attributes of one report (main section): the
+               former dict per attribute, with the value mapped through a
+               fresh CSV mapping read each time, vs ProcessedAttribute
+               records from process_attributes
+- per list     the cached rows of a 100k-report list (get_report_rows):
+               attribute dicts as decoded from the ArcGIS JSON vs
+               ReportRow records sharing their coded values
+
+Memory is what tracemalloc still sees allocated once the records are built
+(the input features are built beforehand and not counted); the list rows
+are also measured pickled, as they are stored in the cache. Rows and
+features come from the fake ArcGIS dataset, decoded from JSON page by page
+like real responses. The CSV mappings are served by the fake server; no
+database is needed.
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.record_memory
+    SECRET_KEY=bench uv run python -m benchmarks.record_memory --features 500000
+"""
+
+import argparse
+import json
+import os
+import pickle
+import tracemalloc
+
+from benchmarks.fake_arcgis import SyntheticDataset, free_port, spawn
+
+PORT = free_port()
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+os.environ["ARCGIS_PORTAL_TOKEN_URL"] = f"{BASE_URL}/portal/sharing/rest/generateToken"
+os.environ["ARCGIS_PORTAL_BASE_URL"] = f"{BASE_URL}/portal"
+os.environ["ARCGIS_FEATURE_SERVICE_URL"] = f"{BASE_URL}/server/rest/services/bench/FeatureServer"
+
+import django  # noqa: E402
+
+django.setup()
+
+from apps.core.services.csv_mapping import get_csv_mappings  # noqa: E402
+from apps.reports.mappings import (  # noqa: E402
+    FIELD_ORDER,
+    FIELD_VALUES,
+    get_field_label,
+    get_field_value,
+    is_empty,
+    process_attributes,
+)
+from apps.reports.records import ReportRow  # noqa: E402
+from apps.reports.services.report_list import LIST_FIELDS  # noqa: E402
+
+PAGE = 2000
+
+
+def _decoded_pages(dataset, count, fields=None):
+    """Attributes of the first count reports, JSON-decoded one page at a time."""
+    for start in range(0, count, PAGE):
+        page = [dataset.report(i, geometry=False)["attributes"] for i in range(start, min(start + PAGE, count))]
+        if fields:
+            page = [{f: attrs[f] for f in fields} for attrs in page]
+        yield from json.loads(json.dumps(page))
+
+
+def dict_attributes(attributes, section="main"):
+    # Former process_attributes output
+    return [
+        {
+            "field": field,
+            "label": get_field_label(field),
+            "value": get_field_value(field, attributes[field]),
+            "original_value": attributes[field],
+        }
+        for field in FIELD_ORDER[section]
+        if field in attributes and not is_empty(attributes[field])
+    ]
+
+
+def _per_report(dataset, reports):
+    features = list(_decoded_pages(dataset, reports))
+    _, old = _retained(lambda: [dict_attributes(a) for a in features])
+    _, new = _retained(lambda: [process_attributes(a, "main") for a in features])
+    return old / reports, new / reports
+
+
+def _retained(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, retained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory of dict vs slotted report records.")
+    parser.add_argument("--features", type=int, default=100_000, help="rows in the list")
+    parser.add_argument("--reports", type=int, default=1000, help="reports processed for the per-report figure")
+    args = parser.parse_args(argv)
+
+    server = spawn(PORT, max(args.features, args.reports), photos=0)
+    try:
+        get_csv_mappings(app="reports")
+        dataset = SyntheticDataset(max(args.features, args.reports), 0, FIELD_VALUES)
+
+        print(f"{'measure':<28}{'dicts':>12}{'records':>12}{'saved':>8}")
+        old, new = _per_report(dataset, args.reports)
+        _row("per report (bytes)", old, new)
+
+        def dict_rows():
+            return list(_decoded_pages(dataset, args.features, LIST_FIELDS))
+
+        def record_rows():
+            shared = {}
+            return [ReportRow.from_attributes(a, shared) for a in _decoded_pages(dataset, args.features, LIST_FIELDS)]
+
+        old_rows, old = _retained(dict_rows)
+        mb = 1024 * 1024
+        old_pickled = len(pickle.dumps(old_rows, pickle.HIGHEST_PROTOCOL))
+        del old_rows
+        new_rows, new = _retained(record_rows)
+        new_pickled = len(pickle.dumps(new_rows, pickle.HIGHEST_PROTOCOL))
+        _row(f"per list, {args.features} rows (MB)", old / mb, new / mb)
+        _row("per list, pickled (MB)", old_pickled / mb, new_pickled / mb)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _row(name, old, new):
+    print(f"{name:<28}{old:>12.1f}{new:>12.1f}{(1 - new / old) * 100:>7.0f}%")
+
+
+if __name__ == "__main__":
+    main()
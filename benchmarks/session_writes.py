@@ -0,0 +1,92 @@
+"""
+Benchmark: database session queries per authenticated page view.
+
+Replays the same sequence of page views with the old session setup
+(database sessions, SESSION_SAVE_EVERY_REQUEST) and with the current one
+(cached_db sessions refreshed by SlidingSessionExpiryMiddleware), counting
+the queries that hit the django_session table. Runs against a throw-away
+test database created from the configured DATABASES.
+
+Usage:
+    SECRET_KEY=bench uv run python -m benchmarks.session_writes
+"""
+
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark-only")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+SLIDING_MIDDLEWARE = "config.middleware.SlidingSessionExpiryMiddleware"
+PAGE_VIEWS = 50
+PATH = "/"
+
+SCENARIOS = {
+    "before (db, save every request)": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "SESSION_SAVE_EVERY_REQUEST": True,
+        "MIDDLEWARE": [m for m in settings.MIDDLEWARE if m != SLIDING_MIDDLEWARE],
+    },
+    "after (cached_db, sliding expiry)": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+        "SESSION_SAVE_EVERY_REQUEST": False,
+        "MIDDLEWARE": settings.MIDDLEWARE,
+    },
+}
+
+
+def _session_queries(captured):
+    reads = writes = 0
+    for query in captured:
+        sql = query["sql"]
+        if "django_session" not in sql:
+            continue
+        if sql.lstrip().upper().startswith("SELECT"):
+            reads += 1
+        else:
+            writes += 1
+    return reads, writes
+
+
+def _run(user, overrides):
+    cache.clear()
+    with override_settings(**overrides):
+        client = Client()
+        client.force_login(user, backend="apps.accounts.auth.SuperuserOnlyModelBackend")
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(PAGE_VIEWS):
+                client.get(PATH)
+    return _session_queries(ctx.captured_queries)
+
+
+def main():
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        user = User.objects.create_superuser("session-bench", password="bench")
+        print(f"{PAGE_VIEWS} page views of {PATH}")
+        print(f"{'scenario':<36}{'reads/view':>12}{'writes/view':>13}")
+        for name, overrides in SCENARIOS.items():
+            reads, writes = _run(user, overrides)
+            print(f"{name:<36}{reads / PAGE_VIEWS:>12.2f}{writes / PAGE_VIEWS:>13.2f}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Project-level Django middleware."""
 
 import secrets
+import time
 from django.conf import settings
 
 
@@ -38,3 +39,40 @@ class ContentSecurityPolicyMiddleware:
         if header:
             response['Content-Security-Policy'] = header
         return response
+
+
+class SlidingSessionExpiryMiddleware:
+    """Extend session expiry only when the remaining lifetime runs low.
+
+    Replaces SESSION_SAVE_EVERY_REQUEST, which rewrote the session store on
+    every page view. The time of the last extension is kept in the session;
+    once SESSION_COOKIE_AGE minus the time elapsed since then falls below
+    SESSION_REFRESH_THRESHOLD, the session is marked modified so that
+    SessionMiddleware saves it and re-issues the cookie with a fresh expiry.
+    Must sit right after SessionMiddleware.
+    """
+
+    REFRESHED_AT_KEY = '_session_refreshed_at'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._age = settings.SESSION_COOKIE_AGE
+        self._threshold = getattr(settings, 'SESSION_REFRESH_THRESHOLD', self._age // 2)
+
+    def __call__(self, request):
+        session = getattr(request, 'session', None)
+        if (
+            session is not None
+            and session.session_key
+            and not settings.SESSION_EXPIRE_AT_BROWSER_CLOSE
+        ):
+            refreshed_at = session.get(self.REFRESHED_AT_KEY)
+            now = int(time.time())
+            # Loading drops the key of an unknown or expired session; do not
+            # resurrect it as a new empty session.
+            if session.session_key and (
+                refreshed_at is None
+                or self._age - (now - refreshed_at) < self._threshold
+            ):
+                session[self.REFRESHED_AT_KEY] = now
+        return self.get_response(request)
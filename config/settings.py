@@ -76,8 +76,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost: times the whole request (Server-Timing + apps log line)
+    'apps.core.timing.ServerTimingMiddleware',
+    'apps.core.metrics.MetricsMiddleware',
+    # Opt-in (PROFILING_ENABLED): stack samples of slow requests
+    'apps.core.profiling.SamplingProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'config.middleware.SlidingSessionExpiryMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -130,9 +136,35 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD", ""),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # Validate connections before handing them out; with pooling this
+        # becomes the psycopg pool's check callback.
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Connection pooling (psycopg_pool). Each gunicorn worker process holds its own
+# pool, so the default max size is one connection per request thread plus one
+# for background work (cache warm-up). Worst case across the server is
+# GUNICORN_WORKERS * DB_POOL_MAX_SIZE, which must stay below Postgres
+# max_connections (50 in docker-compose.prod.yml).
+# Pooling requires CONN_MAX_AGE = 0; DB_CONN_MAX_AGE only applies when the pool
+# is disabled and Django falls back to persistent per-thread connections.
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 4))
+DB_POOL_ENABLED = os.getenv('DB_POOL_ENABLED', 'True').lower() in ('true', '1', 'yes')
+if DB_POOL_ENABLED:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+            "max_size": int(os.getenv('DB_POOL_MAX_SIZE', GUNICORN_THREADS + 1)),
+            # Seconds a request waits for a free connection before failing
+            "timeout": float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            "max_idle": 300,
+            "max_lifetime": 1800,
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -220,7 +252,11 @@ OIDC_RENEW_ID_TOKEN_EXPIRY_SECONDS = 900
 # Session settings
 SESSION_COOKIE_AGE = int(os.getenv('SESSION_TIMEOUT', 3600))  # 1 hour default
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
-SESSION_SAVE_EVERY_REQUEST = True  # Update session on every request
+# Expiry is extended by config.middleware.SlidingSessionExpiryMiddleware, which
+# only rewrites the session once its remaining lifetime drops below
+# SESSION_REFRESH_THRESHOLD seconds, instead of saving it on every request.
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_THRESHOLD = int(os.getenv('SESSION_REFRESH_THRESHOLD', SESSION_COOKIE_AGE // 2))
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'   # Strict breaks OIDC redirects from Entra
 CSRF_COOKIE_HTTPONLY = True
@@ -237,6 +273,8 @@ SERVICE_AUTH_EXEMPT_APPS = [
     "admin",
     "oidc",
     "accounts",
+    # /api/audit/ checks the audit.view_auditevent permission itself
+    "audit",
 ]
 
 # URL prefixes that bypass service access checks
@@ -252,6 +290,7 @@ SERVICE_AUTH_EXEMPT_URLS = [
     _ADMIN_URL_PREFIX,
     "/static/",
     "/health/",
+    "/metrics",
     "/auth/",
     "/accounts/",
 ]
@@ -279,6 +318,9 @@ ARCGIS_PASSWORD = os.getenv('ARCGIS_PASSWORD', '')
 ARCGIS_REFERER = os.getenv('ARCGIS_REFERER', 'https://reports.serravalle.it/')
 ARCGIS_TOKEN_EXPIRATION_MINUTES = int(os.getenv('ARCGIS_TOKEN_EXPIRATION_MINUTES', 60))
 
+# Pages fetched concurrently when a query exceeds the service's maxRecordCount.
+ARCGIS_QUERY_PAGE_WORKERS = int(os.getenv('ARCGIS_QUERY_PAGE_WORKERS', 4))
+
 # Base portal URL (without /sharing/rest/...) used to build content item download URLs.
 ARCGIS_PORTAL_BASE_URL = os.getenv(
     'ARCGIS_PORTAL_BASE_URL',
@@ -322,6 +364,40 @@ ARCGIS_FIELD_MAPPINGS = {
 # Default: 300 s (5 min) — adjustable without redeployment via env var.
 ARCGIS_MAPPING_CACHE_TIMEOUT = int(os.getenv('ARCGIS_MAPPING_CACHE_TIMEOUT', 300))
 
+# Seconds a last-known-good snapshot is served after a failed Portal refresh
+# before the refresh is attempted again.
+ARCGIS_MAPPING_RETRY_TIMEOUT = int(os.getenv('ARCGIS_MAPPING_RETRY_TIMEOUT', 60))
+
+# Seconds the layer-0 rows behind the report list (per WHERE clause) and the
+# filter dropdown options are cached. 0 disables caching.
+REPORTS_LIST_CACHE_TIMEOUT = int(os.getenv('REPORTS_LIST_CACHE_TIMEOUT', 60))
+REPORTS_FILTER_OPTIONS_CACHE_TIMEOUT = int(os.getenv('REPORTS_FILTER_OPTIONS_CACHE_TIMEOUT', 300))
+
+# Layer-0 rows requested per ArcGIS call by the CSV/XLSX export; keep it at or
+# below the feature service's maxRecordCount.
+REPORTS_EXPORT_CHUNK_SIZE = int(os.getenv('REPORTS_EXPORT_CHUNK_SIZE', 1000))
+
+# Report map (/api/geo/): reports are clustered on a grid of cells of this
+# many pixels (a divisor of the 256 px tile) below REPORTS_GEO_CLUSTER_MAX_ZOOM;
+# a request may cover at most REPORTS_GEO_MAX_TILES tiles. Points and tiles are
+# cached for REPORTS_LIST_CACHE_TIMEOUT.
+REPORTS_GEO_CLUSTER_CELL_SIZE = int(os.getenv('REPORTS_GEO_CLUSTER_CELL_SIZE', 64))
+REPORTS_GEO_CLUSTER_MAX_ZOOM = int(os.getenv('REPORTS_GEO_CLUSTER_MAX_ZOOM', 17))
+REPORTS_GEO_MAX_TILES = int(os.getenv('REPORTS_GEO_MAX_TILES', 64))
+
+# Report vector tiles (/tiles/<z>/<x>/<y>.mvt) are written to
+# REPORTS_TILE_CACHE_DIR and reused for REPORTS_TILE_CACHE_TIMEOUT seconds
+# (0 disables the disk cache). Expired tiles, and the oldest beyond
+# REPORTS_TILE_CACHE_MAX_FILES, are pruned once per timeout and by
+# `manage.py prune_tiles`.
+REPORTS_TILE_CACHE_DIR = Path(os.getenv('REPORTS_TILE_CACHE_DIR', BASE_DIR / 'cache' / 'tiles'))
+REPORTS_TILE_CACHE_TIMEOUT = int(os.getenv('REPORTS_TILE_CACHE_TIMEOUT', 300))
+REPORTS_TILE_CACHE_MAX_FILES = int(os.getenv('REPORTS_TILE_CACHE_MAX_FILES', 20000))
+
+# Seconds the route kilometre index behind /api/interventions/ is cached
+# (rebuilt from layers 0 and 1 when it expires). 0 disables caching.
+REPORTS_PK_INDEX_CACHE_TIMEOUT = int(os.getenv('REPORTS_PK_INDEX_CACHE_TIMEOUT', 300))
+
 
 # =============================================================================
 # Pagination Configuration
@@ -360,6 +436,24 @@ else:
         }
     }
 
+# Session storage: 'cached_db' reads sessions from Redis and writes through to
+# the database so logins survive a Redis restart; 'cache' keeps them in Redis
+# only. Without Redis, sessions stay in the database.
+_SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+}
+_SESSION_BACKEND = os.getenv(
+    'SESSION_BACKEND', 'cached_db' if _CACHE_BACKEND == 'redis' else 'db'
+)
+if _SESSION_BACKEND not in _SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND must be one of {', '.join(_SESSION_ENGINES)}, "
+        f"got {_SESSION_BACKEND!r}."
+    )
+SESSION_ENGINE = _SESSION_ENGINES[_SESSION_BACKEND]
+
 
 # =============================================================================
 # Security Settings
@@ -369,6 +463,25 @@ else:
 MAX_LOGIN_ATTEMPTS = int(os.getenv('MAX_LOGIN_ATTEMPTS', 5))
 LOCKOUT_DURATION = int(os.getenv('LOCKOUT_DURATION', 900))  # 15 minutes
 
+# Server-Timing header and per-request upstream accounting (apps.core.timing)
+SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'True').lower() in ('true', '1', 'yes')
+# Requests making more ArcGIS calls than this are logged at WARNING
+UPSTREAM_CALLS_WARN_THRESHOLD = int(os.getenv('UPSTREAM_CALLS_WARN_THRESHOLD', 20))
+
+# Sampling profiler for slow requests (apps.core.profiling); off by default.
+# Requests slower than PROFILING_THRESHOLD_MS are stored as collapsed stacks
+# in PROFILING_DIR, keeping the newest PROFILING_MAX_FILES.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() in ('true', '1', 'yes')
+PROFILING_INTERVAL_MS = int(os.getenv('PROFILING_INTERVAL_MS', 50))
+PROFILING_THRESHOLD_MS = int(os.getenv('PROFILING_THRESHOLD_MS', 5000))
+PROFILING_DIR = BASE_DIR / 'logs' / 'profiles'
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', 100))
+
+# Per-user limits on views that hit ArcGIS ("<requests>/<seconds>", empty disables)
+PDF_EXPORT_RATE_LIMIT = os.getenv('PDF_EXPORT_RATE_LIMIT', '10/60')
+IMAGE_PROXY_RATE_LIMIT = os.getenv('IMAGE_PROXY_RATE_LIMIT', '300/60')
+REPORTS_EXPORT_RATE_LIMIT = os.getenv('REPORTS_EXPORT_RATE_LIMIT', '5/60')
+
 # Trusted reverse proxy IPs for X-Forwarded-For extraction (space-separated in env)
 LOGIN_TRUSTED_PROXIES = [
     ip.strip()
@@ -411,6 +524,23 @@ CSP_POLICY = {
 # Log level from environment (DEBUG, INFO, WARNING, ERROR, CRITICAL)
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
 
+# The audit and apps loggers write through a bounded in-memory queue drained by
+# a background thread (apps.audit.handlers). Full-queue policy: "block" never
+# loses a record (waits LOG_QUEUE_BLOCK_TIMEOUT seconds, then writes inline),
+# "drop" discards records and logs how many were lost.
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv('LOG_QUEUE_BLOCK_TIMEOUT', 5))
+AUDIT_LOG_QUEUE_POLICY = os.getenv('AUDIT_LOG_QUEUE_POLICY', 'block')
+APP_LOG_QUEUE_POLICY = os.getenv('APP_LOG_QUEUE_POLICY', 'drop')
+
+# Optional audit DB sink: audit records are also batched into the AuditEvent
+# table (monthly partitions on PostgreSQL) for querying. The JSON-lines audit
+# log is always written. Run `manage.py audit_partitions` daily for retention.
+AUDIT_DB_ENABLED = os.getenv('AUDIT_DB_ENABLED', 'False').lower() in ('true', '1', 'yes')
+AUDIT_DB_BATCH_SIZE = int(os.getenv('AUDIT_DB_BATCH_SIZE', 100))
+AUDIT_DB_FLUSH_INTERVAL = float(os.getenv('AUDIT_DB_FLUSH_INTERVAL', 2))
+AUDIT_DB_RETENTION_MONTHS = int(os.getenv('AUDIT_DB_RETENTION_MONTHS', 12))
+
 # Custom handler class for gzip compression
 import gzip
 import shutil
@@ -558,6 +688,28 @@ LOGGING = {
             'encoding': 'utf-8',
             'formatter': 'audit_json',
         },
+        'audit_db': {
+            'level': 'INFO',
+            'class': 'apps.audit.handlers.AuditDatabaseHandler',
+            'batch_size': AUDIT_DB_BATCH_SIZE,
+            'flush_interval': AUDIT_DB_FLUSH_INTERVAL,
+        },
+        'audit_queue': {
+            'class': 'apps.audit.handlers.BoundedQueueHandler',
+            'queue': {'()': 'queue.Queue', 'maxsize': LOG_QUEUE_SIZE},
+            'handlers': ['audit_file', 'audit_db'] if AUDIT_DB_ENABLED else ['audit_file'],
+            'respect_handler_level': True,
+            'policy': AUDIT_LOG_QUEUE_POLICY,
+            'block_timeout': LOG_QUEUE_BLOCK_TIMEOUT,
+        },
+        'app_queue': {
+            'class': 'apps.audit.handlers.BoundedQueueHandler',
+            'queue': {'()': 'queue.Queue', 'maxsize': LOG_QUEUE_SIZE},
+            'handlers': ['app_file'],
+            'respect_handler_level': True,
+            'policy': APP_LOG_QUEUE_POLICY,
+            'block_timeout': LOG_QUEUE_BLOCK_TIMEOUT,
+        },
     },
     'loggers': {
         # Explicitly configure django.request logger for clarity
@@ -567,12 +719,12 @@ LOGGING = {
             'propagate': False,
         },
         'apps': {
-            'handlers': ['app_file'],
+            'handlers': ['app_queue'],
             'level': LOG_LEVEL,
             'propagate': False,
         },
         'audit': {
-            'handlers': ['audit_file'],
+            'handlers': ['audit_queue'],
             'level': 'INFO',
             'propagate': False,
         },
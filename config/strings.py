@@ -46,6 +46,8 @@ UI_STRINGS = {
     "reports_pdf_btn": "Scarica PDF",
     "reports_maps_btn": "Apri in Google Maps",
     "reports_pdf_loading": "Generazione PDF in corso...",
+    "reports_export_csv": "Esporta elenco filtrato (CSV)",
+    "reports_export_xlsx": "Esporta elenco filtrato (Excel)",
 
     # --- Segnalazioni ---
     "segnalazioni_page_title": "Segnalazioni",
@@ -111,4 +113,5 @@ UI_STRINGS = {
     "error_pdf_generation": "Errore nella generazione del PDF.",
     "error_attachment_fetch": "Errore nel recupero dell'allegato.",
     "error_content_type": "Tipo di contenuto non consentito.",
+    "error_rate_limited": "Troppe richieste. Riprova tra qualche istante.",
 }
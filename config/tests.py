@@ -1,4 +1,12 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.db import SessionStore
+from django.db import connection
+from django.http import HttpResponse
 from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from config.middleware import SlidingSessionExpiryMiddleware
 from config.strings import UI_STRINGS
 from config.context_processors import ui_strings as ui_strings_processor
 
@@ -125,3 +133,60 @@ class UIStringsInTemplateContextTest(TestCase):
         response = self.client.get('/')
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Buongiorno")
+
+
+@override_settings(SESSION_COOKIE_AGE=3600, SESSION_REFRESH_THRESHOLD=1800)
+class SlidingSessionExpiryMiddlewareTest(TestCase):
+    """Verifica che la sessione venga riscritta solo vicino alla scadenza."""
+
+    KEY = SlidingSessionExpiryMiddleware.REFRESHED_AT_KEY
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = SlidingSessionExpiryMiddleware(lambda request: HttpResponse())
+        store = SessionStore()
+        store[self.KEY] = 1_000_000
+        store.save()
+        self.session_key = store.session_key
+
+    def _run(self, now, session_key=None):
+        request = self.factory.get('/')
+        request.session = SessionStore(session_key or self.session_key)
+        with patch('config.middleware.time.time', return_value=now):
+            self.middleware(request)
+        return request.session
+
+    def test_fresh_session_is_not_modified(self):
+        session = self._run(1_000_000 + 1799)
+        self.assertFalse(session.modified)
+
+    def test_session_past_threshold_is_refreshed(self):
+        session = self._run(1_000_000 + 1801)
+        self.assertTrue(session.modified)
+        self.assertEqual(session[self.KEY], 1_000_000 + 1801)
+
+    def test_session_without_timestamp_is_refreshed(self):
+        store = SessionStore()
+        store['foo'] = 'bar'
+        store.save()
+        session = self._run(1_000_000, session_key=store.session_key)
+        self.assertTrue(session.modified)
+
+    def test_unknown_session_key_is_not_created(self):
+        session = self._run(1_000_000, session_key='x' * 32)
+        self.assertFalse(session.modified)
+        self.assertIsNone(session.session_key)
+
+    def test_page_views_do_not_write_session_until_threshold(self):
+        user = User.objects.create_superuser('sliding', password='pass')
+        self.client.force_login(user, backend='apps.accounts.auth.SuperuserOnlyModelBackend')
+        self.client.get('/')  # first view stamps the refresh time
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(3):
+                self.client.get('/')
+        writes = [
+            q['sql'] for q in ctx.captured_queries
+            if 'django_session' in q['sql']
+            and q['sql'].lstrip().upper().startswith(('UPDATE', 'INSERT'))
+        ]
+        self.assertEqual(writes, [])
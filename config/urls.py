@@ -8,15 +8,19 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import RedirectView
-from apps.core.views import HealthView
+from apps.core.metrics import metrics_view
+from apps.core.views import DatabaseHealthView, HealthView
 
 urlpatterns = [
     path('health/', HealthView.as_view(), name='health'),
+    path('health/db/', DatabaseHealthView.as_view(), name='health_db'),
+    path('metrics', metrics_view, name='metrics'),
     path(os.environ.get('DJANGO_ADMIN_URL', 'app-control-panel/'), admin.site.urls),
     path('oidc/', include('mozilla_django_oidc.urls')),
     # Redirect legacy login URL to unified login page
     path('accounts/login/', RedirectView.as_view(url='/auth/login/', permanent=False)),
     path('auth/', include('apps.accounts.urls')),
+    path('api/audit/', include('apps.audit.urls')),
     path('api/', include('apps.reports.api_urls')),
     path('', include('apps.core.urls')),
     path('', include('apps.reports.urls')),
@@ -1,8 +1,11 @@
+import os
+
 bind = "0.0.0.0:8000"
 worker_tmp_dir = "/tmp"
-workers = 3
+workers = int(os.getenv("GUNICORN_WORKERS", 3))
 worker_class = "gthread"
-threads = 4
+# Also read by config.settings to size the per-worker database pool
+threads = int(os.getenv("GUNICORN_THREADS", 4))
 timeout = 120
 max_requests = 1000
 max_requests_jitter = 50
@@ -10,7 +13,57 @@ accesslog = "-"   # stdout → docker compose logs
 errorlog = "-"    # stderr → docker compose logs
 loglevel = "info"
 
+# Metrics of all workers are aggregated from files in this directory
+# (apps.core.metrics). Set here, not in the image, so that manage.py commands
+# keep the in-process registry.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus")
+
 # Prevent oversized requests
 limit_request_line = 4094
 limit_request_fields = 50
 limit_request_field_size = 8190
+
+
+def on_starting(server):
+    """Start from an empty metrics directory (files of a previous run are stale)."""
+    import shutil
+
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def post_worker_init(worker):
+    """Warm caches in the background once the worker has loaded Django.
+
+    Opt-in via WARM_CACHES_ON_START=true. Runs in a daemon thread so the
+    worker starts accepting requests immediately.
+    """
+    import threading
+
+    if os.getenv("WARM_CACHES_ON_START", "False").lower() not in ("true", "1", "yes"):
+        return
+
+    from apps.core.services.warmup import warm_caches
+    threading.Thread(target=warm_caches, name="cache-warmup", daemon=True).start()
+
+
+def worker_exit(server, worker):
+    """Flush queued log records and close the worker's database pool."""
+    from django.db import connections
+
+    from apps.audit.handlers import stop_queue_listeners
+
+    stop_queue_listeners()
+
+    for conn in connections.all():
+        close_pool = getattr(conn, "close_pool", None)
+        if close_pool is not None:
+            close_pool()
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of an exited worker from /metrics."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -10,6 +10,8 @@ class FilterManager {
             filterOptionsEndpoint: config.filterOptionsEndpoint || '../api/get_filter_options.php',
             onDataLoad: config.onDataLoad || null,
             filters: config.filters || [],
+            // Paginazione a cursore: l'endpoint restituisce next_cursor/prev_cursor
+            cursorPaging: config.cursorPaging || false,
             ...config
         };
         
@@ -422,7 +424,7 @@ class FilterManager {
         this.loadFilteredData(1, perPage);
     }
     
-    async loadFilteredData(page = 1, perPage = null) {
+    async loadFilteredData(page = 1, perPage = null, cursor = '') {
         try {
             // Mostra loading
             this.setLoadingState(true);
@@ -432,7 +434,7 @@ class FilterManager {
                 perPage = this.config.itemsPerPage || window.itemsPerPage || 10;
             }
             
-            const queryString = this.buildQueryParams(page, perPage, this.activeFilters);
+            const queryString = this.buildQueryParams(page, perPage, this.activeFilters, cursor);
             const response = await fetch(`${this.config.dataEndpoint}?${queryString}`);
             if (!response.ok) {
                 throw new Error('Errore nel caricamento dei dati filtrati');
@@ -456,11 +458,16 @@ class FilterManager {
     }
 
     // Build query string ensuring arrays are appended as repeated params (preferred by PHP)
-    buildQueryParams(page, perPage, filters) {
+    buildQueryParams(page, perPage, filters, cursor = '') {
         const params = new URLSearchParams();
         params.append('page', page);
         params.append('per_page', perPage);
 
+        // Cursore vuoto = prima pagina in modalità cursore
+        if (this.config.cursorPaging) {
+            params.append('cursor', cursor || '');
+        }
+
         // Aggiungi i parametri di ordinamento se disponibili
         if (window.currentSort) {
             params.append('sort_by', window.currentSort.by);
@@ -487,12 +494,12 @@ class FilterManager {
     }
     
     // Metodo pubblico per ricaricare i dati (utilizzabile dall'esterno)
-    reloadData(page = 1, perPage = null) {
+    reloadData(page = 1, perPage = null, cursor = '') {
         // Se perPage non è specificato, usa quello dalla configurazione
         if (perPage === null) {
             perPage = this.config.itemsPerPage || window.itemsPerPage || 10;
         }
-        return this.loadFilteredData(page, perPage);
+        return this.loadFilteredData(page, perPage, cursor);
     }
     
     // Metodo per ottenere i filtri attivi (utilizzabile dall'esterno)
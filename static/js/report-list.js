@@ -10,15 +10,29 @@
 
     var currentPage = 1;
     var totalItems = 0;
+    // Cursori della pagina corrente (null agli estremi della lista)
+    var nextCursor = null;
+    var prevCursor = null;
     var filterManager;
     var tableSorter;
     var currentSort = { by: 'data_rilevamento', order: 'desc' };
+    // Ordinamenti paginati a cursore: ArcGIS ordina per valore memorizzato,
+    // che coincide con quello mostrato solo per la data (gli altri campi
+    // sono codici, ordinati per etichetta solo in modalità pagina)
+    var CURSOR_SORTS = { data_rilevamento: true };
 
     window.currentSort = currentSort;
 
-    function loadData(page, useFilters) {
+    function cursorPaging() {
+        return CURSOR_SORTS[currentSort.by] === true;
+    }
+
+    function loadData(page, useFilters, cursor) {
         var url = '/api/data/?page=' + page + '&per_page=' + itemsPerPage;
         url += '&sort_by=' + currentSort.by + '&sort_order=' + currentSort.order;
+        if (cursorPaging()) {
+            url += '&cursor=' + encodeURIComponent(cursor || '');
+        }
 
         if (useFilters && filterManager) {
             var filters = filterManager.getActiveFilters();
@@ -53,6 +67,8 @@
         totalItems = response.total;
         var data = response.data;
         currentPage = page;
+        nextCursor = response.next_cursor || null;
+        prevCursor = response.prev_cursor || null;
 
         if (data.length === 0) {
             tbody.innerHTML = '<tr><td colspan="6" style="text-align: center; padding: 20px;">' + window.UI_STRINGS.table_no_data + '</td></tr>';
@@ -94,31 +110,50 @@
     function updatePaginationControls() {
         var totalPages = Math.ceil(totalItems / itemsPerPage);
         document.getElementById('pageInfo').textContent = window.UI_STRINGS.pagination_page + ' ' + currentPage + ' ' + window.UI_STRINGS.pagination_of + ' ' + (totalPages || 1);
-        document.getElementById('prevPage').disabled = currentPage === 1;
-        document.getElementById('nextPage').disabled = currentPage === totalPages || totalPages === 0;
+        if (cursorPaging()) {
+            document.getElementById('prevPage').disabled = !prevCursor;
+            document.getElementById('nextPage').disabled = !nextCursor;
+        } else {
+            document.getElementById('prevPage').disabled = currentPage === 1;
+            document.getElementById('nextPage').disabled = currentPage === totalPages || totalPages === 0;
+        }
     }
 
     document.getElementById('prevPage').addEventListener('click', function () {
-        if (currentPage > 1) {
+        if (cursorPaging() ? prevCursor : currentPage > 1) {
             if (filterManager) {
-                filterManager.reloadData(currentPage - 1, itemsPerPage);
+                filterManager.reloadData(Math.max(1, currentPage - 1), itemsPerPage, prevCursor);
             } else {
-                loadData(currentPage - 1);
+                loadData(Math.max(1, currentPage - 1), false, prevCursor);
             }
         }
     });
 
     document.getElementById('nextPage').addEventListener('click', function () {
-        var totalPages = Math.ceil(totalItems / itemsPerPage);
-        if (currentPage < totalPages) {
+        if (cursorPaging() ? nextCursor : currentPage < Math.ceil(totalItems / itemsPerPage)) {
             if (filterManager) {
-                filterManager.reloadData(currentPage + 1, itemsPerPage);
+                filterManager.reloadData(currentPage + 1, itemsPerPage, nextCursor);
             } else {
-                loadData(currentPage + 1);
+                loadData(currentPage + 1, false, nextCursor);
             }
         }
     });
 
+    function exportUrl(format) {
+        var params = new URLSearchParams(filterManager ? filterManager.getActiveFilters() : {});
+        params.set('format', format);
+        params.set('sort_by', currentSort.by);
+        params.set('sort_order', currentSort.order);
+        return '/api/export/?' + params.toString();
+    }
+
+    document.querySelectorAll('.export-btn').forEach(function (btn) {
+        btn.addEventListener('click', function () {
+            // Streamed attachment: the browser downloads it without leaving the page
+            window.location.href = exportUrl(btn.dataset.format);
+        });
+    });
+
     function escapeHtml(text) {
         var div = document.createElement('div');
         div.textContent = text;
@@ -128,6 +163,9 @@
     function handleSortChange(field, order) {
         currentSort = { by: field, order: order };
         window.currentSort = currentSort;
+        if (filterManager) {
+            filterManager.config.cursorPaging = cursorPaging();
+        }
 
         if (filterManager) {
             filterManager.reloadData(1, itemsPerPage);
@@ -157,6 +195,7 @@
             dataEndpoint: '/api/data/',
             filterOptionsEndpoint: '/api/filters/',
             itemsPerPage: itemsPerPage,
+            cursorPaging: cursorPaging(),
             filters: [
                 {
                     field: 'nome_operatore',